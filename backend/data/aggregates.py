@@ -0,0 +1,136 @@
+import math
+
+# Materialized ROI statistics, kept in step with TaskLog by triggers so every write
+# (form, bulk import or an external tool) updates them in its own transaction.
+# Maps each aggregate table to the TaskLog column it groups by.
+AGGREGATE_TABLES = {
+    "TaskStats": "task_key",
+    "CategoryStats": "category_key",
+    "DailyStats": "date",
+}
+
+STATS_COLUMNS = "entries, roi_sum, roi_sq_sum, roi_min, roi_max, time_total"
+
+# Settings entry present while a bulk write keeps the aggregate tables in step itself (see
+# suspend_aggregates); every trigger checks it, so suspending them needs no schema change.
+AGGREGATES_SUSPENDED_SETTING = "aggregates_suspended"
+TRIGGER_KINDS = ("insert", "delete", "update")
+# Settings entry present from the first commit of a bulk write that leaves the aggregate tables
+# behind (see DatabaseManager.recalculate_scores) until rebuild_aggregates catches them up
+AGGREGATES_STALE_SETTING = "aggregates_stale"
+
+
+def _add_row_sql(table, key, row):
+    # Folds one TaskLog row (NEW) into the matching aggregate row
+    return f'''
+        INSERT INTO {table} ({key}, {STATS_COLUMNS})
+        VALUES ({row}.{key}, 1, {row}.roi, {row}.roi * {row}.roi, {row}.roi, {row}.roi, IFNULL({row}.time_investment, 0))
+        ON CONFLICT ({key}) DO UPDATE SET
+            entries = entries + 1,
+            roi_sum = roi_sum + excluded.roi_sum,
+            roi_sq_sum = roi_sq_sum + excluded.roi_sq_sum,
+            roi_min = MIN(roi_min, excluded.roi_min),
+            roi_max = MAX(roi_max, excluded.roi_max),
+            time_total = time_total + excluded.time_total;
+    '''
+
+
+def _remove_row_sql(table, key, row, source):
+    # Takes one TaskLog row (OLD) back out; min/max cannot be undone so they are re-read from `source`
+    return f'''
+        UPDATE {table} SET
+            entries = entries - 1,
+            roi_sum = roi_sum - {row}.roi,
+            roi_sq_sum = roi_sq_sum - {row}.roi * {row}.roi,
+            roi_min = (SELECT MIN(roi) FROM {source} WHERE {key} = {row}.{key}),
+            roi_max = (SELECT MAX(roi) FROM {source} WHERE {key} = {row}.{key}),
+            time_total = time_total - IFNULL({row}.time_investment, 0)
+        WHERE {key} = {row}.{key};
+        DELETE FROM {table} WHERE {key} = {row}.{key} AND entries <= 0;
+    '''
+
+
+def create_aggregate_tables(cursor, source="TaskLog"):
+    """
+    Creates the aggregate tables and the TaskLog triggers that maintain them.
+    `source` is where the triggers re-read min/max after a removal: TaskLog, or the
+    TaskHistory view once years are archived (see archive.py). The triggers read the
+    Settings table, which has to exist.
+    """
+    active = f"WHEN NOT EXISTS (SELECT 1 FROM Settings WHERE name = '{AGGREGATES_SUSPENDED_SETTING}')"
+    for table, key in AGGREGATE_TABLES.items():
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                {key} TEXT PRIMARY KEY,
+                entries INTEGER NOT NULL,           -- Number of TaskLog rows
+                roi_sum REAL NOT NULL,              -- Sum of ROI, for the mean
+                roi_sq_sum REAL NOT NULL,           -- Sum of squared ROI, for the variance
+                roi_min REAL,
+                roi_max REAL,
+                time_total REAL NOT NULL            -- Total time invested
+            )
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_insert AFTER INSERT ON TaskLog {active} BEGIN
+                {_add_row_sql(table, key, "NEW")}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_delete AFTER DELETE ON TaskLog {active} BEGIN
+                {_remove_row_sql(table, key, "OLD", source)}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_update
+            AFTER UPDATE OF {key}, roi, time_investment ON TaskLog {active} BEGIN
+                {_remove_row_sql(table, key, "OLD", source)}
+                {_add_row_sql(table, key, "NEW")}
+            END
+        ''')
+
+
+def drop_aggregate_triggers(cursor, kinds=TRIGGER_KINDS):
+    """Drops the aggregate triggers of `kinds`, so create_aggregate_tables creates them afresh."""
+    for table in AGGREGATE_TABLES:
+        for kind in kinds:
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_{kind}")
+
+
+def suspend_aggregates(cursor):
+    """
+    Switches the aggregate triggers off for a bulk write that applies its own changes to the
+    aggregate tables (or none at all), until resume_aggregates. Both belong in the same write
+    transaction: other connections never see the flag, and a rollback takes it along.
+    """
+    cursor.execute("INSERT OR IGNORE INTO Settings (name, value) VALUES (?, 1)", (AGGREGATES_SUSPENDED_SETTING,))
+
+
+def resume_aggregates(cursor):
+    cursor.execute("DELETE FROM Settings WHERE name = ?", (AGGREGATES_SUSPENDED_SETTING,))
+
+
+def rebuild_aggregates(cursor, source="TaskLog"):
+    """
+    Recomputes every aggregate table from TaskLog, or from `source` (TaskHistory) to include archived years.
+    """
+    cursor.execute("DELETE FROM Settings WHERE name = ?", (AGGREGATES_STALE_SETTING,))
+    for table, key in AGGREGATE_TABLES.items():
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f'''
+            INSERT INTO {table} ({key}, {STATS_COLUMNS})
+            SELECT {key}, COUNT(*), TOTAL(roi), TOTAL(roi * roi), MIN(roi), MAX(roi), TOTAL(time_investment)
+            FROM {source}
+            GROUP BY {key}
+        ''')
+
+
+def summarize(entries, roi_sum, roi_sq_sum):
+    """
+    Returns (mean, standard deviation) of ROI from the running sums of an aggregate row.
+    """
+    if not entries:
+        return 0.0, 0.0
+    mean = roi_sum / entries
+    # Clamped because floating point drift can push the variance slightly negative
+    variance = max(roi_sq_sum / entries - mean * mean, 0.0)
+    return mean, math.sqrt(variance)
@@ -0,0 +1,104 @@
+import re
+from backend.data.aggregates import (create_aggregate_tables, drop_aggregate_triggers, suspend_aggregates,
+                                     resume_aggregates)
+from backend.data.dbSetUp import create_change_counter
+
+# Optional year archives: the rows of a finished year can be moved out of TaskLog into a
+# TaskLog_<year> table, so the table every write, trigger and index touches only holds recent
+# years. TaskHistory is a UNION ALL view over TaskLog and every archive for all-history queries.
+# Archived rows keep counting in the aggregate tables (whose triggers then re-read min/max
+# through TaskHistory); they leave the full-text index and are searched with LIKE.
+ARCHIVE_PREFIX = "TaskLog_"
+HISTORY_VIEW = "TaskHistory"
+ARCHIVE_NAME = re.compile(r"TaskLog_(\d{4})$")
+
+# Rows moved per write transaction, so the app can keep logging while a year is archived
+ARCHIVE_BATCH_SIZE = 5000
+
+
+def archive_table(year: int) -> str:
+    return f"{ARCHIVE_PREFIX}{year:04d}"
+
+
+def year_bounds(year: int):
+    """First and last ISO date of `year`, for an inclusive date window."""
+    return f"{year:04d}-01-01", f"{year:04d}-12-31"
+
+
+def archived_years(cursor):
+    """Years that have an archive table, in ascending order."""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?", (ARCHIVE_PREFIX + "%",))
+    return sorted(int(match.group(1)) for (name,) in cursor.fetchall() if (match := ARCHIVE_NAME.match(name)))
+
+
+def _columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [(row[1], row[2]) for row in cursor.fetchall()]
+
+
+def create_archive_table(cursor, year: int):
+    """
+    Creates the archive table of `year` with TaskLog's current columns (ids are kept, so an
+    archived row has the same id it had in TaskLog), the indexes the window queries use and the
+    triggers counting its edits.
+    """
+    table = archive_table(year)
+    columns = ", ".join(f"{name} {kind}" + (" PRIMARY KEY" if name == "id" else "")
+                        for name, kind in _columns(cursor, "TaskLog"))
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table.lower()}_task_key ON {table} (task_key, date, roi)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table.lower()}_category_key ON {table} (category_key, date, roi)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table.lower()}_date ON {table} (date, task_key)")
+    create_change_counter(cursor, table)
+
+
+def _recreate_triggers(cursor, kinds, source):
+    # The aggregate triggers are created IF NOT EXISTS, so they are dropped first to take on `source`
+    drop_aggregate_triggers(cursor, kinds)
+    create_aggregate_tables(cursor, source)
+
+
+def create_history_view(cursor):
+    """
+    (Re)creates TaskHistory over TaskLog and every archive table, or drops it when there are
+    no archives, and points the aggregate triggers at whichever holds all rows.
+    Columns added to TaskLog after a year was archived read as NULL for that year.
+    """
+    # Dropping the view first would leave the triggers reading a missing table
+    _recreate_triggers(cursor, ("delete", "update"), "TaskLog")
+    cursor.execute(f"DROP VIEW IF EXISTS {HISTORY_VIEW}")
+    years = archived_years(cursor)
+    if not years:
+        return
+    columns = [name for name, _ in _columns(cursor, "TaskLog")]
+    selects = [f"SELECT {', '.join(columns)} FROM TaskLog"]
+    for year in years:
+        table = archive_table(year)
+        present = {name for name, _ in _columns(cursor, table)}
+        selects.append(f"SELECT {', '.join(name if name in present else f'NULL AS {name}' for name in columns)} FROM {table}")
+    cursor.execute(f"CREATE VIEW {HISTORY_VIEW} AS " + " UNION ALL ".join(selects))
+    _recreate_triggers(cursor, ("delete", "update"), HISTORY_VIEW)
+
+
+def move_rows(cursor, table: str, date_from: str, date_to: str, batch_size: int, to_archive: bool) -> int:
+    """
+    Moves up to `batch_size` rows dated within [date_from, date_to] from TaskLog into archive
+    `table` (or back when to_archive is False). Returns the number of rows moved.
+    Run inside a write transaction, after create_history_view. The aggregate triggers are
+    suspended for the move: the statistics keep counting archived rows, and rows coming back
+    were never taken out.
+    """
+    source, target = ("TaskLog", table) if to_archive else (table, "TaskLog")
+    columns = ", ".join(name for name, _ in _columns(cursor, table))
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)")
+    cursor.execute("DELETE FROM archive_batch")
+    cursor.execute(f"INSERT INTO archive_batch SELECT id FROM {source} WHERE date >= ? AND date <= ? ORDER BY id LIMIT ?",
+                   (date_from, date_to, batch_size))
+    moved = cursor.rowcount
+    if moved:
+        suspend_aggregates(cursor)
+        cursor.execute(f"INSERT INTO {target} ({columns}) SELECT {columns} FROM {source} WHERE id IN archive_batch")
+        cursor.execute(f"DELETE FROM {source} WHERE id IN archive_batch")
+        resume_aggregates(cursor)
+    cursor.execute("DELETE FROM archive_batch")
+    return moved
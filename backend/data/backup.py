@@ -0,0 +1,268 @@
+import gzip, hashlib, json, os, shutil, sqlite3, tempfile
+from datetime import datetime
+from urllib.parse import quote
+
+# Online snapshots through SQLite's backup API, kept next to the database in a backups/
+# folder with a manifest.json describing every snapshot (newest last).
+# A full snapshot is a complete copy of the database; an incremental one only holds the
+# TaskLog rows appended since the snapshot before it, and is restored on top of that chain.
+
+BACKUP_FOLDER = "backups"
+MANIFEST_NAME = "manifest.json"
+
+# Pages copied per backup step (1 MiB at the default 4 KiB page size). The source is only
+# read-locked during a step, so checkpoints and other connections run in between.
+BACKUP_PAGE_STEP = 256
+BACKUP_STEP_SLEEP = 0.005   # seconds
+
+# A commit from another connection restarts a stepped backup. After this many restarts the
+# rest is copied in one step, which under WAL reads one snapshot without blocking writers.
+BACKUP_MAX_RESTARTS = 3
+
+# Full snapshots kept by rotation; incrementals go with the full snapshot they build on
+BACKUP_KEEP = 5
+
+
+class BackupError(Exception):
+    """A snapshot is missing, corrupt or does not match its manifest entry."""
+
+
+def default_backup_dir(db_path):
+    return os.path.join(os.path.dirname(db_path) or ".", BACKUP_FOLDER)
+
+
+def load_manifest(backup_dir):
+    """Returns the manifest entries of `backup_dir`, oldest first."""
+    path = os.path.join(backup_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _save_manifest(backup_dir, entries):
+    # Written to a temporary file first so a crash never leaves a half-written manifest
+    path = os.path.join(backup_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(entries, file, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fingerprint(connection, schema, last_id):
+    # Summary of the rows an incremental snapshot assumes are unchanged. Deletes, rescoring
+    # and edits to the text columns change it; an edit that keeps every total does not.
+    return list(connection.execute(f'''
+        SELECT COUNT(*), TOTAL(roi), TOTAL(time_investment),
+               TOTAL(LENGTH(date) + LENGTH(task) + LENGTH(category) + LENGTH(notes))
+        FROM {schema}.TaskLog WHERE id <= ?
+    ''', (last_id,)).fetchone())
+
+
+def _read_only_uri(db_path):
+    # Quoted, so "?", "#" and "%" in the path are not read as URI syntax
+    return f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+
+
+def _read_only(db_path):
+    return sqlite3.connect(_read_only_uri(db_path), uri=True)
+
+
+def _copy_pages(source, target, pages, sleep):
+    # Stepped copy that gives up stepping once concurrent commits keep restarting it
+    restarts = 0
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > BACKUP_MAX_RESTARTS:
+                raise InterruptedError
+        last_remaining = remaining
+
+    try:
+        source.backup(target, pages=pages, progress=progress, sleep=sleep)
+    except InterruptedError:
+        source.backup(target)
+
+
+def _store(temp_path, final_path, compress):
+    if compress:
+        with open(temp_path, "rb") as source, gzip.open(final_path, "wb", compresslevel=6) as target:
+            shutil.copyfileobj(source, target, 1 << 20)
+        os.remove(temp_path)
+    else:
+        os.replace(temp_path, final_path)
+
+
+def _copy_full(db_path, target, pages, sleep):
+    source = _read_only(db_path)
+    try:
+        _copy_pages(source, target, pages, sleep)
+    finally:
+        source.close()
+    # Leave the snapshot as a single self-contained file
+    target.execute("PRAGMA journal_mode=DELETE")
+    last_id = target.execute("SELECT IFNULL(MAX(id), 0) FROM TaskLog").fetchone()[0]
+    return last_id, _fingerprint(target, "main", last_id)
+
+
+def _copy_increment(db_path, target, base):
+    # Returns None without copying anything when rows covered by `base` have changed since
+    target.execute("ATTACH DATABASE ? AS live", (_read_only_uri(db_path),))
+    try:
+        # One read transaction, so the fingerprints and the copied rows come from the same snapshot
+        target.execute("BEGIN")
+        if _fingerprint(target, "live", base["last_id"]) != base["fingerprint"]:
+            return None
+        target.execute("CREATE TABLE main.TaskLog AS SELECT * FROM live.TaskLog WHERE id > ? ORDER BY id",
+                       (base["last_id"],))
+        last_id = target.execute("SELECT IFNULL(MAX(id), ?) FROM main.TaskLog", (base["last_id"],)).fetchone()[0]
+        return last_id, _fingerprint(target, "live", last_id)
+    finally:
+        target.commit()
+        target.execute("DETACH DATABASE live")
+
+
+def create_snapshot(db_path, backup_dir=None, compress=False, incremental=False, keep=BACKUP_KEEP,
+                    pages=BACKUP_PAGE_STEP, sleep=BACKUP_STEP_SLEEP):
+    """
+    Takes a consistent snapshot of the live database at `db_path` and records it in the manifest.
+    With incremental=True only the TaskLog rows appended since the newest snapshot are saved;
+    it falls back to a full snapshot when there is none yet or older rows have changed since.
+    Returns the new manifest entry.
+    """
+    backup_dir = backup_dir or default_backup_dir(db_path)
+    os.makedirs(backup_dir, exist_ok=True)
+    entries = load_manifest(backup_dir)
+    base = entries[-1] if incremental and entries else None
+
+    created = datetime.now()
+    temp_path = os.path.join(backup_dir, f"task_log-{created:%Y%m%d-%H%M%S-%f}.partial")
+    target = sqlite3.connect(temp_path, uri=True)
+    try:
+        copied = _copy_increment(db_path, target, base) if base else None
+        if copied is None:
+            base = None
+            copied = _copy_full(db_path, target, pages, sleep)
+        last_id, fingerprint = copied
+        rows = target.execute("SELECT COUNT(*) FROM TaskLog").fetchone()[0]
+    finally:
+        target.close()
+
+    kind = "incremental" if base else "full"
+    name = f"task_log-{created:%Y%m%d-%H%M%S-%f}-{kind}.db" + (".gz" if compress else "")
+    final_path = os.path.join(backup_dir, name)
+    _store(temp_path, final_path, compress)
+    entry = {
+        "file": name,
+        "kind": kind,
+        "base": base["file"] if base else None,
+        "created": created.isoformat(timespec="seconds"),
+        "rows": rows,
+        "last_id": last_id,
+        "fingerprint": fingerprint,
+        "compressed": compress,
+        "size": os.path.getsize(final_path),
+        "sha256": file_digest(final_path),
+    }
+    entries.append(entry)
+    _save_manifest(backup_dir, _rotate(backup_dir, entries, keep))
+    return entry
+
+
+def _rotate(backup_dir, entries, keep):
+    # Everything older than the keep-th newest full snapshot goes, incrementals included
+    full = [index for index, entry in enumerate(entries) if entry["kind"] == "full"]
+    if keep <= 0 or len(full) <= keep:
+        return entries
+    first_kept = full[-keep]
+    for entry in entries[:first_kept]:
+        path = os.path.join(backup_dir, entry["file"])
+        if os.path.exists(path):
+            os.remove(path)
+    return entries[first_kept:]
+
+
+def snapshot_chain(entries, file=None):
+    """
+    Returns the manifest entries needed to restore snapshot `file` (the newest by default):
+    its full snapshot followed by the incrementals up to it.
+    """
+    by_file = {entry["file"]: entry for entry in entries}
+    entry = by_file.get(file) if file else (entries[-1] if entries else None)
+    if entry is None:
+        raise BackupError(f"Snapshot {file} is not in the manifest" if file else "There are no snapshots to restore")
+    chain = [entry]
+    while chain[-1]["base"]:
+        base = by_file.get(chain[-1]["base"])
+        if base is None:
+            raise BackupError(f"Snapshot {chain[-1]['file']} builds on {chain[-1]['base']}, which is missing")
+        chain.append(base)
+    return chain[::-1]
+
+
+def _open_verified(backup_dir, entry, folder):
+    # Checks the stored file against the manifest, then returns the path of a plain copy
+    path = os.path.join(backup_dir, entry["file"])
+    if not os.path.exists(path):
+        raise BackupError(f"Snapshot file {entry['file']} is missing")
+    if file_digest(path) != entry["sha256"]:
+        raise BackupError(f"Snapshot {entry['file']} does not match its checksum")
+    plain = os.path.join(folder, entry["file"].removesuffix(".gz"))
+    if entry["compressed"]:
+        with gzip.open(path, "rb") as source, open(plain, "wb") as target:
+            shutil.copyfileobj(source, target, 1 << 20)
+    else:
+        shutil.copy(path, plain)
+
+    connection = sqlite3.connect(plain)
+    try:
+        if connection.execute("PRAGMA integrity_check").fetchone()[0] != "ok":
+            raise BackupError(f"Snapshot {entry['file']} failed the integrity check")
+        if connection.execute("SELECT COUNT(*) FROM TaskLog").fetchone()[0] != entry["rows"]:
+            raise BackupError(f"Snapshot {entry['file']} does not hold the {entry['rows']} rows recorded for it")
+    finally:
+        connection.close()
+    return plain
+
+
+def assemble_snapshot(backup_dir, target_path, file=None):
+    """
+    Verifies snapshot `file` (the newest by default) and the snapshots it builds on, and
+    writes the database they describe to `target_path`. Raises BackupError on any mismatch.
+    Returns the manifest entry of the restored snapshot.
+    """
+    chain = snapshot_chain(load_manifest(backup_dir), file)
+    with tempfile.TemporaryDirectory(dir=backup_dir) as folder:
+        database = _open_verified(backup_dir, chain[0], folder)
+        connection = sqlite3.connect(database)
+        try:
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(TaskLog)")]
+            for entry in chain[1:]:
+                increment = _open_verified(backup_dir, entry, folder)
+                connection.execute("ATTACH DATABASE ? AS increment", (increment,))
+                shared = ", ".join(row[1] for row in connection.execute("PRAGMA increment.table_info(TaskLog)")
+                                   if row[1] in columns)
+                # Inserting through TaskLog keeps the aggregate tables and search index in step
+                with connection:
+                    connection.execute(f"INSERT INTO TaskLog ({shared}) SELECT {shared} FROM increment.TaskLog ORDER BY id")
+                connection.execute("DETACH DATABASE increment")
+
+            last = chain[-1]
+            if _fingerprint(connection, "main", last["last_id"]) != last["fingerprint"]:
+                raise BackupError(f"Restored data does not match snapshot {last['file']}")
+            if connection.execute("PRAGMA integrity_check").fetchone()[0] != "ok":
+                raise BackupError("Restored database failed the integrity check")
+        finally:
+            connection.close()
+        os.replace(database, target_path)
+    return chain[-1]
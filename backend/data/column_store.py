@@ -0,0 +1,367 @@
+import json, math, os
+from typing import Optional
+import numpy as np
+from numpy.lib import format as npy_format
+from backend.data.archive import archive_table, archived_years
+from backend.data.dbSetUp import HISTORY_CHANGES_SETTING
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:
+    pa = None
+
+# Columnar copy of the task history for analytics outside SQLite: one .npy file per column in
+# a folder, read back memory-mapped, so loading the whole history costs page faults instead of
+# building a tuple per row. The manifest records how far TaskLog has been exported (the id
+# watermark), the database's count of edited and deleted entries at the time and the totals of
+# the exported rows; a sync appends the rows past the watermark in place and starts over when
+# any entry was edited or deleted since (re-scored, renamed, redated, archived) or the totals no
+# longer match the database.
+#
+# Column layouts, Arrow-style so each maps straight onto an Arrow array:
+#   numeric      float64 / int64, NULL as NaN
+#   date         datetime64[D], NULL or unparseable as NaT
+#   dictionary   int32 codes into <name>.values.json, NULL as -1 (names, times, score model)
+#   text         UTF-8 bytes in <name>.data.npy, end offsets in <name>.npy (notes, NULL as "")
+
+STORE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+COLUMN_CHUNK_ROWS = 50000
+
+STORE_COLUMNS = {
+    "id": ("numeric", "<i8"),
+    "date": ("date", "<M8[D]"),
+    "task": ("dictionary", "<i4"),
+    "category": ("dictionary", "<i4"),
+    "time_investment": ("numeric", "<f8"),
+    "start_time": ("dictionary", "<i4"),
+    "end_time": ("dictionary", "<i4"),
+    "immediate_benefit": ("numeric", "<f8"),
+    "future_impact": ("numeric", "<f8"),
+    "personal_fulfillment": ("numeric", "<f8"),
+    "progress": ("numeric", "<f8"),
+    "progress_pct": ("numeric", "<f8"),
+    "output_score": ("numeric", "<f8"),
+    "roi": ("numeric", "<f8"),
+    "notes": ("text", "<i8"),
+    "task_key": ("dictionary", "<i4"),
+    "category_key": ("dictionary", "<i4"),
+    "score_model": ("dictionary", "<i4"),
+}
+
+
+class ColumnStoreError(Exception):
+    """The column store folder is missing, holds other files, or does not match its manifest."""
+
+
+def _append_npy(path, values: np.ndarray, rows: int):
+    """
+    Appends `values` to the one-dimensional .npy file at `path` after its first `rows` items,
+    in place: anything past them (left by an interrupted sync) is cut off and the header's
+    length rewritten. NumPy pads the header so the length can grow without moving the data.
+    """
+    with open(path, "r+b") as file:
+        version = npy_format.read_magic(file)
+        read_header = npy_format.read_array_header_1_0 if version == (1, 0) else npy_format.read_array_header_2_0
+        _, _, dtype = read_header(file)
+        start = file.tell()
+        file.seek(start + rows * dtype.itemsize)
+        file.truncate()
+        file.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        file.seek(0)
+        header = {"descr": npy_format.dtype_to_descr(dtype), "fortran_order": False, "shape": (rows + len(values),)}
+        npy_format.write_array_header_1_0(file, header) if version == (1, 0) else npy_format.write_array_header_2_0(file, header)
+        if file.tell() != start:
+            raise ColumnStoreError(f"The header of {path} changed size while appending")
+
+
+def _map_npy(path, rows: int, dtype):
+    # Zero-copy view of the first `rows` items; an empty column has nothing to map
+    if not rows:
+        return np.empty(0, dtype=dtype)
+    return np.load(path, mmap_mode="r")[:rows]
+
+
+def _parse_dates(values):
+    try:
+        return np.array(values, dtype="datetime64[D]")
+    except ValueError:
+        dates = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[D]")
+        for position, value in enumerate(values):
+            try:
+                dates[position] = np.datetime64(value, "D")
+            except (TypeError, ValueError):
+                pass
+        return dates
+
+
+class ColumnStore:
+    """
+    Folder of TaskLog columns kept in step with a database by sync(), and opened for reading
+    with open(). Not safe for concurrent syncs; readers keep the files they have mapped.
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def manifest(self) -> Optional[dict]:
+        """The store's manifest, or None when the folder holds no store (of this version)."""
+        try:
+            with open(self._file(MANIFEST_NAME), encoding="utf-8") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get("version") == STORE_VERSION else None
+
+    def _save_manifest(self, manifest):
+        # Written last and replaced atomically: columns past manifest["rows"] are never read
+        path = self._file(MANIFEST_NAME)
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def _store_files(self):
+        # Every file name a store of this version writes to its folder
+        names = {MANIFEST_NAME, MANIFEST_NAME + ".tmp"}
+        for name, (kind, _) in STORE_COLUMNS.items():
+            names.add(f"{name}.npy")
+            if kind == "dictionary":
+                names.add(f"{name}.values.json")
+            elif kind == "text":
+                names.add(f"{name}.data.npy")
+        return names
+
+    def _create(self, tables):
+        # Only a new or empty folder, or one holding nothing but store files, is (re)written;
+        # anything else in it is left alone and the export refused
+        os.makedirs(self.path, exist_ok=True)
+        store_files = self._store_files()
+        foreign = sorted(name for name in os.listdir(self.path) if name not in store_files)
+        if foreign:
+            raise ColumnStoreError(f"{self.path} is not empty and not a column store of this version "
+                                   f"(it holds {', '.join(foreign[:3])}{', ...' if len(foreign) > 3 else ''}); "
+                                   f"export to a new or empty folder")
+        for name in store_files:
+            if os.path.exists(self._file(name)):
+                os.remove(self._file(name))
+        for name, (kind, dtype) in STORE_COLUMNS.items():
+            np.save(self._file(f"{name}.npy"), np.empty(0, dtype=dtype))
+            if kind == "dictionary":
+                with open(self._file(f"{name}.values.json"), "w", encoding="utf-8") as file:
+                    json.dump([], file)
+            elif kind == "text":
+                np.save(self._file(f"{name}.data.npy"), np.empty(0, dtype=np.uint8))
+        manifest = {"version": STORE_VERSION, "rows": 0, "tables": tables, "watermark": 0, "changes": None,
+                    "totals": [0, 0.0, 0.0]}
+        self._save_manifest(manifest)
+        return manifest
+
+    def _append(self, manifest, dictionaries, rows):
+        # Appends one chunk of rows (in STORE_COLUMNS order) to every column file
+        count = manifest["rows"]
+        for (name, (kind, dtype)), values in zip(STORE_COLUMNS.items(), zip(*rows)):
+            if kind == "numeric":
+                column = np.array(values, dtype=dtype)
+            elif kind == "date":
+                column = _parse_dates(values)
+            elif kind == "dictionary":
+                codes = dictionaries[name]
+                column = np.fromiter((-1 if value is None else codes.setdefault(value, len(codes)) for value in values),
+                                     dtype=dtype, count=len(values))
+            else:
+                encoded = [(value or "").encode("utf-8") for value in values]
+                ends = _map_npy(self._file(f"{name}.npy"), count, dtype)
+                base = int(ends[-1]) if count else 0
+                column = base + np.cumsum([len(value) for value in encoded], dtype=np.int64)
+                _append_npy(self._file(f"{name}.data.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8), base)
+            _append_npy(self._file(f"{name}.npy"), column, count)
+        roi = np.array([row[13] for row in rows], dtype=float)
+        hours = np.array([row[4] for row in rows], dtype=float)
+        entries, roi_sum, time_sum = manifest["totals"]
+        manifest["totals"] = [entries + len(rows), roi_sum + float(np.nansum(roi)), time_sum + float(np.nansum(hours))]
+        manifest["rows"] = count + len(rows)
+
+    def _export_table(self, connection, manifest, dictionaries, table, last_id, chunk_size):
+        # Rows of `table` after `last_id` in id order, a chunk at a time. Returns the last id exported.
+        while True:
+            rows = connection.execute(f"SELECT {', '.join(STORE_COLUMNS)} FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                                      (last_id, chunk_size)).fetchall()
+            if not rows:
+                return last_id
+            self._append(manifest, dictionaries, rows)
+            last_id = rows[-1][0]
+
+    def sync(self, db_manager, chunk_size: int = COLUMN_CHUNK_ROWS, rebuild: bool = False) -> int:
+        """
+        Brings the store up to date with the database: appends the TaskLog rows added since
+        the last sync, or exports the whole history (archived years first) when there is no
+        store yet, the archived years differ, an entry was edited or deleted since the last
+        sync, or the exported rows no longer add up to the database's totals. Returns the
+        number of rows written.
+        """
+        with db_manager.reader() as connection:
+            tables = [archive_table(year) for year in archived_years(connection.cursor())] + ["TaskLog"]
+            # Read before the rows, so an edit made during the export leaves the store stale, not wrong
+            changes = _history_changes(connection)
+        manifest = None if rebuild else self.manifest()
+        for attempt in range(2):
+            full = manifest is None or manifest["tables"] != tables or manifest.get("changes") != changes
+            if full:
+                manifest = self._create(tables)
+                manifest["changes"] = changes
+            dictionaries = {name: {value: code for code, value in enumerate(self._read_values(name))}
+                            for name, (kind, _) in STORE_COLUMNS.items() if kind == "dictionary"}
+            written = manifest["rows"]
+            with db_manager.reader() as connection:
+                for table in tables if full else ["TaskLog"]:
+                    manifest["watermark"] = self._export_table(connection, manifest, dictionaries, table,
+                                                               0 if full else manifest["watermark"], chunk_size)
+                totals = _database_totals(connection)
+            for name, codes in dictionaries.items():
+                with open(self._file(f"{name}.values.json"), "w", encoding="utf-8") as file:
+                    json.dump(list(codes), file)
+            self._save_manifest(manifest)
+            written = manifest["rows"] - (0 if full else written)
+            if full or _totals_match(manifest["totals"], totals):
+                break
+            db_manager.logger.debug(f"The column store at {self.path} no longer matches the database, exporting it again.")
+            manifest = None
+        db_manager.logger.debug(f"Column store at {self.path}: {written} rows written, {manifest['rows']} in total.")
+        return written
+
+    def _read_values(self, name):
+        with open(self._file(f"{name}.values.json"), encoding="utf-8") as file:
+            return json.load(file)
+
+    def open(self) -> "ColumnarHistory":
+        """Memory-maps the store's columns. Raises ColumnStoreError when there is no store."""
+        manifest = self.manifest()
+        if manifest is None:
+            raise ColumnStoreError(f"No column store at {self.path}")
+        rows = manifest["rows"]
+        columns, values, text_data = {}, {}, {}
+        try:
+            for name, (kind, dtype) in STORE_COLUMNS.items():
+                columns[name] = _map_npy(self._file(f"{name}.npy"), rows, dtype)
+                if len(columns[name]) != rows:
+                    raise ColumnStoreError(f"{name} holds {len(columns[name])} of the store's {rows} rows")
+                if kind == "dictionary":
+                    values[name] = np.array(self._read_values(name) + [None], dtype=object)
+                elif kind == "text":
+                    text_data[name] = _map_npy(self._file(f"{name}.data.npy"), int(columns[name][-1]) if rows else 0, np.uint8)
+        except (OSError, ValueError) as e:
+            raise ColumnStoreError(f"Could not open the column store at {self.path}: {e}") from e
+        return ColumnarHistory(manifest, columns, values, text_data)
+
+
+def _history_changes(connection):
+    # Edits and deletes of logged entries so far, counted by triggers (see dbSetUp.create_change_counter)
+    row = connection.execute("SELECT value FROM Settings WHERE name = ?", (HISTORY_CHANGES_SETTING,)).fetchall()
+    return int(row[0][0]) if row else 0
+
+
+def _database_totals(connection):
+    # (entries, ROI sum, hours) of the whole history, off the aggregate tables, plus the last TaskLog id
+    entries, roi_sum, time_sum = connection.execute(
+        "SELECT TOTAL(entries), TOTAL(roi_sum), TOTAL(time_total) FROM CategoryStats").fetchone()
+    last_id = connection.execute("SELECT IFNULL(MAX(id), 0) FROM TaskLog").fetchone()[0]
+    return [int(entries), roi_sum, time_sum], last_id
+
+
+def _totals_match(stored, current):
+    # The aggregate sums are kept up by triggers, so allow for their rounding drift
+    totals, _ = current
+    return stored[0] == totals[0] and all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+                                          for a, b in zip(stored[1:], totals[1:]))
+
+
+class ColumnarHistory:
+    """
+    Read-only view of a ColumnStore: numeric and date columns are memory-mapped NumPy arrays,
+    dictionary columns their codes (decode with values() or strings()). Rows are in export
+    order (archived years, then TaskLog by id), not by date.
+    """
+    def __init__(self, manifest, columns, values, text_data):
+        self.manifest = manifest
+        self.columns = columns
+        self._values = values
+        self._text_data = text_data
+        self._codes = {}
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def values(self, name) -> np.ndarray:
+        """Dictionary of a dictionary column as an object array; values(name)[codes] decodes, -1 gives None."""
+        return self._values[name]
+
+    def code(self, name, value) -> int:
+        """Code of `value` in a dictionary column, -2 (matching no row) when it never occurs."""
+        codes = self._codes.get(name)
+        if codes is None:
+            codes = self._codes[name] = {value: code for code, value in enumerate(self._values[name][:-1].tolist())}
+        return codes.get(value, -2)
+
+    def strings(self, name, index=slice(None)):
+        """Decoded values of a dictionary or text column at `index` (a slice, mask or positions), as a list."""
+        if name in self._text_data:
+            ends = self.columns[name]
+            positions = np.arange(len(self))[index]
+            data = self._text_data[name]
+            return [data[(int(ends[i - 1]) if i else 0):int(ends[i])].tobytes().decode("utf-8") for i in positions.tolist()]
+        return self._values[name][self.columns[name][index]].tolist()
+
+    def task_entries(self, task_key: str, date_from=None, date_to=None):
+        """(dates, ROI) of one task's entries in an optional inclusive ISO date window, ordered by date and ROI."""
+        mask = self.columns["task_key"] == self.code("task_key", task_key)
+        dates = self.columns["date"]
+        if date_from is not None:
+            mask &= dates >= np.datetime64(date_from, "D")
+        if date_to is not None:
+            mask &= dates <= np.datetime64(date_to, "D")
+        positions = np.flatnonzero(mask)
+        roi = self.columns["roi"][positions]
+        # Entries of the same day by ROI, the order the (task_key, date, roi) index returns them in
+        order = np.lexsort((roi, dates[positions]))
+        return dates[positions][order], np.asarray(roi[order])
+
+    def is_current(self, db_manager) -> bool:
+        """
+        Whether the store still holds exactly the database's history: nothing appended, edited or
+        deleted since it was synced (a cheap check off the edit count and the aggregates).
+        """
+        with db_manager.reader() as connection:
+            changes = _history_changes(connection)
+            totals, last_id = _database_totals(connection)
+        return (last_id == self.manifest["watermark"] and changes == self.manifest.get("changes")
+                and _totals_match(self.manifest["totals"], (totals, last_id)))
+
+    def to_arrow(self):
+        """The history as a pyarrow Table sharing the mapped buffers. Requires pyarrow."""
+        if pa is None:
+            raise ImportError("pyarrow is required for Arrow export")
+        arrays = {}
+        for name, (kind, _) in STORE_COLUMNS.items():
+            column = self.columns[name]
+            if kind == "dictionary":
+                codes = pa.array(column, mask=column < 0)
+                arrays[name] = pa.DictionaryArray.from_arrays(codes, pa.array(self._values[name][:-1].tolist(), pa.string()))
+            elif kind == "text":
+                offsets = np.concatenate([np.zeros(1, dtype=np.int64), column])
+                arrays[name] = pa.LargeStringArray.from_buffers(len(self), pa.py_buffer(offsets),
+                                                                pa.py_buffer(self._text_data[name]))
+            else:
+                # NaN and NaT become nulls, as they were NULL in TaskLog
+                arrays[name] = pa.array(column, from_pandas=True)
+        return pa.table(arrays)
+
+    def write_feather(self, path):
+        """Writes the history as an uncompressed Feather (Arrow IPC) file, which other tools can memory-map."""
+        table = self.to_arrow()
+        feather.write_feather(table, path, compression="uncompressed")
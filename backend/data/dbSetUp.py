@@ -1,5 +1,37 @@
 import sqlite3
 from datetime import datetime
+from backend.data.aggregates import create_aggregate_tables
+from backend.data.search import create_search_index
+
+# Version stamped into the Meta table of newly created databases.
+# Bump it together with a new step in helpers.MIGRATIONS.
+SCHEMA_VERSION = 9
+
+# Function to create the indexes used by the graph queries
+def create_indexes(cursor):
+    # Covering indexes so task/category lookups are index seeks that never touch the table
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasklog_task_key ON TaskLog (task_key, date, roi)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasklog_category_key ON TaskLog (category_key, date, roi)")
+    # Date windows over all tasks (range seek, then the rows) and the first/last date lookups
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasklog_date ON TaskLog (date, task_key)")
+
+# Function to create the key/value settings table, e.g. the active scoring model ("score_model")
+def create_settings_table(cursor):
+    cursor.execute("CREATE TABLE IF NOT EXISTS Settings (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+# Settings entry counting the updates and deletes of logged entries. Inserts only ever add new ids,
+# so a copy of the history (see column_store.py) is complete while the count has not moved.
+HISTORY_CHANGES_SETTING = "history_changes"
+
+# Function to create the triggers counting edits of `table` (TaskLog or a year archive) in Settings
+def create_change_counter(cursor, table="TaskLog"):
+    cursor.execute("INSERT OR IGNORE INTO Settings (name, value) VALUES (?, 0)", (HISTORY_CHANGES_SETTING,))
+    for event in ("UPDATE", "DELETE"):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_changes_{event.lower()} AFTER {event} ON {table} BEGIN
+                UPDATE Settings SET value = value + 1 WHERE name = '{HISTORY_CHANGES_SETTING}';
+            END
+        ''')
 
 # Function to initialize the SQLite database with a given path
 def initialize_database(db_path):
@@ -22,6 +54,21 @@ def initialize_database(db_path):
                 progress INTEGER,                   -- Score for progress (1-5 scale)
                 output_score REAL,                  -- Calculated output score
                 roi REAL,                           -- Calculated return on investment (ROI)
-                notes TEXT                          -- Optional notes about the task
+                notes TEXT,                         -- Optional notes about the task
+                task_key TEXT,                      -- Normalized task name (stripped, lowercase)
+                category_key TEXT,                  -- Normalized category name (stripped, lowercase)
+                progress_pct REAL,                  -- Progress percentage as entered (NULL for older rows)
+                score_model TEXT NOT NULL DEFAULT 'equal:1'  -- Scoring model of output_score and roi (see models/scoring.py)
             )
         ''')
+        create_indexes(cursor)
+        create_settings_table(cursor)
+        create_change_counter(cursor)
+        create_aggregate_tables(cursor)
+        create_search_index(cursor)
+
+        # New databases start at the latest schema version so no migrations run against them
+        cursor.execute("CREATE TABLE IF NOT EXISTS Meta (version INTEGER)")
+        cursor.execute("SELECT version FROM Meta")
+        if cursor.fetchone() is None:
+            cursor.execute("INSERT INTO Meta (version) VALUES (?)", (SCHEMA_VERSION,))
@@ -1,34 +1,112 @@
-import os
-import sqlite3, logging
-from datetime import datetime
+import os, json
+import sqlite3, logging, threading
+from urllib.parse import quote
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterable
+import numpy as np
 from models.task import Task
-from backend.data.dbSetUp import initialize_database
+from models.scoring import ScoringModel, SCORING_MODELS, LEGACY_MODEL_KEY
+from models.task_batch import TaskBatch, TASK_BATCH_COLUMNS
+from models.sessions import SessionSet
+from backend.data.dbSetUp import initialize_database, SCHEMA_VERSION
+from backend.data.aggregates import (AGGREGATE_TABLES, AGGREGATES_STALE_SETTING, STATS_COLUMNS, rebuild_aggregates,
+                                     suspend_aggregates, resume_aggregates)
+from backend.data.search import SEARCH_TABLE, search_clause
+from backend.data.archive import HISTORY_VIEW, archive_table, archived_years, year_bounds
+from backend.logs import instrumentation
+from backend.logs.instrumentation import timed
+
+INSERT_TASK_SQL = '''
+    INSERT INTO TaskLog (date, task, category, time_investment, start_time, end_time, 
+                            immediate_benefit, future_impact, personal_fulfillment, progress, 
+                            output_score, roi, notes, task_key, category_key, progress_pct, score_model)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Settings entry holding the active scoring model, stored with its full settings as JSON
+SCORE_MODEL_SETTING = "score_model"
+
+# Applied to every connection when it is opened.
+# WAL lets readers run alongside the writer, and synchronous=NORMAL only fsyncs at checkpoints.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",   # 256 MiB
+    "PRAGMA cache_size=-16000",     # ~16 MiB page cache
+    "PRAGMA temp_store=MEMORY",
+)
+
+class SchemaVersionError(Exception):
+    """The database predates the current schema; it is upgraded with `run.py migrate`."""
+
 
 class DatabaseManager:
-    def __init__(self, logger: logging.Logger, db_path=None):
+    def __init__(self, logger: logging.Logger, db_path=None, check_schema=True, read_only=False):
         self.logger = logger
         self.db_path = os.path.join(os.path.dirname(__file__), "db/task_log.db") if db_path is None else db_path
+        # Read-only managers (e.g. in export worker processes) open the file with mode=ro and never create or migrate it
+        self.read_only = read_only
+
+        # One long-lived writer shared behind a lock, plus one read connection per thread
+        self._writer = None
+        self._writer_schema = None
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._has_search_index = None
+        # (PRAGMA schema_version, last archived date) as of the last row query; see row_source
+        self._archive_state = (None, None)
+        # Change tracking for result caches: bumped on every commit through writer(), and a
+        # dedicated connection whose PRAGMA data_version moves when any other connection commits
+        self._write_generation = 0
+        self._watcher = None
+        self._watch_lock = threading.Lock()
+        # Active scoring model as last read from Settings: (stored JSON, ScoringModel)
+        self._score_model = (None, SCORING_MODELS[LEGACY_MODEL_KEY])
+
+        if read_only:
+            return
         self._ensure_db_folder_exists()
-        if not self._database_exists():
+        version = self._stored_schema_version()
+        if version is None:
             self.logger.debug("initializing database")
             initialize_database(self.db_path)
+        elif check_schema and version < SCHEMA_VERSION:
+            # Upgrades backfill, rescan or re-index the whole history, which is far too long to run
+            # implicitly while the window or a command starts; DatabaseHelper opens old files
+            self.close()
+            raise SchemaVersionError(f"{self.db_path} is at schema version {version}, version {SCHEMA_VERSION} is needed. "
+                                     f"Run 'python run.py migrate' to upgrade it.")
 
     def _ensure_db_folder_exists(self):
         """
         Ensures that the database folder exists.
         """
         db_folder = os.path.dirname(self.db_path)
-        if not os.path.exists(db_folder):
+        if db_folder and not os.path.exists(db_folder):
             os.makedirs(db_folder)
             self.logger.debug(f"Created database folder at {db_folder}")
 
 
-    def _connect(self):
+    def _connect(self, check_same_thread=True):
                 """
-                Establishes a database connection using the context manager.
+                Establishes a new, tuned database connection.
                 """
                 try:
-                    return sqlite3.connect(self.db_path)
+                    if self.read_only:
+                        connection = sqlite3.connect(f"file:{quote(os.path.abspath(self.db_path))}?mode=ro", uri=True,
+                                                     check_same_thread=check_same_thread)
+                    else:
+                        connection = sqlite3.connect(self.db_path, check_same_thread=check_same_thread)
+                    for pragma in CONNECTION_PRAGMAS:
+                        # The journal mode is the writers' to set
+                        if not (self.read_only and "journal_mode" in pragma):
+                            connection.execute(pragma)
+                    instrumentation.trace_connection(connection)
+                    return connection
                 except sqlite3.Error as e:
                     self.logger.error(f"An error occurred while connecting to the database: {e}")
                     return None
@@ -36,43 +114,530 @@ class DatabaseManager:
     
     def get_connection(self):
         """
-        Returns a connection object.
+        Returns a new connection object owned by the caller.
+        Prefer the reader() and writer() context managers, which reuse pooled connections.
         """
         return self._connect() 
+
+    @contextmanager
+    def writer(self):
+        """
+        Yields the shared writer connection inside a transaction.
+        Writes are serialized by a lock; the transaction commits on exit and rolls back on error.
+        """
+        if self.read_only:
+            raise sqlite3.OperationalError(f"{self.db_path} was opened read-only")
+        with self._write_lock:
+            if self._writer is None:
+                # Shared across threads, access is serialized by the write lock
+                self._writer = self._connect(check_same_thread=False)
+                if self._writer is None:
+                    raise sqlite3.OperationalError(f"Unable to open database at {self.db_path}")
+                self._writer_schema = None
+            connection = self._writer
+            # After another connection changes the schema (a migration, archiving a year), the next
+            # write through the full-text triggers fails once with "no such table: TaskLog" on
+            # SQLite 3.40; a plain read first reloads the schema so the write goes through
+            schema_version = connection.execute("PRAGMA schema_version").fetchone()[0]
+            if schema_version != self._writer_schema:
+                connection.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+                self._writer_schema = schema_version
+            try:
+                with instrumentation.timer("db.write_transaction"), connection:
+                    yield connection
+            finally:
+                instrumentation.sql_finished(connection)
+            self._write_generation += 1
+
+    def data_version(self):
+        """
+        Returns a token that changes whenever the database contents may have changed, whether
+        through this manager's writer or another connection or process.
+        Results read while the token was unchanged can be reused.
+        """
+        with self._watch_lock:
+            if self._watcher is None:
+                self._watcher = self._connect(check_same_thread=False)
+                if self._watcher is None:
+                    raise sqlite3.OperationalError(f"Unable to open database at {self.db_path}")
+            # Same connection every time: data_version is only comparable within one connection
+            external = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+            return self._write_generation, external
+
+    @contextmanager
+    def reader(self):
+        """
+        Yields the calling thread's read connection.
+        Read connections are kept open per thread and never block the writer under WAL.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Only ever used by this thread, but close() may run on another one
+            connection = self._connect(check_same_thread=False)
+            if connection is None:
+                raise sqlite3.OperationalError(f"Unable to open database at {self.db_path}")
+            connection.execute("PRAGMA query_only=ON")
+            self._local.connection = connection
+            with self._readers_lock:
+                self._readers.append(connection)
+        try:
+            yield connection
+        finally:
+            instrumentation.sql_finished(connection)
+
+    def close(self):
+        """
+        Closes the writer and every pooled read connection.
+        Read connections owned by other threads are closed too, so only call this on shutdown
+        or before replacing the database file.
+        """
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._readers_lock:
+            for connection in self._readers:
+                connection.close()
+            self._readers.clear()
+        self._local = threading.local()
+        with self._watch_lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+            # The file may be replaced next, which the new watcher's data_version cannot tell
+            self._write_generation += 1
     
 
-    def _database_exists(self):
+    def _stored_schema_version(self):
         """
-        Checks if the database file exists and has the necessary tables.
+        Returns the schema version of the database, 0 if it predates the Meta table, or None
+        when the file or its TaskLog table is missing.
+        Runs on the pooled read connection, which the caller's later reads reuse, so opening
+        a DatabaseManager costs a single connection.
         """
+        if not os.path.exists(self.db_path):
+            return None
         try:
-            with self._connect() as connection:
-                cursor = connection.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='TaskLog';")
-                return cursor.fetchone() is not None
+            with self.reader() as connection:
+                tables = {name for (name,) in connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name IN ('TaskLog', 'Meta')")}
+                if "TaskLog" not in tables:
+                    return None
+                result = connection.execute("SELECT version FROM Meta").fetchone() if "Meta" in tables else None
+                return result[0] if result else 0
         except sqlite3.Error:
-            return False 
-        
+            return None
 
-    def add_task_entry(self, task: Task):
+
+    def get_schema_version(self):
         """
-        Adds a new task entry to the TaskLog table.
+        Returns the schema version stamped in the Meta table, or 0 for databases that predate it.
+        """
+        try:
+            with self.reader() as connection:
+                result = connection.execute("SELECT version FROM Meta").fetchone()
+                return result[0] if result else 0
+        except sqlite3.Error:
+            return 0
+
+    def get_aggregate_stats(self, table="TaskStats"):
+        """
+        Returns the materialized ROI statistics of one aggregate table (TaskStats, CategoryStats
+        or DailyStats) as a list of (key, entries, roi_sum, roi_sq_sum, roi_min, roi_max, time_total).
+        """
+        key = AGGREGATE_TABLES[table]
+        with self.reader() as connection:
+            return connection.execute(f"SELECT {key}, {STATS_COLUMNS} FROM {table} ORDER BY {key}").fetchall()
+
+    def get_aggregate_keys(self, table="TaskStats"):
+        """
+        Returns the keys of one aggregate table in order: every distinct task or category key
+        (or date) in the history, archived years included, read off the table's primary key.
+        """
+        key = AGGREGATE_TABLES[table]
+        with self.reader() as connection:
+            return [row[0] for row in connection.execute(f"SELECT {key} FROM {table} ORDER BY {key}")]
+
+    @property
+    def has_search_index(self):
+        """
+        Whether the TaskSearch full-text index exists (it is skipped when SQLite lacks FTS5).
+        """
+        if self._has_search_index is None:
+            with self.reader() as connection:
+                cursor = connection.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (SEARCH_TABLE,))
+                self._has_search_index = cursor.fetchone() is not None
+        return self._has_search_index
+
+    def search_entries(self, search_text: str):
+        """
+        Returns the ids of TaskLog rows whose task, category or notes contain `search_text`.
+        """
+        condition, params = search_clause(search_text, self.has_search_index)
+        if condition is None:
+            return []
+        with self.reader() as connection:
+            return [row[0] for row in connection.execute(f"SELECT id FROM TaskLog WHERE {condition} ORDER BY id", params)]
+
+    def row_source(self, connection, date_from=None):
+        """
+        Returns (table, whether the full-text index applies) for a row query on `connection`
+        starting at `date_from`: TaskLog alone unless archived years exist and the window
+        reaches back into them (or has no start), then the TaskHistory view with LIKE search.
+        The archive list is only re-read when the schema changes.
+        """
+        schema_version = connection.execute("PRAGMA schema_version").fetchone()[0]
+        checked_version, archived_through = self._archive_state
+        if schema_version != checked_version:
+            years = archived_years(connection.cursor())
+            archived_through = year_bounds(years[-1])[1] if years else None
+            self._archive_state = (schema_version, archived_through)
+        if archived_through is None or (date_from is not None and date_from > archived_through):
+            return "TaskLog", self.has_search_index
+        return HISTORY_VIEW, False
+
+    def _task_filter(self, task_key, search_text, date_from, date_to, use_fts=None, category_key=None):
+        # WHERE clause shared by the row queries; task_key, category_key and date hit the covering indexes
+        conditions = ["1"]
+        params = []
+        if task_key is not None:
+            conditions.append("task_key = ?")
+            params.append(task_key)
+        if category_key is not None:
+            conditions.append("category_key = ?")
+            params.append(category_key)
+        if date_from is not None:
+            conditions.append("date >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            conditions.append("date <= ?")
+            params.append(date_to)
+        condition, search_params = search_clause(search_text, self.has_search_index if use_fts is None else use_fts)
+        if condition:
+            conditions.append(condition)
+            params.extend(search_params)
+        return " AND ".join(conditions), params
+
+    def _task_query(self, connection, task_key, search_text, date_from, date_to, category_key=None):
+        # (table, WHERE clause, params) of a row query, reading archived years only when the window needs them
+        source, use_fts = self.row_source(connection, date_from)
+        return (source, *self._task_filter(task_key, search_text, date_from, date_to, use_fts, category_key))
+
+    def get_task_entries(self, task_key: str, search_text: str = "", date_from=None, date_to=None):
+        """
+        Returns (task_key, roi, date) rows of one task ordered by date, optionally
+        restricted to entries matching `search_text` and to an inclusive ISO date window.
+        """
+        with self.reader() as connection:
+            source, condition, params = self._task_query(connection, task_key, search_text, date_from, date_to)
+            return connection.execute(f"SELECT task_key, roi, date FROM {source} WHERE {condition} ORDER BY date", params).fetchall()
+
+    @timed("db.get_task_batch")
+    def get_task_batch(self, task_key=None, search_text: str = "", date_from=None, date_to=None,
+                       columns=tuple(TASK_BATCH_COLUMNS), chunk_size: int = 10000) -> TaskBatch:
+        """
+        Loads rows ordered by date as a columnar TaskBatch (all tasks when task_key is None,
+        which with a date window reads through the (date, task_key) index), with the same
+        filters as get_task_entries. Only `columns` are fetched.
+        """
+        with self.reader() as connection:
+            source, condition, params = self._task_query(connection, task_key, search_text, date_from, date_to)
+            cursor = connection.execute(f"SELECT {', '.join(columns)} FROM {source} WHERE {condition} ORDER BY date", params)
+            return TaskBatch.from_cursor(cursor, columns, chunk_size)
+
+    @timed("db.get_task_extent")
+    def get_task_extent(self, task_key: str, search_text: str = "", date_from=None, date_to=None):
+        """
+        Returns (entry count, first date, last date) for the same filters as get_task_entries.
+        """
+        with self.reader() as connection:
+            source, condition, params = self._task_query(connection, task_key, search_text, date_from, date_to)
+            return connection.execute(f"SELECT COUNT(*), MIN(date), MAX(date) FROM {source} WHERE {condition}", params).fetchone()
+
+    @timed("db.get_task_buckets")
+    def get_task_buckets(self, task_key: str, bucket_days: int, search_text: str = "", date_from=None, date_to=None):
         """
-        connection = self._connect()
-        if not connection:
+        Returns one task's entries grouped into buckets of `bucket_days` days, as
+        (first date, last date, entries, roi_min, roi_max, roi_mean) rows ordered by date.
+        Rows whose date cannot be parsed are left out.
+        """
+        with self.reader() as connection:
+            source, condition, params = self._task_query(connection, task_key, search_text, date_from, date_to)
+            return connection.execute(f'''
+                SELECT MIN(date), MAX(date), COUNT(*), MIN(roi), MAX(roi), AVG(roi)
+                FROM {source}
+                WHERE {condition} AND julianday(date) IS NOT NULL
+                GROUP BY CAST(julianday(date) / ? AS INTEGER)
+                ORDER BY 1
+            ''', (*params, bucket_days)).fetchall()
+
+    @timed("db.get_task_stats")
+    def get_task_stats(self, search_text: str = "", date_from=None, date_to=None, category_key=None):
+        """
+        Returns TaskStats rows (see get_aggregate_stats), optionally restricted to tasks
+        with at least one entry matching `search_text`.
+        With a date window or a category the same columns are computed from the entries
+        inside it instead, for the tasks with a matching entry inside it. Either way the
+        search picks tasks; their statistics count all of their entries, matching or not.
+        """
+        with self.reader() as connection:
+            if date_from is None and date_to is None and category_key is None:
+                source, use_fts = self.row_source(connection)
+                condition, params = search_clause(search_text, use_fts)
+                sql = f"SELECT task_key, {STATS_COLUMNS} FROM TaskStats"
+                if condition:
+                    sql += f" WHERE task_key IN (SELECT task_key FROM {source} WHERE {condition})"
+                return connection.execute(sql + " ORDER BY task_key", params).fetchall()
+
+            source, use_fts = self.row_source(connection, date_from)
+            condition, params = self._task_filter(None, "", date_from, date_to, use_fts, category_key)
+            search, search_params = search_clause(search_text, use_fts)
+            if search:
+                condition, params = (f"{condition} AND task_key IN (SELECT task_key FROM {source} WHERE {condition} AND {search})",
+                                     [*params, *params, *search_params])
+            return connection.execute(f'''
+                SELECT task_key, COUNT(*), TOTAL(roi), TOTAL(roi * roi), MIN(roi), MAX(roi), TOTAL(time_investment)
+                FROM {source}
+                WHERE {condition}
+                GROUP BY task_key
+                ORDER BY task_key
+            ''', params).fetchall()
+
+    @timed("db.get_sessions")
+    def get_sessions(self, date_from=None, date_to=None) -> SessionSet:
+        """
+        Loads the start/end times of every entry in an inclusive ISO date window as a SessionSet.
+        Sessions started the day before date_from can run into it past midnight, so that day is read too.
+        """
+        if date_from is not None:
+            date_from = (datetime.strptime(date_from, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+        batch = self.get_task_batch(None, "", date_from, date_to, columns=("id", "date", "start_time", "end_time", "roi"))
+        return SessionSet.from_batch(batch)
+
+    @timed("db.get_daily_stats")
+    def get_daily_stats(self, date_from=None, date_to=None):
+        """
+        Returns DailyStats rows (date, entries, roi_sum, roi_sq_sum, roi_min, roi_max, time_total)
+        in an inclusive ISO date window, ordered by date. Archived years are included.
+        """
+        condition, params = self._task_filter(None, "", date_from, date_to)
+        with self.reader() as connection:
+            return connection.execute(f"SELECT date, {STATS_COLUMNS} FROM DailyStats WHERE {condition} ORDER BY date",
+                                      params).fetchall()
+
+    def get_date_bounds(self):
+        """
+        Returns (first date, last date) over all entries, archived years included,
+        or (None, None) for an empty log. Every bound is an index seek.
+        """
+        with self.reader() as connection:
+            tables = ["TaskLog"] + [archive_table(year) for year in archived_years(connection.cursor())]
+            bounds = [connection.execute(f"SELECT (SELECT MIN(date) FROM {table}), (SELECT MAX(date) FROM {table})").fetchone()
+                      for table in tables]
+        firsts = [first for first, _ in bounds if first is not None]
+        lasts = [last for _, last in bounds if last is not None]
+        return (min(firsts), max(lasts)) if firsts else (None, None)
+
+    def rebuild_aggregates(self):
+        """
+        Recomputes the aggregate tables from every entry, archived years included, in one transaction.
+        """
+        try:
+            with self.writer() as connection:
+                rebuild_aggregates(connection.cursor(), self.row_source(connection)[0])
+            self.logger.info("Rebuilt aggregate tables.")
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"An error occurred while rebuilding the aggregate tables: {e}")
             return False
 
+    @timed("db.add_task_entry")
+    def add_task_entry(self, task: Task):
+        """
+        Adds a new task entry to the TaskLog table.
+        """
         try:
             task.validate()
-            with connection:
+            with self.writer() as connection:
                 cursor = connection.cursor()
-                cursor.execute('''
-                    INSERT INTO TaskLog (date, task, category, time_investment, start_time, end_time, 
-                                            immediate_benefit, future_impact, personal_fulfillment, progress, 
-                                            output_score, roi, notes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (task.to_tuple()))
+                # Takes the write lock up front, see add_task_rows
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(INSERT_TASK_SQL, self.apply_score_model(connection, [task.to_tuple()])[0])
                 return cursor.lastrowid # Returns the last row id as a success indicator
         except sqlite3.Error as e:
             self.logger.error(f"An error occurred while adding the task entry: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def add_task_entries(self, tasks: Iterable[Task], chunk_size: int = 1000):
+        """
+        Adds many task entries to the TaskLog table.
+        Tasks are validated and inserted in chunks of `chunk_size`, each chunk written
+        with executemany inside a single transaction. Invalid tasks are skipped and
+        reported without aborting the rest of the batch.
+        Returns a tuple of (rows inserted, list of (index, error message) failures),
+        where index is the position of the task in `tasks`.
+        """
+        inserted = 0
+        failures = []
+        numbered = enumerate(tasks)
+        while True:
+            chunk = list(islice(numbered, chunk_size))
+            if not chunk:
+                break
+
+            indexes = []
+            rows = []
+            for index, task in chunk:
+                try:
+                    task.validate()
+                except ValueError as e:
+                    failures.append((index, str(e)))
+                    continue
+                indexes.append(index)
+                rows.append(task.to_tuple())
+
+            if not rows:
+                continue
+            try:
+                inserted += self.add_task_rows(rows)
+            except sqlite3.Error as e:
+                self.logger.error(f"An error occurred while adding a chunk of {len(rows)} task entries: {e}")
+                failures.extend((index, str(e)) for index in indexes)
+
+        return inserted, failures
+
+    def add_task_rows(self, rows):
+        """
+        Inserts already scored rows (tuples in INSERT_TASK_SQL column order, see Task.to_tuple)
+        with executemany in a single transaction. Used by the bulk paths, which score rows in
+        batches instead of building a Task per row.
+        Returns the number of rows inserted; sqlite3 errors are raised so the caller can
+        attribute them to the rows of the chunk.
+        """
+        with instrumentation.timer("db.add_task_rows"), self.writer() as connection:
+            # Waits for the write lock under the busy timeout; an implicit (deferred) transaction
+            # could fail at once with "database is locked" while a migration or archive commits batches
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(INSERT_TASK_SQL, self.apply_score_model(connection, rows))
+        instrumentation.observe("db.add_task_rows.rows", len(rows))
+        return len(rows)
+
+    def _active_score_model(self, connection) -> ScoringModel:
+        # The stored settings are authoritative, so a model loaded from a file elsewhere scores the same here
+        row = connection.execute("SELECT value FROM Settings WHERE name = ?", (SCORE_MODEL_SETTING,)).fetchone()
+        if row is None:
+            return SCORING_MODELS[LEGACY_MODEL_KEY]
+        if row[0] != self._score_model[0]:
+            self._score_model = (row[0], ScoringModel.from_dict(json.loads(row[0])))
+        return self._score_model[1]
+
+    def get_score_model(self) -> ScoringModel:
+        """
+        Returns the active scoring model, which new entries are scored with and stamped with.
+        """
+        with self.reader() as connection:
+            return self._active_score_model(connection)
+
+    def set_score_model(self, model: ScoringModel):
+        """
+        Makes `model` the active scoring model for new entries. Existing rows keep their
+        scores until recalculate_scores re-scores them.
+        """
+        with self.writer() as connection:
+            connection.execute('''
+                INSERT INTO Settings (name, value) VALUES (?, ?)
+                ON CONFLICT (name) DO UPDATE SET value = excluded.value
+            ''', (SCORE_MODEL_SETTING, json.dumps(model.to_dict())))
+        self.logger.info(f"Scoring model set to {model.key}.")
+
+    def apply_score_model(self, connection, rows):
+        """
+        Re-scores rows in Task.to_tuple order, which come scored with the legacy model, with
+        the active model of the database in one vectorized pass. Rows the model cannot score
+        (no positive time) keep their legacy scores and stamp.
+        """
+        model = self._active_score_model(connection)
+        if model.key == LEGACY_MODEL_KEY or not rows:
+            return rows
+        columns = list(zip(*rows))
+        output_score, roi = model.score(columns[6], columns[7], columns[8], columns[9], columns[3],
+                                        np.array(columns[15], dtype=float))
+        return [(*row[:10], score, value, *row[12:16], model.key) if np.isfinite(value) else row
+                for row, score, value in zip(rows, output_score.tolist(), roi.tolist())]
+
+    def _rescore_chunk(self, connection, table, last_id, chunk_size, model, force):
+        """
+        Re-scores the next chunk of `table` after `last_id` inside the current write transaction.
+        Returns (last id read, rows updated), or (None, 0) once the table is done.
+        """
+        cursor = connection.cursor()
+        cursor.execute(f'''
+            SELECT id, immediate_benefit, future_impact, personal_fulfillment,
+                   progress, progress_pct, time_investment, output_score, roi, score_model
+            FROM {table} WHERE id > ? {"" if force else "AND score_model IS NOT ?"} ORDER BY id LIMIT ?
+        ''', (last_id, chunk_size) if force else (last_id, model.key, chunk_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return None, 0
+        ids, *numbers, stamps = zip(*rows)
+        immediate, future, fulfillment, progress, progress_pct, time_investment, old_scores, old_rois = (
+            np.array(column, dtype=float) for column in numbers)
+        # Stored progress is already the 1-5 level; progress_pct is NaN for rows logged before it was kept
+        new_scores, new_rois = model.score(immediate, future, fulfillment, progress, time_investment, progress_pct)
+        unchanged = np.isclose(new_scores, old_scores) & np.isclose(new_rois, old_rois) & (np.array(stamps) == model.key)
+        positions = np.flatnonzero(np.isfinite(new_rois) & ~unchanged)
+        if not len(positions):
+            return ids[-1], 0
+
+        # The update triggers re-read min/max for every row (a scan of the row's task and category),
+        # so they are suspended and the aggregate tables rebuilt once the run is done; the marker
+        # has an interrupted run rebuild them when it is resumed
+        cursor.execute("INSERT OR IGNORE INTO Settings (name, value) VALUES (?, 1)", (AGGREGATES_STALE_SETTING,))
+        if table == "TaskLog":
+            suspend_aggregates(cursor)
+        cursor.executemany(f"UPDATE {table} SET output_score = ?, roi = ?, score_model = ? WHERE id = ?",
+                           zip(new_scores[positions].tolist(), new_rois[positions].tolist(),
+                               [model.key] * len(positions), [ids[i] for i in positions]))
+        if table == "TaskLog":
+            resume_aggregates(cursor)
+        return ids[-1], len(positions)
+
+    @timed("db.recalculate_scores")
+    def recalculate_scores(self, chunk_size: int = 10000, model: ScoringModel = None, force: bool = False, progress=None):
+        """
+        Re-scores the whole history (TaskLog and any archived years) with `model`, by default
+        the active one, which it becomes first so entries logged meanwhile are scored with it.
+        Each chunk of `chunk_size` rows is read, scored in one vectorized pass and written back
+        in a single transaction, walking the table in id order, so memory is bounded by the
+        chunk. Rows already stamped with the model are skipped unless `force`, so an
+        interrupted run resumes where it stopped. progress(done, total) follows the rows updated.
+
+        The aggregate tables keep their previous values during the run and are rebuilt at the
+        end, or by the next run when this one is interrupted. Returns the number of rows updated.
+        """
+        model = model or self.get_score_model()
+        updated = 0
+        try:
+            if model.key != self.get_score_model().key:
+                self.set_score_model(model)
+            with self.reader() as connection:
+                tables = ["TaskLog"] + [archive_table(year) for year in archived_years(connection.cursor())]
+                stale, params = ("", ()) if force else (" WHERE score_model IS NOT ?", (model.key,))
+                total = sum(connection.execute(f"SELECT COUNT(*) FROM {table}{stale}", params).fetchone()[0] for table in tables)
+            for table in tables:
+                last_id = 0
+                while last_id is not None:
+                    with self.writer() as connection:
+                        connection.execute("BEGIN IMMEDIATE")
+                        last_id, changed = self._rescore_chunk(connection, table, last_id, chunk_size, model, force)
+                    updated += changed
+                    if progress and changed:
+                        progress(updated, max(total, updated))
+        except sqlite3.Error as e:
+            self.logger.error(f"An error occurred while recalculating scores: {e}")
+        with self.reader() as connection:
+            behind = connection.execute("SELECT 1 FROM Settings WHERE name = ?", (AGGREGATES_STALE_SETTING,)).fetchone()
+        if behind:
+            self.rebuild_aggregates()
+        self.logger.info(f"Recalculated scores with {model.key}, {updated} rows changed.")
+        return updated
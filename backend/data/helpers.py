@@ -1,12 +1,41 @@
-import shutil,sqlite3, logging
+import os, re, sqlite3, logging, time
 
-from dbmanager import DatabaseManager
+from models.task import normalize_key
+from backend.data.dbmanager import DatabaseManager
+from backend.data.dbSetUp import create_indexes, create_settings_table, create_change_counter
+from backend.data.aggregates import create_aggregate_tables, drop_aggregate_triggers
+from backend.data.search import create_search_index, rebuild_search_index
+from backend.data.archive import (ARCHIVE_BATCH_SIZE, HISTORY_VIEW, archive_table, archived_years, year_bounds,
+                                  create_archive_table, create_history_view, move_rows)
+from backend.data.backup import BACKUP_KEEP, BackupError, create_snapshot, assemble_snapshot, default_backup_dir
+
+# Rows copied or backfilled per transaction by the batched migration steps
+MIGRATION_BATCH_SIZE = 5000
+
+# Splits a CREATE INDEX statement into the part before the table name and the part after it
+INDEX_SQL = re.compile(r"(CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?\S+\s+ON\s+)[^\s(]+(.*)",
+                       re.IGNORECASE | re.DOTALL)
+
+# Schema steps in order: (version reached, description, DatabaseHelper method).
+# Add the next step here and bump SCHEMA_VERSION in dbSetUp.
+MIGRATIONS = (
+    (1, "optional extra TaskLog column", "_migrate_v1"),
+    (2, "placeholder TaskLog rebuild, skipped", "_migrate_v2"),
+    (3, "normalized task and category keys", "_migrate_v3"),
+    (4, "ROI aggregate tables", "_migrate_v4"),
+    (5, "full-text search index", "_migrate_v5"),
+    (6, "date index for window queries", "_migrate_v6"),
+    (7, "scoring model and progress percentage per entry", "_migrate_v7"),
+    (8, "count of edited and deleted entries", "_migrate_v8"),
+    (9, "aggregate triggers that can be suspended without schema changes", "_migrate_v9"),
+)
 
 #TODO: Change the methods below to have try blocks so
 # errors can be logged and properly handled
 class DatabaseHelper(DatabaseManager):
-    def __init__(self, logger: logging.Logger, db_path="task_log.db"):
-        super().__init__(logger, db_path)
+    def __init__(self, logger: logging.Logger, db_path=None):
+        # Opens databases of any schema version; migrate_database upgrades them
+        super().__init__(logger, db_path, check_schema=False)
 
     def add_column_if_not_exists(self, table_name, column_name, column_type):
         with self._connect() as connection:
@@ -21,47 +50,204 @@ class DatabaseHelper(DatabaseManager):
                 cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
                 self.logger.info(f"Added column '{column_name}' to '{table_name}' table.")
 
-    def migrate_to_new_table(self):
-        '''#TODO: This is incomplete can essentially just makes a copy of the table'''
-        with self._connect() as connection:
+    def _migration_mark(self, cursor, name):
+        """
+        Returns the last TaskLog id a resumable migration step has committed (0 if it has not started).
+        """
+        cursor.execute("CREATE TABLE IF NOT EXISTS MigrationState (name TEXT PRIMARY KEY, last_id INTEGER NOT NULL)")
+        cursor.execute("INSERT OR IGNORE INTO MigrationState (name, last_id) VALUES (?, 0)", (name,))
+        cursor.execute("SELECT last_id FROM MigrationState WHERE name = ?", (name,))
+        return cursor.fetchone()[0]
+
+    def migration_in_progress(self):
+        """
+        Whether a batched migration step was interrupted and will resume on the next run.
+        """
+        with self.reader() as connection:
+            cursor = connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'MigrationState'")
+            if cursor.fetchone() is None:
+                return False
+            return connection.execute("SELECT 1 FROM MigrationState LIMIT 1").fetchone() is not None
+
+    def run_in_batches(self, name, table, apply_batch, batch_size=MIGRATION_BATCH_SIZE, progress=None):
+        """
+        Calls apply_batch(cursor, low, high) for consecutive id ranges (low, high] of `table`,
+        each range in its own short write transaction so other writers only wait for one batch.
+        The last committed id is kept in MigrationState under `name`, so an interrupted run
+        resumes after it. Rows inserted meanwhile are picked up by later batches.
+        progress(done, total) is called after every batch. Returns the last id processed.
+        """
+        with self.reader() as connection:
+            total = connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        with self.writer() as connection:
+            # Rows handled before an interruption still count towards the progress
+            low = self._migration_mark(connection.cursor(), name)
+            done = connection.execute(f"SELECT COUNT(*) FROM {table} WHERE id <= ?", (low,)).fetchone()[0]
+        while True:
+            with self.writer() as connection:
+                cursor = connection.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                low = self._migration_mark(cursor, name)
+                cursor.execute(f"SELECT COUNT(*), MAX(id) FROM (SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?)",
+                               (low, batch_size))
+                count, high = cursor.fetchone()
+                if not count:
+                    return low
+                apply_batch(cursor, low, high)
+                cursor.execute("UPDATE MigrationState SET last_id = ? WHERE name = ?", (high, name))
+            done += count
+            if progress:
+                progress(done, max(total, done))
+
+    def rebuild_table(self, table, create_sql, batch_size=MIGRATION_BATCH_SIZE, progress=None):
+        """
+        Recreates `table` from `create_sql` (a CREATE TABLE IF NOT EXISTS statement with a
+        {table} placeholder) without blocking writers for the length of the copy.
+
+        Rows are copied into a shadow table in id batches (see run_in_batches), columns the
+        two layouts share are carried over, and triggers mirror updates and deletes of rows
+        that were already copied. The shadow has no indexes while it fills, so every batch
+        only appends. Each index then moves over in its own transaction: the old table's is
+        dropped and the same CREATE INDEX statement builds it on the filled shadow, so the
+        lock is held for one index's sort at a time. The swap (last rows, renames, triggers)
+        is a short exclusive transaction that also recreates the TaskHistory view over the new
+        TaskLog; the old table is then deleted in batches.
+        Safe to call again after an interruption: the copy resumes where it stopped.
+        """
+        shadow = f"{table}_New"
+        retired = f"{table}_Old"
+        # Finish clearing out the previous rebuild's table first, its name is reused
+        self._drop_retired_table(table, batch_size)
+        with self.writer() as connection:
             cursor = connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(create_sql.format(table=shadow))
+            self._migration_mark(cursor, shadow)
+            old_columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+            columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({shadow})") if row[1] in old_columns]
+            column_list = ", ".join(columns)
+            new_values = ", ".join(f"NEW.{column}" for column in columns)
 
-            # Create the new table with updated schema
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS TaskLog_New (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT,
-                    task TEXT,
-                    category TEXT,
-                    time_investment INTEGER,
-                    start_time TEXT,
-                    end_time TEXT,
-                    immediate_benefit INTEGER,
-                    future_impact INTEGER,
-                    personal_fulfillment INTEGER,
-                    progress INTEGER,
-                    output_score REAL,
-                    roi REAL,
-                    notes TEXT,
-                    new_column_name TEXT  -- Example of a new column
-                )
+            copied = f"(SELECT last_id FROM MigrationState WHERE name = '{shadow}')"
+            # Rows past the mark are copied later in their latest state, so only copied rows need mirroring
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{shadow}_update AFTER UPDATE ON {table} BEGIN
+                    DELETE FROM {shadow} WHERE id = OLD.id;
+                    INSERT INTO {shadow} ({column_list}) SELECT {new_values} WHERE NEW.id <= {copied};
+                END
             ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{shadow}_delete AFTER DELETE ON {table} BEGIN
+                    DELETE FROM {shadow} WHERE id = OLD.id;
+                END
+            ''')
+
+        copy_sql = f"INSERT INTO {shadow} ({column_list}) SELECT {column_list} FROM {table} WHERE id > ? AND id <= ? ORDER BY id"
+        self.run_in_batches(shadow, table, lambda cursor, low, high: cursor.execute(copy_sql, (low, high)),
+                            batch_size, progress)
 
-            # Copy data from old table to new table
+        # Index names are unique across the schema, so the old table gives each index up in the
+        # transaction that builds it on the shadow; only the sort of that one index holds the lock
+        with self.reader() as connection:
+            indexes = connection.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? "
+                                         "AND sql IS NOT NULL", (table,)).fetchall()
+        for (name,) in indexes:
+            with self.writer() as connection:
+                cursor = connection.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                row = cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ? AND tbl_name = ?",
+                                     (name, table)).fetchone()
+                if row is None:
+                    continue
+                threads = cursor.execute("PRAGMA threads").fetchone()[0]
+                # The sorter may use a helper thread per core
+                cursor.execute(f"PRAGMA threads={min(os.cpu_count() or 1, 8)}")
+                cursor.execute(f"DROP INDEX {name}")
+                try:
+                    cursor.execute(INDEX_SQL.sub(rf"\g<1>{shadow}\g<2>", row[0], count=1))
+                except sqlite3.OperationalError as e:
+                    self.logger.warning(f"Index {name} does not apply to the new {table} layout and is dropped: {e}")
+                finally:
+                    cursor.execute(f"PRAGMA threads={threads}")
+
+        with self.writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            low = self._migration_mark(cursor, shadow)
+            cursor.execute(f"INSERT INTO {shadow} ({column_list}) SELECT {column_list} FROM {table} WHERE id > ? ORDER BY id", (low,))
+
+            # The old table's triggers are recreated on the new one; they must not fire on the old rows again
+            cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (table,))
+            old_triggers = cursor.fetchall()
+            for name, _ in old_triggers:
+                cursor.execute(f"DROP TRIGGER {name}")
+            triggers = [sql for name, sql in old_triggers if not name.startswith(f"trg_{shadow}_")]
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+            sequence = cursor.fetchone()
+
+            # Dropping a large table walks every page of it, so the old one is only renamed
+            # here and emptied in batches afterwards. In legacy mode the renames leave views and
+            # other tables' triggers naming `table` alone, so they do not follow it to `retired`
+            legacy = cursor.execute("PRAGMA legacy_alter_table").fetchone()[0]
+            cursor.execute("PRAGMA legacy_alter_table=ON")
+            try:
+                cursor.execute(f"ALTER TABLE {table} RENAME TO {retired}")
+                cursor.execute(f"ALTER TABLE {shadow} RENAME TO {table}")
+            finally:
+                cursor.execute(f"PRAGMA legacy_alter_table={legacy}")
+            for sql in triggers:
+                cursor.execute(sql)
+            if table == "TaskLog":
+                # The history view lists TaskLog's columns, which the new layout may have changed
+                create_history_view(cursor)
+
+            if sequence:
+                # Ids of deleted trailing rows are not handed out again
+                cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sequence[0], table))
+            cursor.execute("DELETE FROM MigrationState WHERE name = ?", (shadow,))
+
+        self._drop_retired_table(table, batch_size)
+        self.logger.debug(f"Rebuilt table {table} with the new schema.")
+
+    def _drop_retired_table(self, table, batch_size=MIGRATION_BATCH_SIZE):
+        """
+        Empties the table a rebuild_table swap left behind in id batches, then drops it.
+        """
+        retired = f"{table}_Old"
+        with self.reader() as connection:
+            if connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (retired,)).fetchone() is None:
+                return
+        self.run_in_batches(retired, retired, lambda cursor, low, high: cursor.execute(
+            f"DELETE FROM {retired} WHERE id > ? AND id <= ?", (low, high)), batch_size)
+        with self.writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f"DROP TABLE {retired}")
+            cursor.execute("DELETE FROM MigrationState WHERE name = ?", (retired,))
+
+    def add_normalized_keys(self, batch_size=MIGRATION_BATCH_SIZE, progress=None):
+        """
+        Adds the task_key/category_key columns, backfills them for existing rows in id batches
+        and creates the covering indexes the graph queries rely on.
+        """
+        self.add_column_if_not_exists("TaskLog", "task_key", "TEXT")
+        self.add_column_if_not_exists("TaskLog", "category_key", "TEXT")
+        with self.writer() as connection:
+            # Same normalization as Task, so SQLite's ASCII-only LOWER() is not used
+            connection.create_function("normalize_key", 1, normalize_key, deterministic=True)
+
+        def backfill(cursor, low, high):
             cursor.execute('''
-                INSERT INTO TaskLog_New (id, date, task, category, time_investment, start_time, end_time,
-                                         immediate_benefit, future_impact, personal_fulfillment, progress,
-                                         output_score, roi, notes)
-                SELECT id, date, task, category, time_investment, start_time, end_time,
-                       immediate_benefit, future_impact, personal_fulfillment, progress,
-                       output_score, roi, notes
-                FROM TaskLog
-            ''')
+                UPDATE TaskLog SET task_key = normalize_key(task), category_key = normalize_key(category)
+                WHERE id > ? AND id <= ? AND task_key IS NULL
+            ''', (low, high))
 
-            # Drop the old table and rename the new table
-            cursor.execute("DROP TABLE TaskLog")
-            cursor.execute("ALTER TABLE TaskLog_New RENAME TO TaskLog")
-            self.logger.debug("Migrated data to the new schema successfully.")
+        self.run_in_batches("TaskLog.keys", "TaskLog", backfill, batch_size, progress)
+        with self.writer() as connection:
+            cursor = connection.cursor()
+            create_indexes(cursor)
+            cursor.execute("DELETE FROM MigrationState WHERE name = 'TaskLog.keys'")
+        self.logger.info("Backfilled normalized task and category keys.")
 
     def get_database_version(self):
         with self._connect() as connection:
@@ -80,38 +266,195 @@ class DatabaseHelper(DatabaseManager):
             cursor.execute("INSERT INTO Meta (version) VALUES (?)", (version,))
             self.logger.critical(f"Database version set to {version}.")
 
-    def backup_database(self):
+    def backup_database(self, backup_dir=None, compress=False, incremental=False, keep=BACKUP_KEEP):
+        """
+        Takes an online snapshot into `backup_dir` (backups/ next to the database by default)
+        and rotates old ones. Returns the manifest entry, or None if the backup failed.
+        """
         try:
-            shutil.copy(self.db_path, "task_log_backup.db")
-            self.logger.info("Database backup created successfully.")
-        except IOError as e:
+            start = time.perf_counter()
+            entry = create_snapshot(self.db_path, backup_dir, compress, incremental, keep)
+            self.logger.info(f"Database backup {entry['file']} created ({entry['kind']}, {entry['rows']} rows, "
+                             f"{entry['size'] / 2**20:.1f} MiB) in {time.perf_counter() - start:.2f}s.")
+            return entry
+        except (OSError, sqlite3.Error) as e:
             self.logger.error(f"Error backing up database: {e}")
+            return None
 
-    def restore_database(self, backup_path="task_log_backup.db"):
+    def restore_database(self, snapshot=None, backup_dir=None):
+        """
+        Restores snapshot file `snapshot` (the newest by default) from `backup_dir`.
+        The snapshot chain is verified and assembled next to the database before the live
+        file is replaced, so a bad backup leaves the current database untouched.
+        Returns True if the database was replaced.
+        """
+        backup_dir = backup_dir or default_backup_dir(self.db_path)
+        staged = self.db_path + ".restore"
         try:
-            shutil.copy(backup_path, self.db_path)
-            self.logger.info(f"Database restored successfully from {backup_path}.")
-        except IOError as e:
+            entry = assemble_snapshot(backup_dir, staged, snapshot)
+            # Pooled connections and a stale WAL would otherwise outlive the restored file
+            self.close()
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(self.db_path + suffix):
+                    os.remove(self.db_path + suffix)
+            os.replace(staged, self.db_path)
+            self.logger.info(f"Database restored successfully from {entry['file']}.")
+            return True
+        except (OSError, sqlite3.Error, BackupError) as e:
             self.logger.error(f"Error restoring database: {e}")
+            if os.path.exists(staged):
+                os.remove(staged)
+            return False
+
+    def archive_year(self, year, batch_size=ARCHIVE_BATCH_SIZE, progress=None):
+        """
+        Moves every TaskLog entry dated in `year` into its TaskLog_<year> archive table,
+        `batch_size` rows per write transaction, and adds the table to the TaskHistory view.
+        Entries stay in every all-history query and in the aggregate tables. Entries logged for
+        the year afterwards stay in TaskLog (still found through the view) until it is archived
+        again. Safe to run again after an interruption. Returns the number of entries moved.
+        progress(done, total) is called after every batch.
+        """
+        return self._move_year(year, batch_size, progress, to_archive=True)
+
+    def unarchive_year(self, year, batch_size=ARCHIVE_BATCH_SIZE, progress=None):
+        """
+        Moves the entries of an archived year back into TaskLog and drops its archive table.
+        """
+        return self._move_year(year, batch_size, progress, to_archive=False)
+
+    def _move_year(self, year, batch_size, progress, to_archive):
+        table = archive_table(year)
+        date_from, date_to = year_bounds(year)
+        with self.writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            if not to_archive and year not in archived_years(cursor):
+                self.logger.info(f"{year} is not archived.")
+                return 0
+            if to_archive:
+                create_archive_table(cursor, year)
+            create_history_view(cursor)
+        source = "TaskLog" if to_archive else table
+        with self.reader() as connection:
+            total = connection.execute(f"SELECT COUNT(*) FROM {source} WHERE date >= ? AND date <= ?",
+                                       (date_from, date_to)).fetchone()[0]
+        moved = 0
+        while True:
+            with self.writer() as connection:
+                cursor = connection.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                count = move_rows(cursor, table, date_from, date_to, batch_size, to_archive)
+            if not count:
+                break
+            moved += count
+            if progress:
+                progress(moved, max(total, moved))
+        if not to_archive:
+            with self.writer() as connection:
+                cursor = connection.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                # Only rows whose date was edited out of the year by another tool can be left
+                left = cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                if left:
+                    self.logger.warning(f"{table} keeps {left} entries dated outside {year}.")
+                else:
+                    cursor.execute(f"DROP TABLE {table}")
+                    create_history_view(cursor)
+        self.logger.info(f"{'Archived' if to_archive else 'Restored'} {moved} entries of {year}.")
+        return moved
+
+    def _migrate_v1(self, batch_size, progress, new_column_name):
+        if new_column_name:
+            self.add_column_if_not_exists("TaskLog", new_column_name, "TEXT")
+
+    def _migrate_v2(self, batch_size, progress, new_column_name):
+        # This step once copied TaskLog into the same layout plus an example column, so upgrades
+        # skip it; the version number is kept for databases already stamped with it
+        pass
+
+    def _migrate_v3(self, batch_size, progress, new_column_name):
+        self.add_normalized_keys(batch_size, progress)
+
+    def _migrate_v4(self, batch_size, progress, new_column_name):
+        with self.writer() as connection:
+            cursor = connection.cursor()
+            # The triggers check Settings for their suspend flag
+            create_settings_table(cursor)
+            create_aggregate_tables(cursor)
+        self.rebuild_aggregates()
+
+    def _migrate_v5(self, batch_size, progress, new_column_name):
+        with self.writer() as connection:
+            cursor = connection.cursor()
+            if create_search_index(cursor):
+                rebuild_search_index(cursor)
+            else:
+                self.logger.warning("SQLite was built without FTS5, search will fall back to LIKE scans.")
+
+    def _migrate_v6(self, batch_size, progress, new_column_name):
+        with self.writer() as connection:
+            create_indexes(connection.cursor())
+
+    def _migrate_v7(self, batch_size, progress, new_column_name):
+        # Existing rows were scored with the legacy model; their percentage was never kept
+        with self.writer() as connection:
+            cursor = connection.cursor()
+            create_settings_table(cursor)
+            tables = ["TaskLog"] + [archive_table(year) for year in archived_years(cursor)]
+            for table in tables:
+                cursor.execute(f"PRAGMA table_info({table})")
+                columns = {row[1] for row in cursor.fetchall()}
+                if "progress_pct" not in columns:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN progress_pct REAL")
+                if "score_model" not in columns:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN score_model TEXT NOT NULL DEFAULT 'equal:1'")
+            if len(tables) > 1:
+                create_history_view(cursor)
 
     #TODO: Add functionality to accept type of data 
     # Can make it so that this function is very versitile for updating the database as the code requirements change
-    def migrate_database(self, new_column_name=None):
+    def migrate_database(self, new_column_name=None, batch_size=MIGRATION_BATCH_SIZE, progress=None):
+        """
+        Runs every step of MIGRATIONS above the database's version, in order, stamping the
+        version after each one. progress(version, done, total) reports the batched steps.
+        Returns True once the database is at SCHEMA_VERSION.
+
+        Each step either commits as a whole or works in resumable batches, so a failed or
+        interrupted run is simply run again; restoring the backup would lose entries written
+        while the migration was running. The backup is still taken before a fresh migration.
+        """
         current_version = self.get_database_version()
-        self.backup_database()
+        pending = [migration for migration in MIGRATIONS if migration[0] > current_version]
+        if not pending:
+            return True
+        if not self.migration_in_progress():
+            self.backup_database()
 
-        try:
-            if current_version < 1:
-                if new_column_name:
-                    self.add_column_if_not_exists("TaskLog", new_column_name, "TEXT")
-                self.set_database_version(1)
-                self.logger.info("Migrated to version 1.")
-
-            if current_version < 2:
-                self.migrate_to_new_table()
-                self.set_database_version(2)
-                self.logger.info("Migrated to version 2.")
-        except Exception as e:
-            self.logger.error(f"Migration failed: {e}")
-            self.restore_database()
-            self.logger.info("Database restored to previous state due to migration failure.")
\ No newline at end of file
+        for version, description, step in pending:
+            self.logger.info(f"Migrating to version {version}: {description}.")
+            step_progress = (lambda done, total, version=version: progress(version, done, total)) if progress else None
+            try:
+                getattr(self, step)(batch_size, step_progress, new_column_name)
+            except Exception as e:
+                self.logger.error(f"Migration to version {version} failed: {e}")
+                self.logger.info("Completed steps are kept, running the migration again resumes from here.")
+                return False
+            self.set_database_version(version)
+            self.logger.info(f"Migrated to version {version}.")
+        return True
+
+    def _migrate_v8(self, batch_size, progress, new_column_name):
+        with self.writer() as connection:
+            cursor = connection.cursor()
+            create_settings_table(cursor)
+            for table in ["TaskLog"] + [archive_table(year) for year in archived_years(cursor)]:
+                create_change_counter(cursor, table)
+
+    def _migrate_v9(self, batch_size, progress, new_column_name):
+        # The triggers are created IF NOT EXISTS, so the old ones are dropped to take on the suspend flag
+        with self.writer() as connection:
+            cursor = connection.cursor()
+            create_settings_table(cursor)
+            drop_aggregate_triggers(cursor)
+            create_aggregate_tables(cursor, HISTORY_VIEW if archived_years(cursor) else "TaskLog")
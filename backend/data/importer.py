@@ -0,0 +1,144 @@
+import csv, json, logging, os, sqlite3
+from typing import Iterator
+from models.task import normalize_key
+from models.scoring import score_batch, LEGACY_MODEL_KEY
+from models.sessions import session_minutes
+from backend.data.dbmanager import DatabaseManager
+from backend.data.sessions import check_sessions
+
+# Columns expected in an import file, named after the Task constructor arguments.
+# time_investment is also required unless start_time and end_time give the session's length.
+REQUIRED_FIELDS = ("date", "task")
+
+
+def read_rows(path: str) -> Iterator[tuple[int, dict]]:
+    """
+    Streams (line number, row dict) pairs from a .csv or .jsonl file.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as file:
+        if extension == ".csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+        elif extension in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    # Passed through as-is so the importer reports it as a malformed row
+                    yield line_number, line.strip()
+        else:
+            raise ValueError(f"Unsupported import format '{extension}', expected .csv or .jsonl")
+
+
+def row_values(row: dict) -> tuple:
+    """
+    Parses an imported row into Task constructor values:
+    (date, task, category, time_investment, start_time, end_time,
+     immediate_benefit, future_impact, personal_fulfillment, progress, notes).
+    time_investment is in hours, like the form submits it; when it is missing it is computed
+    from start_time and end_time ("HH:mm", an end before the start runs past midnight).
+    """
+    if not isinstance(row, dict):
+        raise ValueError(f"Malformed row: {row!r:.80}")
+    time_investment = row.get("time_investment")
+    if not time_investment:
+        minutes = session_minutes(row.get("start_time"), row.get("end_time"))
+        time_investment = minutes / 60 if minutes else None
+    missing = [field for field in REQUIRED_FIELDS if not row.get(field)] + ([] if time_investment else ["time_investment"])
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    return (
+        str(row["date"]),
+        str(row["task"]),
+        str(row.get("category") or ""),
+        float(time_investment),
+        str(row.get("start_time") or ""),
+        str(row.get("end_time") or ""),
+        float(row.get("immediate_benefit") or 0),
+        float(row.get("future_impact") or 0),
+        float(row.get("personal_fulfillment") or 0),
+        float(row.get("progress") or 0),
+        str(row.get("notes") or ""),
+    )
+
+
+def score_rows(values: list[tuple]):
+    """
+    Scores parsed rows with the batch engine and builds TaskLog rows in Task.to_tuple order.
+    Returns (rows, list of (position in values, error message) for rows that failed scoring).
+    """
+    date, task, category, time_investment, start_time, end_time, immediate, future, fulfillment, progress, notes = zip(*values)
+    scored = score_batch(immediate, future, fulfillment, progress, time_investment)
+    columns = zip(
+        date, task, category, time_investment, start_time, end_time,
+        scored.immediate_benefit.tolist(), scored.future_impact.tolist(), scored.personal_fulfillment.tolist(),
+        scored.progress.tolist(), scored.output_score.tolist(), scored.roi.tolist(), notes,
+    )
+
+    rows = []
+    failures = []
+    for position, (row, valid) in enumerate(zip(columns, scored.valid.tolist())):
+        if not valid:
+            failures.append((position, scored.error(position)))
+            continue
+        rows.append((*row, normalize_key(row[1]), normalize_key(row[2]), float(progress[position]), LEGACY_MODEL_KEY))
+    return rows, failures
+
+
+def import_file(db_manager: DatabaseManager, path: str, logger: logging.Logger, chunk_size: int = 1000,
+                check_overlaps: bool = True):
+    """
+    Imports a .csv or .jsonl file into the TaskLog table in chunks.
+    Each chunk is scored in one vectorized pass and committed in one transaction.
+    Rows that fail to parse, score or insert are logged with their line number and
+    skipped. Returns a tuple of (rows inserted, list of (line number, error message) failures).
+    With check_overlaps, the sessions of the imported date range (existing entries included)
+    are then checked for overlaps in one sweep, and any found are logged.
+    """
+    inserted = 0
+    failures = []
+    line_numbers = []
+    values = []
+    dates = set()
+
+    def flush():
+        nonlocal inserted
+        dates.update(value[0] for value in values)
+        rows, score_failures = score_rows(values)
+        failures.extend((line_numbers[position], error) for position, error in score_failures)
+        failed = {position for position, _ in score_failures}
+        try:
+            inserted += db_manager.add_task_rows(rows)
+        except sqlite3.Error as e:
+            logger.error(f"An error occurred while adding a chunk of {len(rows)} task entries: {e}")
+            failures.extend((line_number, str(e)) for position, line_number in enumerate(line_numbers) if position not in failed)
+        line_numbers.clear()
+        values.clear()
+
+    for line_number, row in read_rows(path):
+        try:
+            values.append(row_values(row))
+            line_numbers.append(line_number)
+        except (ValueError, TypeError) as e:
+            failures.append((line_number, str(e)))
+        if len(values) >= chunk_size:
+            flush()
+    if values:
+        flush()
+
+    failures.sort()
+    for line_number, error in failures:
+        logger.warning(f"{path}:{line_number} skipped: {error}")
+    logger.info(f"Imported {inserted} task entries from {path} ({len(failures)} failed).")
+    if check_overlaps and inserted:
+        try:
+            check_sessions(db_manager, logger, min(dates), max(dates))
+        except ValueError:
+            # A date that is not YYYY-MM-DD cannot bound the window
+            check_sessions(db_manager, logger)
+    return inserted, failures
@@ -0,0 +1,55 @@
+from bisect import bisect_left, insort
+from typing import Iterable, List, Optional
+from models.task import normalize_key
+
+# Suggestions offered for one prefix at most; a completer popup shows a handful anyway
+COMPLETION_LIMIT = 50
+
+# Sorts after any character a key can contain, so [prefix, prefix + PREFIX_END) spans every key
+# starting with the prefix
+PREFIX_END = "\U0010ffff"
+
+
+class NameIndex:
+    """
+    Sorted set of normalized names (task or category keys) with prefix lookup.
+    Built once from the aggregate tables and kept current by add() as entries are committed,
+    so the task selector and the form's completers never re-scan the task log.
+
+    The keys live in one sorted list: the names starting with a prefix are the contiguous
+    slice between two binary searches, which gives a trie's prefix queries in O(log n)
+    without a node per character. Not thread-safe; it is owned by the GUI thread.
+    """
+    def __init__(self, keys: Iterable[str] = ()):
+        self._keys = sorted(set(keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __getitem__(self, position):
+        return self._keys[position]
+
+    def __contains__(self, key):
+        position = bisect_left(self._keys, key)
+        return position < len(self._keys) and self._keys[position] == key
+
+    def add(self, name: str) -> Optional[int]:
+        """Adds a name (normalized here). Returns its position if it was new, None if already indexed or empty."""
+        key = normalize_key(name)
+        if not key or key in self:
+            return None
+        insort(self._keys, key)
+        return bisect_left(self._keys, key)
+
+    def prefix_range(self, prefix: str):
+        """(start, stop) positions of the keys starting with `prefix` (normalized here)."""
+        key = normalize_key(prefix)
+        return bisect_left(self._keys, key), bisect_left(self._keys, key + PREFIX_END)
+
+    def complete(self, prefix: str, limit: int = COMPLETION_LIMIT) -> List[str]:
+        """Up to `limit` keys starting with `prefix`, in order."""
+        start, stop = self.prefix_range(prefix)
+        return self._keys[start:min(stop, start + limit)]
@@ -0,0 +1,235 @@
+import csv, io, json, math
+from datetime import date as Date
+from typing import Optional
+import numpy as np
+from backend.data.dbmanager import DatabaseManager
+from backend.data.column_store import ColumnarHistory
+from backend.logs.instrumentation import timed
+
+# Streaming ROI report over TaskLog: rows are read with fetchmany (or sliced off a memory-mapped
+# column store) and folded into per-group running sums and quantile sketches, so memory
+# depends on the number of groups, never on the number of rows.
+
+REPORT_GROUPS = ("task", "category", "week")
+REPORT_COLUMNS = ("key", "entries", "mean_roi", "median_roi", "total_hours", "trend_per_week")
+REPORT_CHUNK_SIZE = 50000
+
+# Median error bound of the quantile sketch, relative to the reported value
+SKETCH_ACCURACY = 0.01
+# Sketch bucket indexes are clamped to this range (about 1e-9 to 1e9 at 1% accuracy)
+SKETCH_MAX_BUCKET = 1 << 10
+
+
+class QuantileSketch:
+    """
+    Log-bucketed histogram for quantiles with bounded relative error (DDSketch).
+    A positive value v is counted in bucket ceil(log_gamma(v)), and a quantile is answered
+    with the midpoint of its bucket, which is within `accuracy` of the true value.
+    Negative values use a mirrored set of buckets.
+    """
+    __slots__ = ("gamma", "positive", "negative", "zeros", "count")
+
+    def __init__(self, accuracy=SKETCH_ACCURACY):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add_bucket(self, sign, bucket, count):
+        buckets = self.positive if sign > 0 else self.negative if sign < 0 else None
+        if buckets is None:
+            self.zeros += count
+        else:
+            buckets[bucket] = buckets.get(bucket, 0) + count
+        self.count += count
+
+    def quantile(self, q):
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        ordered = ([(-self._value(bucket), count) for bucket, count in sorted(self.negative.items(), reverse=True)]
+                   + [(0.0, self.zeros)]
+                   + [(self._value(bucket), count) for bucket, count in sorted(self.positive.items())])
+        for value, count in ordered:
+            seen += count
+            if seen > rank:
+                return value
+        return ordered[-1][0]
+
+    def _value(self, bucket):
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+
+
+def sketch_buckets(values, accuracy=SKETCH_ACCURACY):
+    """Vectorized (sign, bucket index) of every value, as QuantileSketch would file it."""
+    log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+    magnitude = np.abs(values)
+    with np.errstate(divide="ignore"):
+        buckets = np.ceil(np.log(np.where(magnitude > 0, magnitude, 1)) / log_gamma)
+    return np.sign(values).astype(np.int64), np.clip(buckets, -SKETCH_MAX_BUCKET, SKETCH_MAX_BUCKET).astype(np.int64)
+
+
+class GroupStats:
+    """
+    Running ROI statistics for every key of one grouping, updated a chunk at a time.
+    Keeps per group: ROI count and sum, hours, the sums for a least-squares ROI trend
+    over time, and a QuantileSketch for the median.
+    """
+    # Columns of `sums`
+    ENTRIES, ROI_SUM, HOURS, DAY_SUM, DAY_SQ_SUM, DAY_ROI_SUM = range(6)
+
+    def __init__(self):
+        self.index = {}
+        self.sums = np.zeros((0, 6))
+        self.sketches = []
+
+    def add(self, keys, days, roi, hours):
+        index = self.index
+        ids = np.fromiter((index.setdefault(key, len(index)) for key in keys), dtype=np.int64, count=len(keys))
+        groups = len(index)
+        if groups > len(self.sums):
+            self.sums = np.vstack([self.sums, np.zeros((groups - len(self.sums), 6))])
+            self.sketches.extend(QuantileSketch() for _ in range(groups - len(self.sketches)))
+
+        self.sums[:, self.HOURS] += np.bincount(ids, weights=np.nan_to_num(hours), minlength=groups)
+        # Rows without a ROI (or date, for the trend) do not count towards those statistics
+        valid = np.isfinite(roi)
+        ids, days, roi = ids[valid], days[valid], roi[valid]
+        self.sums[:, self.ENTRIES] += np.bincount(ids, minlength=groups)
+        self.sums[:, self.ROI_SUM] += np.bincount(ids, weights=roi, minlength=groups)
+        dated = np.isfinite(days)
+        self.sums[:, self.DAY_SUM] += np.bincount(ids[dated], weights=days[dated], minlength=groups)
+        self.sums[:, self.DAY_SQ_SUM] += np.bincount(ids[dated], weights=days[dated] ** 2, minlength=groups)
+        self.sums[:, self.DAY_ROI_SUM] += np.bincount(ids[dated], weights=days[dated] * roi[dated], minlength=groups)
+
+        # One sketch update per distinct (group, sign, bucket) in the chunk instead of per row
+        signs, buckets = sketch_buckets(roi)
+        combined = (ids * 3 + signs + 1) * (4 * SKETCH_MAX_BUCKET) + buckets + 2 * SKETCH_MAX_BUCKET
+        unique, counts = np.unique(combined, return_counts=True)
+        for value, count in zip(unique.tolist(), counts.tolist()):
+            group_sign, bucket = divmod(value, 4 * SKETCH_MAX_BUCKET)
+            group, sign = divmod(group_sign, 3)
+            self.sketches[group].add_bucket(sign - 1, bucket - 2 * SKETCH_MAX_BUCKET, count)
+
+    def rows(self):
+        """One dict per group in REPORT_COLUMNS order, sorted by key."""
+        rows = []
+        for key, group in sorted(self.index.items(), key=lambda item: str(item[0])):
+            entries, roi_sum, hours, day_sum, day_sq_sum, day_roi_sum = self.sums[group].tolist()
+            # Least-squares slope of ROI against the day number, per week
+            spread = entries * day_sq_sum - day_sum ** 2
+            slope = (entries * day_roi_sum - day_sum * roi_sum) / spread * 7 if entries > 1 and spread > 0 else math.nan
+            rows.append({
+                "key": key,
+                "entries": int(entries),
+                "mean_roi": roi_sum / entries if entries else math.nan,
+                "median_roi": self.sketches[group].quantile(0.5),
+                "total_hours": hours,
+                "trend_per_week": slope,
+            })
+        return rows
+
+
+def _date_parts(cache, text):
+    # (days since 1970-01-01, ISO week key) of a date string; there are few distinct dates
+    parts = cache.get(text)
+    if parts is None:
+        try:
+            day = Date.fromisoformat(text)
+            year, week, _ = day.isocalendar()
+            parts = (float(day.toordinal() - 719163), f"{year}-W{week:02d}")
+        except (TypeError, ValueError):
+            parts = (math.nan, "unknown")
+        cache[text] = parts
+    return parts
+
+
+def _sql_chunks(db_manager, chunk_size):
+    # (task keys, category keys, date texts, ROI, hours) of every entry, fetched in chunks
+    with db_manager.reader() as connection:
+        source, _ = db_manager.row_source(connection)
+        cursor = connection.execute(f"SELECT task_key, category_key, date, roi, time_investment FROM {source}")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            task_keys, category_keys, date_texts, roi, hours = zip(*rows)
+            del rows
+            yield task_keys, category_keys, date_texts, np.array(roi, dtype=float), np.array(hours, dtype=float)
+
+
+def _column_chunks(history: ColumnarHistory, chunk_size):
+    # The same chunks sliced off the memory-mapped columns; dates are decoded once per distinct day
+    task_values, category_values = history.values("task_key"), history.values("category_key")
+    for start in range(0, len(history), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        days, inverse = np.unique(history["date"][chunk], return_inverse=True)
+        date_texts = np.array([str(day) for day in days.tolist()] if len(days) else [], dtype=object)[inverse]
+        yield (task_values[history["task_key"][chunk]], category_values[history["category_key"][chunk]], date_texts,
+               history["roi"][chunk], history["time_investment"][chunk])
+
+
+@timed("report.build")
+def build_report(db_manager: DatabaseManager, groups=REPORT_GROUPS, chunk_size=REPORT_CHUNK_SIZE,
+                 history: Optional[ColumnarHistory] = None):
+    """
+    Streams every entry (archived years included) once and returns {grouping: list of row dicts}
+    for each of `groups` ("task", "category" and/or "week").
+    With a memory-mapped `history` (see column_store) the entries are read from it instead of
+    the database; the caller makes sure it is current.
+    """
+    stats = {group: GroupStats() for group in groups}
+    dates = {}
+    chunks = _column_chunks(history, chunk_size) if history is not None else _sql_chunks(db_manager, chunk_size)
+    for task_keys, category_keys, date_texts, roi, hours in chunks:
+        days, weeks = zip(*(_date_parts(dates, text) for text in date_texts))
+        columns = {"task": task_keys, "category": category_keys, "week": weeks}
+        days = np.array(days, dtype=float)
+        for group, group_stats in stats.items():
+            group_stats.add(columns[group], days, roi, hours)
+    return {group: group_stats.rows() for group, group_stats in stats.items()}
+
+
+def _formatted(value):
+    if isinstance(value, float):
+        return "" if math.isnan(value) else f"{value:.3f}"
+    return "" if value is None else str(value)
+
+
+def format_table(report):
+    """Plain-text tables, one per grouping."""
+    output = io.StringIO()
+    for group, rows in report.items():
+        lines = [[group] + list(REPORT_COLUMNS[1:])] + [[_formatted(row[column]) for column in REPORT_COLUMNS] for row in rows]
+        widths = [max(len(line[i]) for line in lines) for i in range(len(REPORT_COLUMNS))]
+        for number, line in enumerate(lines):
+            output.write("  ".join(cell.ljust(width) if i == 0 else cell.rjust(width)
+                                   for i, (cell, width) in enumerate(zip(line, widths))).rstrip() + "\n")
+            if number == 0:
+                output.write("  ".join("-" * width for width in widths) + "\n")
+        output.write("\n")
+    return output.getvalue()
+
+
+def format_csv(report):
+    """One CSV with a leading `grouping` column."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(("grouping",) + REPORT_COLUMNS)
+    for group, rows in report.items():
+        for row in rows:
+            writer.writerow([group] + [_formatted(row[column]) for column in REPORT_COLUMNS])
+    return output.getvalue()
+
+
+def format_json(report):
+    """JSON object of grouping -> rows; missing statistics are null."""
+    def clean(value):
+        return None if isinstance(value, float) and math.isnan(value) else value
+    return json.dumps({group: [{column: clean(row[column]) for column in REPORT_COLUMNS} for row in rows]
+                       for group, rows in report.items()}, indent=2) + "\n"
+
+
+REPORT_FORMATS = {"table": format_table, "csv": format_csv, "json": format_json}
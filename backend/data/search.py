@@ -0,0 +1,86 @@
+import sqlite3
+
+# Full-text index over the searchable TaskLog columns.
+# External content table: the text lives in TaskLog only, TaskSearch stores the trigram index.
+# Triggers keep it in step with TaskLog the same way the aggregate tables are maintained.
+SEARCH_TABLE = "TaskSearch"
+SEARCH_COLUMNS = ("task", "category", "notes")
+
+# Trigrams cannot match anything shorter than three characters
+MIN_MATCH_LENGTH = 3
+
+
+def fts5_available(cursor) -> bool:
+    """
+    Returns True if the linked SQLite library has FTS5 with the trigram tokenizer (3.34+).
+    Probed by creating a throwaway table, since neither shows up reliably in the compile
+    options: FTS5 can be loaded as an extension, and older builds have FTS5 without trigram.
+    """
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp.trigram_probe USING fts5(text, tokenize='trigram')")
+    except sqlite3.OperationalError:
+        return False
+    cursor.execute("DROP TABLE temp.trigram_probe")
+    return True
+
+
+def create_search_index(cursor) -> bool:
+    """
+    Creates the TaskSearch FTS5 table and its sync triggers.
+    Returns False (and creates nothing) when FTS5 is not available.
+    """
+    if not fts5_available(cursor):
+        return False
+
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"NEW.{column}" for column in SEARCH_COLUMNS)
+    old_values = ", ".join(f"OLD.{column}" for column in SEARCH_COLUMNS)
+
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE}
+        USING fts5({columns}, content='TaskLog', content_rowid='id', tokenize='trigram')
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{SEARCH_TABLE}_insert AFTER INSERT ON TaskLog BEGIN
+            INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{SEARCH_TABLE}_delete AFTER DELETE ON TaskLog BEGIN
+            INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{SEARCH_TABLE}_update AFTER UPDATE OF {columns} ON TaskLog BEGIN
+            INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+            INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    ''')
+    return True
+
+
+def rebuild_search_index(cursor):
+    """
+    Re-indexes every TaskLog row.
+    """
+    cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+def search_clause(search_text: str, use_fts: bool):
+    """
+    Returns a (SQL condition on TaskLog, params) pair matching rows whose task, category or
+    notes contain `search_text` (case-insensitive substring), or (None, ()) for an empty search.
+    Uses the trigram index when possible and falls back to LIKE for very short text.
+    """
+    search_text = search_text.strip()
+    if not search_text:
+        return None, ()
+
+    if use_fts and len(search_text) >= MIN_MATCH_LENGTH:
+        # Quoted as a single phrase so FTS5 operators in user input are matched literally
+        phrase = '"' + search_text.replace('"', '""') + '"'
+        return f"id IN (SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH ?)", (phrase,)
+
+    pattern = "%" + search_text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    condition = " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in SEARCH_COLUMNS)
+    return f"({condition})", (pattern,) * len(SEARCH_COLUMNS)
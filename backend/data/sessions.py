@@ -0,0 +1,62 @@
+import csv, io, logging
+from models.sessions import SessionSet, Overlaps, MINUTES_PER_DAY, DENSITY_SLOT_MINUTES, day_numbers
+from backend.data.dbmanager import DatabaseManager
+
+# Overlapping sessions spelled out in the log; the rest are only counted
+OVERLAP_LOG_LIMIT = 20
+
+
+def _clock(minute):
+    minute = int(minute) % MINUTES_PER_DAY
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def describe_overlaps(db_manager: DatabaseManager, sessions: SessionSet, overlaps: Overlaps, limit=OVERLAP_LOG_LIMIT):
+    """
+    One line per overlapping session (the first `limit`), naming both tasks, e.g.
+    "2024-03-02 09:00-10:30 reading overlaps 08:45-09:30 email by 30 min".
+    Task names are looked up by id for the listed sessions only.
+    """
+    shown = list(zip(overlaps.sessions[:limit].tolist(), overlaps.partners[:limit].tolist(), overlaps.minutes[:limit].tolist()))
+    ids = {int(sessions.ids[position]) for pair in shown for position in pair[:2]}
+    names = {}
+    if ids:
+        with db_manager.reader() as connection:
+            source, _ = db_manager.row_source(connection)
+            placeholders = ", ".join("?" * len(ids))
+            names = dict(connection.execute(f"SELECT id, task FROM {source} WHERE id IN ({placeholders})", tuple(ids)))
+    dates = sessions.dates([position for position, _, _ in shown])
+    return [f"{date} {_clock(sessions.start[position])}-{_clock(sessions.end[position])} "
+            f"{names.get(int(sessions.ids[position]), '?')} overlaps {_clock(sessions.start[partner])}-"
+            f"{_clock(sessions.end[partner])} {names.get(int(sessions.ids[partner]), '?')} by {minutes} min"
+            for date, (position, partner, minutes) in zip(dates, shown)]
+
+
+def check_sessions(db_manager: DatabaseManager, logger: logging.Logger, date_from=None, date_to=None,
+                   limit=OVERLAP_LOG_LIMIT) -> Overlaps:
+    """
+    Validates the logged sessions in a date window (all history by default): logs how many
+    entries have no usable time frame and every overlapping session (up to `limit`).
+    """
+    sessions = db_manager.get_sessions(date_from, date_to)
+    overlaps = sessions.overlaps()
+    if date_from is not None:
+        # The day before the window is loaded for sessions past midnight; only those reaching into it count
+        overlaps = overlaps.select(sessions.end[overlaps.sessions] > day_numbers([date_from])[0] * MINUTES_PER_DAY)
+    logger.info(f"{len(sessions)} timed sessions, {sessions.untimed} entries without a time frame, "
+                f"{len(overlaps)} overlapping sessions.")
+    for line in describe_overlaps(db_manager, sessions, overlaps, limit):
+        logger.warning(line)
+    if len(overlaps) > limit:
+        logger.warning(f"... and {len(overlaps) - limit} more overlapping sessions.")
+    return overlaps
+
+
+def format_density_csv(dates, timeline, slot_minutes=DENSITY_SLOT_MINUTES) -> str:
+    """The density timeline as CSV: one row per day, one column per slot named by its start time."""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["date"] + [_clock(slot * slot_minutes) for slot in range(MINUTES_PER_DAY // slot_minutes)])
+    for date, row in zip(dates, timeline):
+        writer.writerow([date] + [f"{value:.4g}" for value in row])
+    return output.getvalue()
@@ -0,0 +1,111 @@
+import queue, sqlite3, threading, time
+from models.task import Task
+from backend.data.dbmanager import DatabaseManager, INSERT_TASK_SQL
+from backend.logs import instrumentation
+
+# Most entries committed together in one transaction
+WRITE_BATCH_SIZE = 500
+
+
+class WriteQueue:
+    """
+    Background writer for task submissions.
+    submit() only enqueues the task and returns a ticket number. A single writer thread
+    takes everything queued at that moment and commits it in one transaction (group commit),
+    then reports back through the callbacks, which run on the writer thread:
+        on_committed(list of (ticket, row id, Task))
+        on_failed(list of (ticket, error message))
+    """
+    def __init__(self, db_manager: DatabaseManager, on_committed=None, on_failed=None, batch_size=WRITE_BATCH_SIZE):
+        self.db_manager = db_manager
+        self.on_committed = on_committed
+        self.on_failed = on_failed
+        self.batch_size = batch_size
+        self.last_commit_ms = None  # Duration of the last group commit
+
+        self._queue = queue.Queue()
+        self._tickets = 0
+        self._tickets_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="TaskWriteQueue", daemon=True)
+        self._thread.start()
+
+    def submit(self, task: Task) -> int:
+        """Queues `task` for writing and returns its ticket number."""
+        with self._tickets_lock:
+            self._tickets += 1
+            ticket = self._tickets
+        self._queue.put((ticket, task))
+        return ticket
+
+    def flush(self):
+        """Blocks until everything submitted so far has been written and reported."""
+        self._queue.join()
+
+    def close(self):
+        """Writes what is still queued, then stops the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # Everything that queued up while the last transaction ran goes into this one
+            while item is not None and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            stop = batch[-1] is None
+            entries = [entry for entry in batch if entry is not None]
+            try:
+                if entries:
+                    self._write(entries)
+            except Exception as e:
+                self.db_manager.logger.error(f"An error occurred in the write queue: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, entries):
+        committed = []
+        failed = []
+        rows = []
+        for ticket, task in entries:
+            try:
+                task.validate()
+                rows.append((ticket, task))
+            except ValueError as e:
+                failed.append((ticket, str(e)))
+
+        if rows:
+            start = time.perf_counter()
+            try:
+                with self.db_manager.writer() as connection:
+                    cursor = connection.cursor()
+                    # Takes the write lock up front, see DatabaseManager.add_task_rows
+                    cursor.execute("BEGIN IMMEDIATE")
+                    scored = self.db_manager.apply_score_model(connection, [task.to_tuple() for _, task in rows])
+                    for (ticket, task), row in zip(rows, scored):
+                        cursor.execute(INSERT_TASK_SQL, row)
+                        # Listeners see the scores as stored under the active model
+                        task.output_score, task.roi = row[10], row[11]
+                        committed.append((ticket, cursor.lastrowid, task))
+            except sqlite3.Error as e:
+                self.db_manager.logger.error(f"An error occurred while adding {len(rows)} queued task entries: {e}")
+                committed = []
+                failed.extend((ticket, str(e)) for ticket, _ in rows)
+            self.last_commit_ms = (time.perf_counter() - start) * 1000
+            instrumentation.record("write_queue.commit", self.last_commit_ms / 1000)
+            instrumentation.observe("write_queue.batch", len(rows))
+
+        if committed:
+            self.db_manager.logger.debug(f"Committed {len(committed)} queued task entries in {self.last_commit_ms:.1f} ms.")
+            if self.on_committed:
+                self.on_committed(committed)
+        if failed and self.on_failed:
+            self.on_failed(failed)
@@ -0,0 +1,206 @@
+import hashlib, json, logging, multiprocessing, os, re, time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import numpy as np
+from matplotlib import dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from backend.data.dbmanager import DatabaseManager
+from backend.graphs.plot_data import PlotData, LOD_POINT_BUDGET, fetch_plot_data
+
+# Headless export of the graph tab's charts to image files, drawn on the Agg backend without Qt:
+# one chart per task (its ROI over time, bucketed like the widget past the point budget) or
+# per category (the all-tasks chart limited to the category's tasks). Charts are spread over
+# worker processes, each with its own read-only connection, and a chart whose data and settings
+# hash to what the previous export wrote (see the manifest) is not drawn again.
+EXPORT_FORMATS = ("png", "svg")
+BY_TASK = "task"
+BY_CATEGORY = "category"
+
+# Kept in the export folder: {file name: {"key": task or category, "hash": content hash}}
+MANIFEST_NAME = "charts.json"
+# Part of every chart's hash, bump it when draw_chart changes so every chart is redrawn once
+CHART_STYLE_VERSION = 1
+CHART_SIZE = (8, 6)  # Inches
+CHART_DPI = 100
+# Charts handed to a worker process at a time
+WORKER_CHUNK_SIZE = 16
+
+
+def draw_chart(figure: Figure, data: PlotData):
+    """
+    Draws `data` on `figure` as GraphWidget shows it: one point per entry, bucket or task,
+    the min-max ROI range as a grey bar, dates on a date axis. Nothing is drawn interactively.
+    """
+    figure.clf()
+    axes = figure.add_subplot(111)
+    if data.selected_task:
+        locator = mdates.AutoDateLocator()
+        axes.xaxis.set_major_locator(locator)
+        axes.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        axes.set_xlabel('Date')
+    else:
+        axes.set_xticks(data.x_values, [name.capitalize() for name in data.x_data])
+        axes.set_xlabel('Task')
+    if len(data.range_low):
+        axes.vlines(data.x_values, np.asarray(data.range_low, dtype=float), np.asarray(data.range_high, dtype=float),
+                    color='gray', alpha=0.6)
+    axes.scatter(data.x_values, data.y_values)
+    if not len(data):
+        axes.text(0.5, 0.5, "No entries", transform=axes.transAxes, ha="center", va="center")
+    axes.set_ylabel('ROI')
+    axes.set_title(data.title)
+    axes.tick_params(axis='x', rotation=45)
+    # Room for the rotated tick labels, which the widget's canvas leaves to the user to resize
+    figure.subplots_adjust(bottom=0.2)
+
+
+def chart_hash(data: PlotData, settings) -> str:
+    """Content hash of a chart: what draw_chart draws from `data` and the file settings."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([CHART_STYLE_VERSION, settings["format"], settings["size"], settings["dpi"],
+                              data.kind, data.title]).encode())
+    digest.update("\x1f".join(map(str, data.x_data)).encode())
+    for values in (data.y_values, data.range_low, data.range_high):
+        digest.update(np.asarray(values, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def chart_file_names(keys, by, fmt):
+    """File name of each key's chart, e.g. "task-deep-work.png"; clashing names get a short hash of the key."""
+    names = {}
+    taken = set()
+    for key in keys:
+        slug = re.sub(r"[^a-z0-9]+", "-", str(key).lower()).strip("-") or "unnamed"
+        name = f"{by}-{slug}.{fmt}"
+        if name in taken:
+            name = f"{by}-{slug}-{hashlib.sha1(str(key).encode()).hexdigest()[:8]}.{fmt}"
+        taken.add(name)
+        names[key] = name
+    return names
+
+
+# Per-process state of the export workers: (read-only DatabaseManager, Figure, settings)
+_worker = None
+
+
+def _init_worker(db_path, settings):
+    global _worker
+    figure = Figure(figsize=settings["size"], dpi=settings["dpi"])
+    FigureCanvasAgg(figure)
+    _worker = (DatabaseManager(logging.getLogger(__name__), db_path, read_only=True), figure, settings)
+
+
+def _close_worker():
+    global _worker
+    if _worker is not None:
+        _worker[0].close()
+        _worker = None
+
+
+def _export_chart(job):
+    """
+    Queries, hashes and (when the hash changed) draws and saves one chart.
+    Returns (key, hash, whether it was drawn, error message or None).
+    """
+    key, path, previous = job
+    db_manager, figure, settings = _worker
+    try:
+        if settings["by"] == BY_TASK:
+            data = fetch_plot_data(db_manager, key, "", settings["date_range"], settings["point_budget"])
+        else:
+            data = fetch_plot_data(db_manager, None, "", settings["date_range"], settings["point_budget"], category=key)
+        digest = chart_hash(data, settings)
+        if digest == previous and os.path.exists(path):
+            return key, digest, False, None
+        draw_chart(figure, data)
+        # Written next to the chart and moved over it, so a failed save keeps the previous image whole
+        partial = path + ".partial"
+        try:
+            figure.savefig(partial, format=settings["format"])
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return key, digest, True, None
+    except Exception as e:
+        return key, None, False, str(e)
+
+
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def export_charts(db_manager: DatabaseManager, out_dir: str, by: str = BY_TASK, fmt: str = "png",
+                  workers: Optional[int] = None, date_range=None, force: bool = False, size=CHART_SIZE,
+                  dpi: int = CHART_DPI, point_budget: int = LOD_POINT_BUDGET):
+    """
+    Exports the chart of every task (or category) to `out_dir` as PNG or SVG and returns
+    counts of {"drawn", "unchanged", "failed", "removed"} charts.
+
+    With more than one worker the charts are drawn in a pool of `workers` processes (all
+    CPUs by default), each reading through its own read-only connection; with one they are
+    drawn in this process. Charts whose content hash matches the manifest of the previous
+    export are skipped unless `force`, and the files of tasks or categories that no longer
+    exist are removed.
+    """
+    if by not in (BY_TASK, BY_CATEGORY):
+        raise ValueError(f"Charts are exported by {BY_TASK} or {BY_CATEGORY}, not {by}.")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Export format must be one of {', '.join(EXPORT_FORMATS)}, got {fmt}.")
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    keys = db_manager.get_aggregate_keys("TaskStats" if by == BY_TASK else "CategoryStats")
+    names = chart_file_names(keys, by, fmt)
+    manifest = _load_manifest(out_dir)
+    jobs = [(key, os.path.join(out_dir, names[key]), None if force else manifest.get(names[key], {}).get("hash"))
+            for key in keys]
+    settings = {"by": by, "format": fmt, "size": list(size), "dpi": dpi, "date_range": date_range,
+                "point_budget": point_budget}
+
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    if workers > 1:
+        # Spawned rather than forked: the parent runs the logging thread and may hold SQLite connections
+        with ProcessPoolExecutor(workers, multiprocessing.get_context("spawn"), _init_worker,
+                                 (db_manager.db_path, settings)) as executor:
+            results = list(executor.map(_export_chart, jobs, chunksize=WORKER_CHUNK_SIZE))
+    else:
+        _init_worker(db_manager.db_path, settings)
+        try:
+            results = [_export_chart(job) for job in jobs]
+        finally:
+            _close_worker()
+
+    counts = {"drawn": 0, "unchanged": 0, "failed": 0, "removed": 0}
+    prefix, suffix = f"{by}-", f".{fmt}"
+    entries = {name: entry for name, entry in manifest.items() if not (name.startswith(prefix) and name.endswith(suffix))}
+    for key, digest, drawn, error in results:
+        if error is not None:
+            counts["failed"] += 1
+            db_manager.logger.error(f"Could not export the chart of {key}: {error}")
+            # The last good chart stays with its entry; its hash no longer matching retries it next time
+            if names[key] in manifest:
+                entries[names[key]] = manifest[names[key]]
+            continue
+        counts["drawn" if drawn else "unchanged"] += 1
+        entries[names[key]] = {"key": key, "hash": digest}
+    # Charts of tasks or categories that are gone
+    current = set(names.values())
+    for name in manifest:
+        if name.startswith(prefix) and name.endswith(suffix) and name not in current:
+            try:
+                os.remove(os.path.join(out_dir, name))
+                counts["removed"] += 1
+            except FileNotFoundError:
+                pass
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as file:
+        json.dump(entries, file, indent=1, sort_keys=True)
+
+    db_manager.logger.info(f"Exported {len(jobs)} {by} charts to {out_dir} in {time.perf_counter() - start:.1f}s "
+                           f"with {workers} process{'es' if workers > 1 else ''}: {counts['drawn']} drawn, "
+                           f"{counts['unchanged']} unchanged, {counts['failed']} failed, {counts['removed']} removed.")
+    return counts
@@ -1,8 +1,33 @@
+import sqlite3, threading, time
+from datetime import date, timedelta
 from PySide6.QtWidgets import QVBoxLayout, QWidget, QComboBox, QLineEdit, QPushButton, QHBoxLayout
+from PySide6.QtCore import QObject, QRunnable, QSignalBlocker, QThreadPool, QTimer, Signal
+import numpy as np
+from matplotlib import dates as mdates
 from matplotlib.figure import Figure
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas, NavigationToolbar2QT
 from backend.data.dbmanager import DatabaseManager
-import mplcursors
+from backend.data.name_index import NameIndex
+from backend.data.search import SEARCH_COLUMNS
+from backend.graphs.plot_data import PlotData, ENTRIES, LOD_POINT_BUDGET, fetch_plot_data
+from backend.graphs.hover import HoverAnnotation
+from backend.graphs.plot_cache import PlotCache
+from backend.logs import instrumentation
+from backend.logs.instrumentation import timed
+
+# Delay after the last keystroke in the search bar before the plot is refreshed
+SEARCH_DEBOUNCE_MS = 200
+# Delay after the last pan/zoom step before the visible date window is re-queried
+ZOOM_DEBOUNCE_MS = 150
+
+# Date windows offered next to the task selector: (label, days up to today, or None for all entries)
+DATE_WINDOWS = (
+    ("All time", None),
+    ("Last 7 days", 7),
+    ("Last 30 days", 30),
+    ("Last 90 days", 90),
+    ("Last 12 months", 365),
+)
 
 class MplCanvas(FigureCanvas):
     def __init__(self, parent=None, width=5, height=4, dpi=100):
@@ -10,17 +35,107 @@ class MplCanvas(FigureCanvas):
         self.axes = fig.add_subplot(111)
         super().__init__(fig)
 
+class PlotWorkerSignals(QObject):
+    finished = Signal(int, object)  # (generation, PlotData)
+    failed = Signal(int, str)       # (generation, error message)
+
+class PlotWorker(QRunnable):
+    """
+    Runs the graph query and data shaping on a QThreadPool thread.
+    Setting `cancelled` aborts the query at the next SQLite progress callback.
+    Exactly one of finished/failed is emitted per run so the widget can release the worker.
+    Results are stored in `cache` (if given) under the data version read before the query.
+    """
+    def __init__(self, db_manager: DatabaseManager, generation: int, selected_task, search_text,
+                 date_range=None, point_budget=LOD_POINT_BUDGET, cache: PlotCache = None):
+        super().__init__()
+        self.db_manager = db_manager
+        self.cache = cache
+        self.generation = generation
+        self.selected_task = selected_task
+        self.search_text = search_text
+        self.date_range = date_range
+        self.point_budget = point_budget
+        self.cancelled = threading.Event()
+        self.signals = PlotWorkerSignals()
+
+    def run(self):
+        # The widget releases the worker on its signal, so one is emitted however the run ends
+        data, error = None, "cancelled"
+        try:
+            if self.cancelled.is_set():
+                return
+            version = self.cache.version() if self.cache else None
+            with self.db_manager.reader() as conn:
+                # Returning non-zero from the progress handler interrupts the running statement
+                conn.set_progress_handler(self.cancelled.is_set, 1000)
+                try:
+                    # The DatabaseManager queries run on this same thread-local reader connection
+                    data = fetch_plot_data(self.db_manager, self.selected_task, self.search_text,
+                                           self.date_range, self.point_budget)
+                finally:
+                    conn.set_progress_handler(None, 0)
+            if self.cache:
+                self.cache.put(self.key, data, version)
+            error = None
+        except sqlite3.Error as e:
+            error = str(e)
+        except Exception as e:
+            # A bug in the data shaping (or an unreadable column store) must not leave the widget waiting
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            if error is None:
+                self.signals.finished.emit(self.generation, data)
+            else:
+                self.signals.failed.emit(self.generation, error)
+
+    @property
+    def key(self):
+        return self.selected_task, self.search_text, self.date_range, self.point_budget
+
 class GraphWidget(QWidget):
-    def __init__(self, db_manager: DatabaseManager, parent=None):
+    def __init__(self, db_manager: DatabaseManager, parent=None, task_names: NameIndex = None):
         super().__init__(parent)
         self.db_manager = db_manager
+        # Task keys in selector order (the selector's row i + 1 is task_names[i]), shared with the form's completer
+        self.task_names = task_names
+
+        # Background refresh state: only the newest request (generation) may paint
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+        self._generation = 0
+        self._workers = {}  # Running or queued workers by generation, kept alive until they report back
+        self._requested_at = None
+        self.last_refresh_latency = None  # Milliseconds from the last input to the painted plot
+        # Query results reused while nothing has been written, e.g. when flipping back to a task
+        self.plot_cache = PlotCache(db_manager)
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.update_plot)
 
-        # Track cursor objects
-        
+        # Level of detail: above point_budget entries a task is drawn as date buckets,
+        # and zooming the date axis re-queries only the visible window.
+        # window is the range picked in the date selector, date_range the one currently queried
+        self.point_budget = LOD_POINT_BUDGET
+        self.window = None
+        self.date_range = None
+        self.zoom_timer = QTimer(self)
+        self.zoom_timer.setSingleShot(True)
+        self.zoom_timer.setInterval(ZOOM_DEBOUNCE_MS)
+        self.zoom_timer.timeout.connect(self._refresh_visible_window)
+        self._setting_limits = False
 
-        self.cursors = []
+        # Retained plot artists, rebuilt only when the view mode changes
+        self.view_mode = None
+        self.scatter = None
+        self.range_lines = None
+        self.hover = None
+        self.plot = None
         self.layout = QVBoxLayout(self)
         self.canvas = MplCanvas(self, width=5, height=4, dpi=100)
+        self.layout.addWidget(NavigationToolbar2QT(self.canvas, self))
         self.layout.addWidget(self.canvas)
 
         # Add a horizontal layout for task selection and search
@@ -31,10 +146,20 @@ class GraphWidget(QWidget):
         self.task_selector.currentIndexChanged.connect(self.update_plot)
         control_layout.addWidget(self.task_selector)
 
+        # Add a dropdown menu for the date window; only entries inside it are loaded
+        self.window_selector = QComboBox(self)
+        for label, _ in DATE_WINDOWS:
+            self.window_selector.addItem(label)
+        self.window_selector.currentIndexChanged.connect(self.update_plot)
+        control_layout.addWidget(self.window_selector)
+
         # Add a search bar for task filtering
         self.search_bar = QLineEdit(self)
-        self.search_bar.setPlaceholderText("Search tasks...")
-        self.search_bar.textChanged.connect(self.update_plot)
+        self.search_bar.setPlaceholderText("Search tasks, categories and notes...")
+        self.search_bar.setToolTip("One task: only its matching entries are shown.\n"
+                                   "All tasks: the tasks with a matching entry in the date range are shown, "
+                                   "with all of their entries.")
+        self.search_bar.textChanged.connect(self.schedule_update)
         control_layout.addWidget(self.search_bar)
 
         # Add a button to clear the search bar
@@ -45,131 +170,231 @@ class GraphWidget(QWidget):
         self.layout.addLayout(control_layout)
 
         self.load_tasks()
-        self.plot_data()
+        self.update_plot()
 
-        
 
+    @timed("plot.load_tasks")
     def load_tasks(self):
-        # Connect to the database and fetch unique task names
-        conn = self.db_manager.get_connection()
-        if conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT DISTINCT task FROM TaskLog;")
-            tasks = cursor.fetchall()
-            conn.close()
-
-            # Use a set to track unique task names
-            unique_tasks = set()
-            for task in tasks:
-                cleaned_task = task[0].strip().lower()
-                unique_tasks.add(cleaned_task.capitalize())
-
-            # Populate the dropdown menu with task names
-            self.task_selector.addItem("All Tasks")
-            for task in sorted(unique_tasks):
-                self.task_selector.addItem(task)
+        # Fill the dropdown menu from the task name index, read off TaskStats when not shared
+        if self.task_names is None:
+            self.task_names = NameIndex(self.db_manager.get_aggregate_keys("TaskStats"))
+        self.task_selector.addItem("All Tasks")
+        self.task_selector.addItems([key.capitalize() for key in self.task_names])
+
+    def add_task_name(self, position):
+        """
+        Inserts the selector row of a task just added to task_names at `position` (as returned
+        by NameIndex.add). The selection and the plot stay as they are.
+        """
+        with QSignalBlocker(self.task_selector):
+            self.task_selector.insertItem(position + 1, self.task_names[position].capitalize())
+
+    def _current_filters(self):
+        row = self.task_selector.currentIndex()
+        selected_task = self.task_names[row - 1] if row > 0 else None
+        search_text = self.search_bar.text()
+        return selected_task, search_text
 
+    def selected_window(self):
+        """The (from, to) ISO dates picked in the date selector, or None for all entries."""
+        days = DATE_WINDOWS[max(self.window_selector.currentIndex(), 0)][1]
+        if days is None:
+            return None
+        today = date.today()
+        return (today - timedelta(days=days - 1)).isoformat(), today.isoformat()
+
+    @timed("plot.plot_data")
     def plot_data(self):
-        selected_task = self.task_selector.currentText().lower() if self.task_selector.currentText() != "All Tasks" else None
-        search_text = self.search_bar.text().lower()
-
-        # Connect to the database and fetch data
-        conn = self.db_manager.get_connection()
-        if conn:
-            cursor = conn.cursor()
-            if selected_task:
-                cursor.execute("SELECT task, roi, date FROM TaskLog WHERE LOWER(task) = ?", (selected_task,))
-            else:
-                cursor.execute("SELECT task, roi, date FROM TaskLog;")
-            data = cursor.fetchall()
-            conn.close()
-
-            # Clear previous cursors
-            for cursor in self.cursors:
-                cursor.remove()
-            self.cursors.clear()
-
-            if selected_task:
-                # Plot data for a specific task over time
-                x_data = []
-                y_data = []
-                labels = []
-                for row in data:
-                    task_name = row[0].strip().lower()
-                    roi = row[1]
-                    date = row[2]
-                    if search_text in task_name:
-                        x_data.append(date)
-                        y_data.append(roi)
-                        labels.append(f"{task_name.capitalize()}: {roi}")
-
-                # Plot each data point as a standalone point
-                scatter = self.canvas.axes.scatter(x_data, y_data)
-
-                # Label the axes
-                self.canvas.axes.set_xlabel('Date')
-                self.canvas.axes.set_ylabel('ROI')
-                self.canvas.axes.set_title(f'Task ROI for {selected_task.capitalize()}')
-
-                # Rotate x-axis labels for better readability
-                self.canvas.axes.tick_params(axis='x', rotation=45)
-
-                # Add hover functionality for individual points
-                cursor = mplcursors.cursor(scatter, hover=True)
-                cursor.connect("add", lambda sel: sel.annotation.set_text(labels[sel.index]))
-                self.cursors.append(cursor)
+        """Query and render synchronously on the calling (GUI) thread."""
+        selected_task, search_text = self._current_filters()
+        self.render(fetch_plot_data(self.db_manager, selected_task, search_text, self.date_range, self.point_budget))
+
+    def _build_axes(self, view_mode):
+        """
+        Recreate the axes artists for a view mode ("task" or "all").
+        Only called when the mode changes; refreshes within a mode reuse the same artists.
+        """
+        axes = self.canvas.axes
+        if self.hover is not None:
+            self.hover.remove()
+        axes.clear()
+
+        # Plot the min-max ROI range of each task or date bucket as a vertical bar
+        self.range_lines = axes.vlines([], [], [], color='gray', alpha=0.6)
+
+        if view_mode == "task":
+            # Dates on a real date axis
+            locator = mdates.AutoDateLocator()
+            axes.xaxis.set_major_locator(locator)
+            axes.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+            # Clearing the axes dropped any earlier callbacks
+            axes.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+            # Label the axes
+            axes.set_xlabel('Date')
+        else:
+            # Label the axes
+            axes.set_xlabel('Task')
+
+        # Plot each data point as a standalone point
+        self.scatter = axes.scatter([], [])
+        axes.set_ylabel('ROI')
+        # Limits are set explicitly from the data in _set_limits
+        axes.set_autoscale_on(False)
+
+        # Rotate x-axis labels for better readability
+        axes.tick_params(axis='x', rotation=45)
+
+        # Add hover functionality for individual points
+        self.hover = HoverAnnotation(self.canvas, axes, lambda index: self.plot.label(index))
+        self.hover.set_collection(self.scatter)
+        self.view_mode = view_mode
+
+    def _set_limits(self, data: PlotData):
+        # Collections are not picked up by relim/autoscale, so limits are set from the data
+        if not len(data):
+            return
+        x_values = data.x_values[np.isfinite(data.x_values)]
+        y_values = np.concatenate([data.y_values, np.asarray(data.range_low, dtype=float), np.asarray(data.range_high, dtype=float)])
+        y_values = y_values[np.isfinite(y_values)]
+        limits = [(y_values, self.canvas.axes.set_ylim, 0.1)]
+        if data.date_range == self.window:
+            # A zoomed window keeps the x limits the user chose
+            limits.append((x_values, self.canvas.axes.set_xlim, 0.5))
+
+        self._setting_limits = True
+        try:
+            for values, set_limits, min_pad in limits:
+                if not len(values):
+                    continue
+                low, high = values.min(), values.max()
+                pad = max((high - low) * 0.05, min_pad)
+                set_limits(low - pad, high + pad)
+        finally:
+            self._setting_limits = False
+
+    def _on_xlim_changed(self, axes):
+        # Pan/zoom on the date axis: re-query the visible window once the user settles
+        if self._setting_limits:
+            return
+        low, high = axes.get_xlim()
+        self.date_range = (mdates.num2date(low).date().isoformat(), mdates.num2date(high).date().isoformat())
+        self.zoom_timer.start()
+
+    def _refresh_visible_window(self):
+        self._start_refresh(self.date_range)
+
+    @timed("plot.render")
+    def render(self, data: PlotData):
+        """Draw prepared plot data. Must run on the GUI thread."""
+        view_mode = "task" if data.selected_task else "all"
+        if view_mode != self.view_mode:
+            self._build_axes(view_mode)
+
+        axes = self.canvas.axes
+        self.plot = data
+        self.scatter.set_offsets(data.offsets)
+        self.range_lines.set_segments([((x, low), (x, high)) for x, low, high in zip(data.x_values, data.range_low, data.range_high)])
+        if view_mode == "all":
+            axes.set_xticks(data.x_values, data.x_data)
+        self._set_limits(data)
+        axes.set_title(data.title)
+        self.hover.set_collection(self.scatter)
+
+        # Coalesced with any other pending paint instead of redrawing immediately
+        self.canvas.draw_idle()
+
+    def append_entries(self, tasks):
+        """
+        Shows newly committed tasks without reloading the plot.
+        Entries of the selected task that pass the current search and date window are added
+        to the drawn points; views that summarize many rows (all tasks, date buckets) are
+        re-queried instead, which only reads the aggregate tables or the index.
+        """
+        selected_task, search_text = self._current_filters()
+        data = self.plot
+        if data is None or data.kind != ENTRIES or data.selected_task != selected_task or self._workers:
+            self._start_refresh(self.date_range)
+            return
+
+        # Same case-insensitive substring match the search query applies
+        needle = search_text.strip().lower()
+        date_from, date_to = self.date_range or (None, None)
+        added = [task for task in tasks
+                 if task.task_key == selected_task
+                 and (not needle or any(needle in (getattr(task, column) or "").lower() for column in SEARCH_COLUMNS))
+                 and (date_from is None or date_from <= task.date)
+                 and (date_to is None or task.date <= date_to)]
+        if not added:
+            return
+        if len(data) + len(added) > self.point_budget:
+            # Crossing the budget switches the view to date buckets
+            self._start_refresh(self.date_range)
+            return
+        data.append([task.date for task in added], [task.roi for task in added])
+        self.render(data)
+
+    def schedule_update(self):
+        """Debounced refresh, restarted on every keystroke."""
+        self._requested_at = time.perf_counter()
+        self.debounce_timer.start()
 
-            else:
-                # Normalize task names to lowercase, strip whitespace, and collect ROI values
-                task_data = {}
-                for row in data:
-                    task_name = row[0].strip().lower()  # Strip whitespace and convert to lowercase
-                    roi = row[1]
-                    if search_text in task_name:
-                        if task_name in task_data:
-                            task_data[task_name].append(roi)
-                        else:
-                            task_data[task_name] = [roi]
-
-                x_data = []
-                y_data = []
-                labels = []
-                avg_x_data = []
-                avg_y_data = []
-                for task_name, rois in task_data.items():
-                    avg_roi = sum(rois) / len(rois)
-                    for roi in rois:
-                        x_data.append(task_name)
-                        y_data.append(roi)
-                        labels.append(f"{task_name.capitalize()}: {roi}\nAverage: {avg_roi:.2f}")
-                    if len(rois) > 1:
-                        avg_x_data.append(task_name)
-                        avg_y_data.append(avg_roi)
-
-                # Plot each data point as a standalone point
-                scatter = self.canvas.axes.scatter(x_data, y_data)
-
-                # Plot average ROI as a black bar
-                self.canvas.axes.scatter(avg_x_data, avg_y_data, color='black', marker='_', s=100)
-
-                # Label the axes
-                self.canvas.axes.set_xlabel('Task')
-                self.canvas.axes.set_ylabel('ROI')
-                self.canvas.axes.set_title('Task ROI')
-
-                # Rotate x-axis labels for better readability
-                self.canvas.axes.tick_params(axis='x', rotation=45)
-
-                # Add hover functionality for individual points
-                cursor = mplcursors.cursor(scatter, hover=True)
-                cursor.connect("add", lambda sel: sel.annotation.set_text(labels[sel.index]))
-                self.cursors.append(cursor)
-
-            self.canvas.draw()
-    
     def update_plot(self):
-        self.canvas.axes.clear()
-        self.plot_data()
+        """Refresh the plot in the background, cancelling any request still in flight."""
+        self.debounce_timer.stop()
+        # New filters show the whole selected window again
+        self.zoom_timer.stop()
+        self.window = self.date_range = self.selected_window()
+        self._start_refresh(self.window)
+
+    def _start_refresh(self, date_range):
+        if self._requested_at is None:
+            self._requested_at = time.perf_counter()
+
+        for worker in self._workers.values():
+            worker.cancelled.set()
+
+        self._generation += 1
+        selected_task, search_text = self._current_filters()
+        worker = PlotWorker(self.db_manager, self._generation, selected_task, search_text, date_range, self.point_budget,
+                            self.plot_cache)
+        try:
+            data = self.plot_cache.get(worker.key)
+        except sqlite3.Error as e:
+            self.db_manager.logger.error(f"An error occurred while checking the plot cache: {e}")
+            data = None
+        if data is not None:
+            # Painted straight away without a round trip through the pool
+            self._on_plot_ready(self._generation, data)
+            return
+
+        worker.signals.finished.connect(self._on_plot_ready)
+        worker.signals.failed.connect(self._on_plot_failed)
+        self._workers[self._generation] = worker
+        self.thread_pool.start(worker)
+
+    def _on_plot_ready(self, generation, data):
+        self._workers.pop(generation, None)
+        # Results of superseded requests are dropped
+        if generation != self._generation:
+            return
+        self.render(data)
+        if self._requested_at is not None:
+            self.last_refresh_latency = (time.perf_counter() - self._requested_at) * 1000
+            self._requested_at = None
+            instrumentation.record("plot.refresh_latency", self.last_refresh_latency / 1000)
+            self.db_manager.logger.debug(f"Plot refreshed {self.last_refresh_latency:.1f} ms after input ({len(data)} points).")
+
+    def _on_plot_failed(self, generation, message):
+        self._workers.pop(generation, None)
+        if generation != self._generation:
+            return
+        self._requested_at = None
+        self.db_manager.logger.error(f"An error occurred while loading the plot data: {message}")
+
+    def wait_for_refresh(self, timeout_ms=-1):
+        """Block until the background refresh finishes (for scripts and benchmarks)."""
+        return self.thread_pool.waitForDone(timeout_ms)
 
     def clear_search(self):
-        self.search_bar.clear()
\ No newline at end of file
+        self.search_bar.clear()
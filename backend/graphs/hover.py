@@ -0,0 +1,98 @@
+import numpy as np
+
+# How close (in pixels) the mouse has to be to a point to show its tooltip
+HOVER_RADIUS_PX = 6
+
+class HoverAnnotation:
+    """
+    Hover tooltip for one scatter collection.
+    The annotation is an animated artist drawn with blitting, so moving the mouse only
+    repaints the saved background plus the tooltip instead of redrawing the whole figure.
+    """
+    def __init__(self, canvas, axes, label_for):
+        self.canvas = canvas
+        self.axes = axes
+        self.label_for = label_for  # Called with a point index, returns the tooltip text
+        self.collection = None
+        self.index = None
+        self.background = None
+        self._pixels = None  # Display coordinates of the points, valid until the next full draw
+
+        self.annotation = axes.annotate(
+            "", xy=(0, 0), xytext=(12, 12), textcoords="offset points",
+            bbox=dict(boxstyle="round", fc="w", alpha=0.9),
+            arrowprops=dict(arrowstyle="->"),
+            animated=True,
+        )
+        self.annotation.set_visible(False)
+
+        self._connections = [
+            canvas.mpl_connect("draw_event", self._on_draw),
+            canvas.mpl_connect("motion_notify_event", self._on_move),
+        ]
+
+    def set_collection(self, collection):
+        self.collection = collection
+        self._pixels = None
+        self.hide()
+
+    def hide(self):
+        if self.annotation.get_visible():
+            self.annotation.set_visible(False)
+            self.index = None
+            self._blit()
+
+    def remove(self):
+        for connection in self._connections:
+            self.canvas.mpl_disconnect(connection)
+        self._connections.clear()
+        # Already gone if the axes were cleared first
+        if self.annotation in self.axes.texts:
+            self.annotation.remove()
+
+    def _on_draw(self, event):
+        # A full redraw happened: save the clean background for later blits
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._pixels = None
+        if self.annotation.get_visible():
+            self.axes.draw_artist(self.annotation)
+
+    def _on_move(self, event):
+        if self.collection is None or event.inaxes is not self.axes:
+            self.hide()
+            return
+
+        index = self._nearest_point(event.x, event.y)
+        if index is None:
+            self.hide()
+            return
+
+        if index == self.index and self.annotation.get_visible():
+            return
+        self.index = index
+        self.annotation.xy = self.collection.get_offsets()[index]
+        self.annotation.set_text(self.label_for(index))
+        self.annotation.set_visible(True)
+        self._blit()
+
+    def _nearest_point(self, x, y):
+        # One vectorized distance pass instead of per-point path containment tests
+        if self._pixels is None:
+            offsets = self.collection.get_offsets()
+            self._pixels = self.axes.transData.transform(offsets) if len(offsets) else np.empty((0, 2))
+        if not len(self._pixels):
+            return None
+        distances = (self._pixels[:, 0] - x) ** 2 + (self._pixels[:, 1] - y) ** 2
+        index = int(np.nanargmin(distances)) if not np.isnan(distances).all() else None
+        if index is None or distances[index] > HOVER_RADIUS_PX ** 2:
+            return None
+        return index
+
+    def _blit(self):
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        if self.annotation.get_visible():
+            self.axes.draw_artist(self.annotation)
+        self.canvas.blit(self.canvas.figure.bbox)
@@ -0,0 +1,120 @@
+import sys, threading
+from collections import OrderedDict
+import numpy as np
+from backend.data.dbmanager import DatabaseManager
+from backend.graphs.plot_data import PlotData
+from backend.logs import instrumentation
+
+# Memory the cached plots may take in total; the least recently used are evicted beyond it
+PLOT_CACHE_BYTES = 32 * 2**20
+
+# Lookups between two hit-rate lines in the debug log
+PLOT_CACHE_LOG_EVERY = 50
+
+
+def plot_data_size(data: PlotData) -> int:
+    """Approximate memory held by a PlotData: its arrays, lists and the strings in them."""
+    size = sys.getsizeof(data)
+    for value in vars(data).values():
+        if isinstance(value, np.ndarray):
+            size += value.nbytes
+        elif isinstance(value, (list, tuple)):
+            size += sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+        else:
+            size += sys.getsizeof(value)
+    return size
+
+
+class PlotCache:
+    """
+    LRU cache of PlotData keyed on the query that produced it
+    (selected task, search text, date window, point budget).
+    Every entry remembers the database data_version() it was read under, and the whole cache
+    is dropped as soon as that token moves, so a hit never shows data older than the last commit.
+    Safe to use from the GUI thread and plot workers at the same time.
+    """
+    def __init__(self, db_manager: DatabaseManager, max_bytes=PLOT_CACHE_BYTES, log_every=PLOT_CACHE_LOG_EVERY):
+        self.db_manager = db_manager
+        self.max_bytes = max_bytes
+        self.log_every = log_every
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.size = 0
+
+        self._entries = OrderedDict()  # key -> (PlotData, size)
+        self._version = None
+        self._lock = threading.Lock()
+
+    def version(self):
+        """The token to pass to put() for data about to be queried."""
+        return self.db_manager.data_version()
+
+    def get(self, key):
+        """Returns the cached PlotData for `key`, or None when it is missing or out of date."""
+        version = self.version()
+        with self._lock:
+            if version != self._version:
+                self._drop_all(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                instrumentation.count("plot.cache.miss")
+            else:
+                self.hits += 1
+                instrumentation.count("plot.cache.hit")
+                self._entries.move_to_end(key)
+            self._log_rate()
+        return entry[0] if entry else None
+
+    def put(self, key, data: PlotData, version):
+        """Caches `data`, unless the database changed since `version` was taken before its query."""
+        size = plot_data_size(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                # Read before the latest commit: never cached
+                if version != self.version():
+                    return
+                self._drop_all(version)
+            previous = self._entries.pop(key, None)
+            if previous:
+                self.size -= previous[1]
+            self._entries[key] = (data, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._drop_all(None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+    def _drop_all(self, version):
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self.size = 0
+        self._version = version
+
+    def _log_rate(self):
+        lookups = self.hits + self.misses
+        if self.log_every and lookups % self.log_every == 0:
+            self.db_manager.logger.debug(
+                f"Plot cache: {self.hits}/{lookups} hits ({self.hits / lookups:.0%}), {len(self._entries)} entries, "
+                f"{self.size / 2**20:.1f} MiB, {self.invalidations} invalidations, {self.evictions} evictions.")
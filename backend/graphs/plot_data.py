@@ -0,0 +1,157 @@
+import math
+from typing import Optional
+import numpy as np
+from matplotlib import dates as mdates
+from backend.data.dbmanager import DatabaseManager
+from backend.data.aggregates import summarize
+from backend.data.column_store import ColumnarHistory
+from backend.logs.instrumentation import timed
+
+# Above this many entries the single-task view is drawn as date buckets instead of points
+LOD_POINT_BUDGET = 2000
+
+# What each point of a PlotData stands for
+ENTRIES = "entries"     # One TaskLog row
+BUCKETS = "buckets"     # A date bucket of one task's rows (level-of-detail view)
+TASKS = "tasks"         # One task's aggregate statistics
+
+
+def date_numbers(dates) -> np.ndarray:
+    """
+    Converts ISO date strings to matplotlib date numbers. Unparseable dates become NaN.
+    """
+    try:
+        return mdates.date2num(np.array(dates, dtype="datetime64[D]"))
+    except ValueError:
+        values = []
+        for date in dates:
+            try:
+                values.append(mdates.date2num(np.datetime64(date, "D")))
+            except ValueError:
+                values.append(np.nan)
+        return np.array(values, dtype=float)
+
+
+class PlotData:
+    """
+    Query results shaped for one plot.
+    Built without touching Qt so it can be prepared on a worker thread, including the
+    numeric x/y columns the widget pushes straight into its existing artists.
+    Hover labels are only formatted for the point that is actually hovered.
+    """
+    def __init__(self, kind, selected_task: Optional[str], x_data, y_data, range_low=None, range_high=None,
+                 counts=None, spreads=None, time_totals=None, end_dates=None, date_range=None, category=None):
+        self.kind = kind
+        self.selected_task = selected_task
+        self.x_data = x_data    # Dates (single task) or task names (all tasks)
+        self.y_data = y_data    # ROI, or mean ROI for buckets and tasks
+        self.range_low = range_low or []
+        self.range_high = range_high or []
+        self.counts = counts or []
+        self.spreads = spreads or []
+        self.time_totals = time_totals or []
+        self.end_dates = end_dates or []
+        self.date_range = date_range  # (from, to) ISO dates when the query was limited to a window
+        self.category = category      # Category the tasks were limited to (all-tasks view)
+
+        # Dates on a real date axis, task names at integer positions with tick labels
+        self.x_values = date_numbers(x_data) if selected_task else np.arange(len(x_data), dtype=float)
+        self.y_values = np.asarray(y_data, dtype=float)
+
+    @property
+    def title(self):
+        if not self.selected_task:
+            return f'Task ROI in {self.category.capitalize()}' if self.category else 'Task ROI'
+        title = f'Task ROI for {self.selected_task.capitalize()}'
+        return title + ' (grouped by date)' if self.kind == BUCKETS else title
+
+    @property
+    def offsets(self):
+        return np.column_stack([self.x_values, self.y_values]) if len(self) else np.empty((0, 2))
+
+    def append(self, dates, rois):
+        """Adds entries to an ENTRIES plot in place, for rows committed after it was queried."""
+        self.x_data = list(self.x_data) + list(dates)
+        self.y_data = np.concatenate([np.asarray(self.y_data, dtype=float), np.asarray(rois, dtype=float)])
+        self.x_values = np.concatenate([self.x_values, date_numbers(dates)])
+        self.y_values = self.y_data
+
+    def label(self, index):
+        """Hover text for one point."""
+        if self.kind == ENTRIES:
+            return f"{self.selected_task.capitalize()}: {self.y_data[index]}"
+        if self.kind == BUCKETS:
+            return (f"{self.selected_task.capitalize()}: {self.counts[index]} entries\n"
+                    f"{self.x_data[index]} to {self.end_dates[index]}\n"
+                    f"Average: {self.y_data[index]:.2f}\n"
+                    f"Range: {self.range_low[index]:.2f} - {self.range_high[index]:.2f}")
+        return (f"{self.x_data[index].capitalize()}\nAverage: {self.y_data[index]:.2f} (±{self.spreads[index]:.2f})\n"
+                f"Range: {self.range_low[index]:.2f} - {self.range_high[index]:.2f}\n"
+                f"Entries: {self.counts[index]}, {self.time_totals[index]:.1f} hrs")
+
+    def __len__(self):
+        return len(self.x_data)
+
+
+def bucket_size(first_date: str, last_date: str, point_budget: int) -> int:
+    """
+    Smallest whole number of days per bucket that keeps the date span within the point budget.
+    """
+    try:
+        span = (np.datetime64(last_date, "D") - np.datetime64(first_date, "D")).astype(int) + 1
+    except ValueError:
+        return 1
+    return max(1, math.ceil(span / point_budget))
+
+
+@timed("plot.fetch")
+def fetch_plot_data(db_manager: DatabaseManager, selected_task: Optional[str], search_text: str,
+                    date_range=None, point_budget: int = LOD_POINT_BUDGET, category: Optional[str] = None,
+                    history: Optional[ColumnarHistory] = None) -> PlotData:
+    """
+    Runs the graph query for the selected task (or all tasks when None, only those of
+    `category` if given) and shapes it for plotting. Search filtering happens in the database,
+    against task, category and notes, and only the entries inside the (optional) inclusive ISO
+    `date_range` are read. A selected task shows only its matching entries; all tasks shows
+    every task with a matching entry in the window, with all of its entries there.
+    A single task with more entries than `point_budget` in the (optional) date window is
+    returned as SQL-aggregated date buckets instead of individual points.
+    Queries go through the calling thread's reader connection. With a memory-mapped `history`
+    (see column_store) that is still current, a task's entries are read from it instead
+    when there is no search text.
+    """
+    if selected_task:
+        date_from, date_to = date_range or (None, None)
+        if history is not None and not search_text.strip() and history.is_current(db_manager):
+            dates, rois = history.task_entries(selected_task, date_from, date_to)
+            if len(dates) <= point_budget:
+                return PlotData(ENTRIES, selected_task, dates, rois, date_range=date_range)
+
+        count, first_date, last_date = db_manager.get_task_extent(selected_task, search_text, date_from, date_to)
+
+        if count > point_budget:
+            bucket_days = bucket_size(first_date, last_date, point_budget)
+            rows = db_manager.get_task_buckets(selected_task, bucket_days, search_text, date_from, date_to)
+            starts, ends, counts, lows, highs, means = (list(column) for column in zip(*rows)) if rows else ([],) * 6
+            return PlotData(BUCKETS, selected_task, starts, means, lows, highs, counts=counts,
+                            end_dates=ends, date_range=date_range)
+
+        # Plot data for a specific task over time, loaded straight into columns
+        batch = db_manager.get_task_batch(selected_task, search_text, date_from, date_to, columns=("date", "roi"))
+        return PlotData(ENTRIES, selected_task, batch["date"], batch["roi"], date_range=date_range)
+
+    # One pre-aggregated row per task instead of every TaskLog entry (grouped in SQL for a date window)
+    date_from, date_to = date_range or (None, None)
+    names, means, spreads, lows, highs, counts, time_totals = [], [], [], [], [], [], []
+    for task_name, entries, roi_sum, roi_sq_sum, roi_min, roi_max, time_total in db_manager.get_task_stats(
+            search_text, date_from, date_to, category):
+        avg_roi, std_roi = summarize(entries, roi_sum, roi_sq_sum)
+        names.append(task_name)
+        means.append(avg_roi)
+        spreads.append(std_roi)
+        lows.append(roi_min)
+        highs.append(roi_max)
+        counts.append(entries)
+        time_totals.append(time_total)
+    return PlotData(TASKS, None, names, means, lows, highs, counts=counts, spreads=spreads, time_totals=time_totals,
+                    date_range=date_range, category=category)
@@ -0,0 +1,305 @@
+import functools, json, math, re, threading, time
+from contextlib import contextmanager
+
+# Process-wide timers, counters and histograms for the hot paths (database calls, scoring,
+# plot queries and drawing). Everything is off until enable() is called; while disabled a
+# @timed function costs one flag check and timer() hands back a shared no-op context.
+# Methods run once per row use @timed_method on an @instrumented class instead: the class
+# keeps the plain method until enable() swaps a timing wrapper in, so they cost nothing when off.
+#
+#     @timed("db.add_task_entry")
+#     def add_task_entry(...): ...
+#
+#     @instrumented
+#     class Metrics:
+#         @timed_method("model.output_score")
+#         def calculate_output_score(self): ...
+#
+#     with timer("plot.render"):
+#         ...
+#
+#     count("plot.cache.hit")
+#     observe("write_queue.batch", len(batch))   # a value rather than a duration
+
+_enabled = False
+_trace_sql = False
+_lock = threading.Lock()
+_histograms = {}
+_values = set()    # Histograms fed through observe() rather than with durations
+_counters = {}
+_pending_sql = {}  # id(connection) -> (statement, start) of the statement running on it
+_swappable = []    # (class, attribute, plain function, timer name) of every @timed_method
+
+# Histogram buckets are quarter powers of two (about 19% wide); zero and below share one bucket
+HISTOGRAM_STEPS_PER_DOUBLING = 4
+
+# SQL statements are grouped by their text with literals and whitespace collapsed, cut to this length
+SQL_KEY_LENGTH = 80
+SQL_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+SQL_SPACE = re.compile(r"\s+")
+
+
+class Histogram:
+    """Count, total, min/max and log-bucketed distribution of observed values."""
+    __slots__ = ("count", "total", "low", "high", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+        self.buckets = {}
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+        bucket = math.floor(math.log2(value) * HISTOGRAM_STEPS_PER_DOUBLING) if value > 0 else -math.inf
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def quantile(self, q):
+        """Upper edge of the bucket holding the q-th value, clamped to the observed range."""
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(max(2 ** ((bucket + 1) / HISTOGRAM_STEPS_PER_DOUBLING), self.low), self.high)
+        return self.high
+
+    def summary(self, scale=1.0):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "total": self.total * scale,
+            "mean": self.total / self.count * scale,
+            "min": self.low * scale,
+            "p50": self.quantile(0.5) * scale,
+            "p95": self.quantile(0.95) * scale,
+            "p99": self.quantile(0.99) * scale,
+            "max": self.high * scale,
+        }
+
+
+def enable(trace_sql=False):
+    """
+    Starts recording. With trace_sql=True, connections opened from now on time every statement
+    (see trace_connection).
+    """
+    global _enabled, _trace_sql
+    _enabled = True
+    _trace_sql = trace_sql
+    for cls, attribute, func, name in _swappable:
+        setattr(cls, attribute, _timing_wrapper(func, name))
+
+
+def disable():
+    global _enabled, _trace_sql
+    _enabled = False
+    _trace_sql = False
+    for cls, attribute, func, _ in _swappable:
+        setattr(cls, attribute, func)
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _values.clear()
+        _counters.clear()
+        _pending_sql.clear()
+
+
+def _add(name, value, is_value=False):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+            if is_value:
+                _values.add(name)
+        histogram.add(value)
+
+
+def record(name, seconds):
+    """Adds one duration to timer `name`."""
+    if _enabled:
+        _add(name, seconds)
+
+
+def observe(name, value):
+    """Adds one value that is not a duration (a batch size, a row count) to histogram `name`."""
+    if _enabled:
+        _add(name, value, is_value=True)
+
+
+def count(name, amount=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+class _NoTimer:
+    # Shared context handed out by timer() while disabled
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def timer(name):
+    """Context manager timing its block under `name`."""
+    return _Timer(name) if _enabled else _NO_TIMER
+
+
+def timed(name):
+    """Decorator timing every call of the function under `name`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _add(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def _timing_wrapper(func, name):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _add(name, time.perf_counter() - start)
+    return wrapper
+
+
+def timed_method(name):
+    """Marks a method of an @instrumented class to be timed under `name` while enabled."""
+    def decorate(func):
+        func.timer_name = name
+        return func
+    return decorate
+
+
+def instrumented(cls):
+    """Class decorator registering its @timed_method methods for swapping by enable()/disable()."""
+    for attribute, func in list(vars(cls).items()):
+        name = getattr(func, "timer_name", None)
+        if name is not None:
+            _swappable.append((cls, attribute, func, name))
+            if _enabled:
+                setattr(cls, attribute, _timing_wrapper(func, name))
+    return cls
+
+
+def sql_key(statement):
+    """Groups statements that only differ in literals and layout."""
+    return "sql: " + SQL_SPACE.sub(" ", SQL_LITERAL.sub("?", statement)).strip()[:SQL_KEY_LENGTH]
+
+
+def trace_connection(connection):
+    """
+    Times the statements of `connection` through sqlite3's trace callback when SQL tracing is on.
+    SQLite only reports when a statement starts, so a statement's time runs until the next one
+    starts on the same connection or until sql_finished(); it includes fetching its rows.
+    """
+    if not _trace_sql:
+        return
+    key = id(connection)
+
+    def traced(statement):
+        now = time.perf_counter()
+        with _lock:
+            previous = _pending_sql.get(key)
+            _pending_sql[key] = (statement, now)
+        if previous:
+            _add(sql_key(previous[0]), now - previous[1])
+
+    connection.set_trace_callback(traced)
+
+
+def sql_finished(connection):
+    """Closes the timing of the last statement traced on `connection`."""
+    if not _trace_sql:
+        return
+    now = time.perf_counter()
+    with _lock:
+        previous = _pending_sql.pop(id(connection), None)
+    if previous:
+        _add(sql_key(previous[0]), now - previous[1])
+
+
+def snapshot():
+    """
+    Everything recorded so far as {"timers": {name: summary in ms}, "values": {name: summary},
+    "counters": {name: count}}.
+    """
+    with _lock:
+        timers = {name: histogram.summary(1000) for name, histogram in _histograms.items() if name not in _values}
+        values = {name: histogram.summary() for name, histogram in _histograms.items() if name in _values}
+        counters = dict(_counters)
+    return {"timers": timers, "values": values, "counters": counters}
+
+
+def summary_line(limit=8):
+    """One line with the busiest timers (by total time) and the counters."""
+    data = snapshot()
+    timers = sorted(data["timers"].items(), key=lambda item: item[1].get("total", 0), reverse=True)[:limit]
+    parts = [f"{name} {stats['count']}x p50 {stats['p50']:.2f}ms p95 {stats['p95']:.2f}ms total {stats['total']:.0f}ms"
+             for name, stats in timers if stats["count"]]
+    parts += [f"{name} {value}" for name, value in sorted(data["counters"].items())]
+    return "Timings: " + ("; ".join(parts) if parts else "nothing recorded")
+
+
+def export_json(path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(snapshot(), file, indent=2)
+
+
+@contextmanager
+def periodic_summary(logger, interval):
+    """Logs summary_line() every `interval` seconds while the block runs, and once at the end."""
+    stop = threading.Event()
+
+    def log_summaries():
+        while not stop.wait(interval):
+            logger.info(summary_line())
+
+    thread = threading.Thread(target=log_summaries, name="InstrumentationSummary", daemon=True)
+    if interval > 0:
+        thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        logger.info(summary_line())
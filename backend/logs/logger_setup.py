@@ -1,19 +1,100 @@
-import logging, sys
-from typing import Literal
+import atexit, json, logging, queue, sys, threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
+# Loggers only put records on a queue; one listener thread formats them and writes every sink,
+# so a log call on the GUI thread never waits on a terminal or a disk.
 
-def GetLogger(name: str, level: Literal[0]) -> logging.Logger:
-    logger = logging.getLogger(__name__)
+LOG_FORMAT = "[%(levelname)s %(filename)s:%(lineno)s - %(funcName)s() ] %(message)s"
+FILE_LOG_FORMAT = "%(asctime)s " + LOG_FORMAT
+
+# Rotating file sinks: size of one file and how many rotated files are kept
+LOG_FILE_MAX_BYTES = 5 * 2**20
+LOG_FILE_BACKUPS = 3
+
+_queue = queue.SimpleQueue()
+_listener = None
+_sink_paths = set()
+_setup_lock = threading.Lock()
+
+# LogRecord attributes every record has; anything else was passed through `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def GetLogger(name: str, level: int = logging.INFO) -> logging.Logger:
+    """
+    Returns logger `name` wired to the shared background queue.
+    Calling it again for the same name only updates the level; no second handler is added.
+    """
+    logger = logging.getLogger(name)
     logger.setLevel(level)
-    stream_handler = logging.StreamHandler(sys.stdout)
-    formatter = ColoredFormatter(
-        "[%(levelname)s %(filename)s:%(lineno)s - %(funcName)s() ] %(message)s"
-    )
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
+    if not any(isinstance(handler, DeferredQueueHandler) for handler in logger.handlers):
+        logger.addHandler(DeferredQueueHandler(_queue))
+        # Records are written by the listener's sinks only, not again by ancestor handlers
+        logger.propagate = False
+    _start_listener()
     return logger
 
 
+def add_log_sinks(log_file=None, json_file=None, max_bytes=LOG_FILE_MAX_BYTES, backups=LOG_FILE_BACKUPS):
+    """
+    Also writes every record to a rotating text log and/or a rotating JSON-lines log.
+    A path that is already a sink is not added twice.
+    """
+    handlers = []
+    with _setup_lock:
+        for path, formatter in ((log_file, logging.Formatter(FILE_LOG_FORMAT)), (json_file, JsonLinesFormatter())):
+            if path and path not in _sink_paths:
+                handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+                handler.setFormatter(formatter)
+                handlers.append(handler)
+                _sink_paths.add(path)
+    if handlers:
+        listener = _start_listener()
+        # The listener thread reads this tuple per record, so swapping it in is safe while running
+        listener.handlers = listener.handlers + tuple(handlers)
+
+
+def stop_logging():
+    """Writes out everything still queued and stops the listener thread (also run at exit)."""
+    global _listener
+    with _setup_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.flush()
+            if isinstance(handler, logging.FileHandler):
+                handler.close()
+        _sink_paths.clear()
+
+
+def _start_listener():
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            console = logging.StreamHandler(sys.stdout)
+            console.setFormatter(ColoredFormatter(LOG_FORMAT))
+            _listener = QueueListener(_queue, console, respect_handler_level=True)
+            _listener.start()
+        return _listener
+
+
+atexit.register(stop_logging)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queues records as they are, instead of formatting them on the logging thread the way
+    QueueHandler does. Only the message arguments are merged, so later changes to the
+    objects passed in cannot alter a record that is still waiting in the queue.
+    """
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 class ColoredFormatter(logging.Formatter):
     COLORS = {
         "DEBUG": "\033[94m",  # Blue
@@ -27,4 +108,23 @@ class ColoredFormatter(logging.Formatter):
     def format(self, record):
         log_message = super().format(record)
         color = self.COLORS.get(record.levelname, self.COLORS["RESET"])
-        return f"{color}{log_message}{self.COLORS['RESET']}"
\ No newline at end of file
+        return f"{color}{log_message}{self.COLORS['RESET']}"
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, including any fields passed with `extra=`."""
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "file": record.filename,
+            "line": record.lineno,
+            "function": record.funcName,
+            "thread": record.threadName,
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
@@ -0,0 +1,74 @@
+"""
+Backup duration and writer stall time on a large database while another connection keeps
+submitting tasks: the previous checkpoint + file copy against the backup API snapshots.
+
+Run from the project root:
+    python -m benchmarks.bench_backup --rows 1000000
+"""
+import argparse, logging, os, shutil, tempfile, threading, time
+
+from backend.data.dbmanager import DatabaseManager
+from backend.data.helpers import DatabaseHelper
+from benchmarks.bench_bulk_insert import make_tasks
+
+
+def insert_continuously(db_path, stop, samples):
+    # (finish time, latency) of every insert, so stalls can be attributed to a backup window
+    db_manager = DatabaseManager(logging.getLogger("bench"), db_path)
+    for task in make_tasks(10**9, seed=1):
+        if stop.is_set():
+            break
+        start = time.perf_counter()
+        db_manager.add_task_entry(task)
+        end = time.perf_counter()
+        samples.append((end, end - start))
+        time.sleep(0.005)
+    db_manager.close()
+
+
+def copy_file_backup(helper, folder):
+    # The previous backup_database: checkpoint through the writer, then copy the file
+    with helper.writer() as connection:
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    shutil.copy(helper.db_path, os.path.join(folder, "task_log_backup.db"))
+
+
+def measure(label, samples, backup):
+    time.sleep(0.5)
+    start = time.perf_counter()
+    size = backup()
+    end = time.perf_counter()
+    time.sleep(0.1)
+    stalls = [latency for finished, latency in samples if start <= finished <= end + 0.1]
+    print(f"{label:<28} {end - start:7.2f}s  {size / 2**20:8.1f} MiB  "
+          f"inserts {len(stalls):5}  max insert {max(stalls, default=0) * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, "bench.db")
+        backup_dir = os.path.join(folder, "backups")
+        helper = DatabaseHelper(logging.getLogger("bench"), db_path)
+        helper.add_task_entries(make_tasks(args.rows), chunk_size=50000)
+
+        stop = threading.Event()
+        samples = []
+        inserter = threading.Thread(target=insert_continuously, args=(db_path, stop, samples))
+        inserter.start()
+
+        measure("checkpoint + file copy", samples,
+                lambda: copy_file_backup(helper, folder) or os.path.getsize(os.path.join(folder, "task_log_backup.db")))
+        measure("snapshot (full)", samples, lambda: helper.backup_database(backup_dir, keep=0)["size"])
+        measure("snapshot (full, gzip)", samples, lambda: helper.backup_database(backup_dir, compress=True, keep=0)["size"])
+        measure("snapshot (incremental)", samples, lambda: helper.backup_database(backup_dir, incremental=True, keep=0)["size"])
+
+        stop.set()
+        inserter.join()
+        start = time.perf_counter()
+        restored = helper.restore_database(backup_dir=backup_dir)
+        print(f"verified restore of the incremental chain: {restored} in {time.perf_counter() - start:.2f}s")
+        helper.close()
@@ -0,0 +1,57 @@
+"""
+Compares rows/sec of the single-row add_task_entry path against add_task_entries.
+
+Run from the project root:
+    python -m benchmarks.bench_bulk_insert --rows 20000
+"""
+import argparse, logging, os, random, tempfile, time
+
+from models.task import Task
+from backend.data.dbmanager import DatabaseManager
+
+
+def make_tasks(count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield Task(
+            date=f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            task=f"task {i % 50}",
+            category=f"category {i % 7}",
+            time_investment=rng.randint(10, 240) / 60,
+            start_time="09:00",
+            end_time="10:00",
+            immediate_benefit=rng.randint(0, 5),
+            future_impact=rng.randint(0, 5),
+            personal_fulfillment=rng.randint(0, 5),
+            progress=rng.randint(0, 100),
+        )
+
+
+def bench(label, rows, insert):
+    with tempfile.TemporaryDirectory() as folder:
+        logger = logging.getLogger("bench")
+        db_manager = DatabaseManager(logger, os.path.join(folder, "bench.db"))
+        tasks = list(make_tasks(rows))
+        start = time.perf_counter()
+        insert(db_manager, tasks)
+        elapsed = time.perf_counter() - start
+    print(f"{label:<24} {rows:>8} rows  {elapsed:8.3f}s  {rows / elapsed:12,.0f} rows/sec")
+
+
+def single_row(db_manager, tasks):
+    for task in tasks:
+        db_manager.add_task_entry(task)
+
+
+def bulk(db_manager, tasks):
+    db_manager.add_task_entries(tasks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    # The single-row path fsyncs per row, so keep its sample smaller
+    bench("add_task_entry", min(args.rows, 2000), single_row)
+    bench("add_task_entries", args.rows, bulk)
@@ -0,0 +1,94 @@
+"""
+Full-history loads from the memory-mapped column store (backend.data.column_store) against
+the SQL fetch they replace: every entry as columns (get_task_batch), the streaming report,
+and one task's entries for the graph. Also times the initial export, an incremental sync
+after appending rows, and prints the store's size next to the database's.
+
+Loads from the store are timed right after opening it, so they include mapping the files
+and touching every page they read; the files are in the page cache either way, as the
+database pages are after the first SQL pass.
+
+Run from the project root:
+    python -m benchmarks.bench_columns --rows 1000000
+"""
+import argparse, logging, os, tempfile, time
+
+import numpy as np
+
+from backend.data.dbmanager import DatabaseManager
+from backend.data.column_store import ColumnStore
+from backend.data.report import build_report
+from backend.graphs.plot_data import fetch_plot_data
+from benchmarks.synthetic import SyntheticHistory
+
+# Columns loaded by both sides of the full-history comparison
+LOAD_COLUMNS = ("date", "task_key", "category_key", "time_investment", "output_score", "roi")
+
+
+def best_of(run, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def sql_load(db_manager):
+    batch = db_manager.get_task_batch(columns=LOAD_COLUMNS)
+    return float(np.nansum(batch["roi"])), len(batch["task_key"])
+
+
+def store_load(store):
+    history = store.open()
+    # Decoded the way the SQL batch holds them, so both sides end with the same columns
+    return (float(np.nansum(history["roi"])) + float(np.nansum(history["time_investment"])) +
+            float(np.nansum(history["output_score"])), len(history.strings("task_key")),
+            len(history.strings("category_key")), len(history["date"]))
+
+
+def folder_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--append", type=int, default=1000, help="Rows added before the incremental sync")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, "bench.db")
+        db_manager = DatabaseManager(logging.getLogger("bench"), db_path)
+        history = SyntheticHistory(args.rows, tasks=500)
+        history.populate(db_manager)
+        store = ColumnStore(os.path.join(folder, "columns"))
+
+        start = time.perf_counter()
+        store.sync(db_manager)
+        print(f"{args.rows} rows; initial export {time.perf_counter() - start:.1f}s, "
+              f"store {folder_size(store.path) / 2**20:.0f} MiB, database {os.path.getsize(db_path) / 2**20:.0f} MiB")
+
+        more = SyntheticHistory(args.append, tasks=500, start="2026-01-01", days=30, seed=1)
+        more.populate(db_manager)
+        start = time.perf_counter()
+        written = store.sync(db_manager)
+        print(f"incremental sync of {written} rows: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        task = history.task_name(0)
+        opened = store.open()
+        cases = (
+            ("full history, columns", lambda: sql_load(db_manager), lambda: store_load(store)),
+            ("report (task, category, week)", lambda: build_report(db_manager),
+             lambda: build_report(db_manager, history=store.open())),
+            (f"graph entries of {task!r}, 1 year",
+             lambda: fetch_plot_data(db_manager, task, "", ("2020-01-01", "2020-12-31"), 10**9),
+             lambda: fetch_plot_data(db_manager, task, "", ("2020-01-01", "2020-12-31"), 10**9, history=opened)),
+        )
+        print(f"{'':<32} {'SQL':>9} {'columns':>9} {'speed-up':>9}")
+        for name, sql, columns in cases:
+            sql_time = best_of(sql, args.repeat)
+            column_time = best_of(columns, args.repeat)
+            print(f"{name:<32} {sql_time * 1000:7.0f}ms {column_time * 1000:7.0f}ms {sql_time / column_time:8.1f}x", flush=True)
+        db_manager.close()
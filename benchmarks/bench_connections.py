@@ -0,0 +1,75 @@
+"""
+Micro-benchmark of open/insert/query latency for a connection per operation in the
+default rollback journal (the previous behaviour) against the pooled WAL connections.
+
+Run from the project root:
+    python -m benchmarks.bench_connections --ops 500
+"""
+import argparse, logging, os, sqlite3, tempfile, time
+
+from backend.data.dbmanager import DatabaseManager, INSERT_TASK_SQL
+from backend.data.dbSetUp import initialize_database
+from benchmarks.bench_bulk_insert import make_tasks
+
+QUERY_SQL = "SELECT task, roi, date FROM TaskLog WHERE LOWER(task) = ?"
+
+
+def timed(ops, operation):
+    start = time.perf_counter()
+    for i in range(ops):
+        operation(i)
+    return (time.perf_counter() - start) / ops * 1e6
+
+
+def report(label, open_us, insert_us, query_us):
+    print(f"{label:<28} open {open_us:9.1f}us  insert {insert_us:9.1f}us  query {query_us:9.1f}us")
+
+
+def bench_per_operation(folder, ops, tasks):
+    db_path = os.path.join(folder, "per_operation.db")
+    initialize_database(db_path)
+
+    def open_close(_):
+        sqlite3.connect(db_path).close()
+
+    def insert(i):
+        connection = sqlite3.connect(db_path)
+        with connection:
+            connection.execute(INSERT_TASK_SQL, tasks[i].to_tuple())
+        connection.close()
+
+    def query(i):
+        connection = sqlite3.connect(db_path)
+        connection.execute(QUERY_SQL, (f"task {i % 50}",)).fetchall()
+        connection.close()
+
+    report("connection per operation", timed(ops, open_close), timed(ops, insert), timed(ops, query))
+
+
+def bench_pooled(folder, ops, tasks):
+    db_manager = DatabaseManager(logging.getLogger("bench"), os.path.join(folder, "pooled.db"))
+
+    def open_reader(_):
+        with db_manager.reader():
+            pass
+
+    def insert(i):
+        db_manager.add_task_entry(tasks[i])
+
+    def query(i):
+        with db_manager.reader() as connection:
+            connection.execute(QUERY_SQL, (f"task {i % 50}",)).fetchall()
+
+    report("pooled WAL connections", timed(ops, open_reader), timed(ops, insert), timed(ops, query))
+    db_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=500)
+    args = parser.parse_args()
+
+    tasks = list(make_tasks(args.ops))
+    with tempfile.TemporaryDirectory() as folder:
+        bench_per_operation(folder, args.ops, tasks)
+        bench_pooled(folder, args.ops, tasks)
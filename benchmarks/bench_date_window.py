@@ -0,0 +1,88 @@
+"""
+Date-window queries at 1M and 10M entries spread over ten years: without the (date, task_key)
+index, with it, and with every year but the last moved into archive tables so TaskLog only
+holds the current year. Windows end at the newest entry, the way the graph's date selector
+asks for them.
+
+Rows are generated inside SQLite with the triggers dropped (see bench_report). Run from the
+project root:
+    python -m benchmarks.bench_date_window --rows 1000000 10000000
+"""
+import argparse, logging, os, statistics, tempfile, time
+from datetime import date, timedelta
+
+from backend.data.helpers import DatabaseHelper
+from benchmarks.bench_report import grow
+
+WINDOWS = (7, 30, 365)
+
+
+def median_ms(run, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def window(last, days):
+    end = date.fromisoformat(last)
+    return (end - timedelta(days=days - 1)).isoformat(), end.isoformat()
+
+
+def queries(helper, last):
+    cases = [("date bounds", lambda: helper.get_date_bounds())]
+    for days in WINDOWS:
+        date_from, date_to = window(last, days)
+        cases += [
+            (f"all tasks, {days}d stats", lambda f=date_from, t=date_to: helper.get_task_stats("", f, t)),
+            (f"all tasks, {days}d rows", lambda f=date_from, t=date_to: helper.get_task_batch(None, "", f, t, columns=("date", "roi"))),
+            (f"one task, {days}d rows", lambda f=date_from, t=date_to: helper.get_task_batch("task 7", "", f, t, columns=("date", "roi"))),
+        ]
+    return cases
+
+
+def run_setup(label, helper, last, repeats, results):
+    with helper.reader() as connection:
+        hot = connection.execute("SELECT COUNT(*) FROM TaskLog").fetchone()[0]
+    print(f"  {label} (TaskLog holds {hot} rows)")
+    for name, run in queries(helper, last):
+        run()  # Warm the page cache
+        results.setdefault(name, []).append(median_ms(run, repeats))
+        print(f"    {name:<24} {results[name][-1]:9.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000, 10000000])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=100000, help="Rows moved per transaction when archiving")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as folder:
+            helper = DatabaseHelper(logging.getLogger("bench"), os.path.join(folder, "bench.db"))
+            grow(helper, rows)
+            first, last = helper.get_date_bounds()
+            print(f"{rows} rows, {first} to {last}")
+            results = {}
+
+            with helper.writer() as connection:
+                connection.execute("DROP INDEX idx_tasklog_date")
+            run_setup("without the date index", helper, last, args.repeats, results)
+
+            with helper.writer() as connection:
+                connection.execute("CREATE INDEX idx_tasklog_date ON TaskLog (date, task_key)")
+            run_setup("date index", helper, last, args.repeats, results)
+
+            start = time.perf_counter()
+            for year in range(int(first[:4]), int(last[:4])):
+                helper.archive_year(year, args.batch_size)
+            print(f"  archived {int(last[:4]) - int(first[:4])} years in {time.perf_counter() - start:.1f}s")
+            run_setup("archived years", helper, last, args.repeats, results)
+
+            print(f"  {'':<24} {'no index':>10} {'index':>10} {'archived':>10}")
+            for name, (plain, indexed, archived) in results.items():
+                print(f"  {name:<24} {plain:8.2f}ms {indexed:8.2f}ms {archived:8.2f}ms")
+            helper.close()
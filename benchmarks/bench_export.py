@@ -0,0 +1,51 @@
+"""
+Batch chart export (backend.graphs.export): time to draw one chart per task for a synthetic
+history of --tasks tasks, in-process and with a pool of worker processes, then the re-run in
+which every chart is unchanged and only queried and hashed. The speed-up of the pool is
+bounded by the CPU count printed in the header.
+
+Run from the project root:
+    python -m benchmarks.bench_export --rows 200000 --tasks 1000 --workers 1 4
+"""
+import argparse, logging, os, shutil, tempfile, time
+
+from backend.data.dbmanager import DatabaseManager
+from backend.graphs.export import export_charts
+from benchmarks.synthetic import SyntheticHistory
+
+
+def export(db_manager, folder, fmt, workers, force):
+    start = time.perf_counter()
+    counts = export_charts(db_manager, folder, fmt=fmt, workers=workers, force=force)
+    return time.perf_counter() - start, counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--format", default="png", choices=["png", "svg"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="Process counts to time, 1 draws in-process")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench")
+    with tempfile.TemporaryDirectory() as folder:
+        db_manager = DatabaseManager(logger, os.path.join(folder, "bench.db"))
+        history = SyntheticHistory(args.rows, tasks=args.tasks)
+        history.populate(db_manager)
+        print(f"{args.rows} rows, {args.tasks} tasks, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'drawn':>9} {'charts/s':>9} {'unchanged':>10} {'charts/s':>9}")
+
+        serial = None
+        for workers in args.workers:
+            out = os.path.join(folder, f"charts-{workers}")
+            drawn, counts = export(db_manager, out, args.format, workers, True)
+            assert counts["drawn"] == args.tasks, counts
+            unchanged, counts = export(db_manager, out, args.format, workers, False)
+            assert counts["unchanged"] == args.tasks, counts
+            serial = serial or drawn
+            print(f"{workers:>8} {drawn:8.1f}s {args.tasks / drawn:9.1f} {unchanged:9.1f}s {args.tasks / unchanged:9.1f}"
+                  f"   x{serial / drawn:.2f}", flush=True)
+            shutil.rmtree(out)
+        db_manager.close()
@@ -0,0 +1,58 @@
+"""
+Cost of the instrumentation hooks: @timed and @timed_method calls against the plain function
+with instrumentation off and on, and Task scoring and bulk inserts with it off, on, and with
+SQL tracing.
+
+Run from the project root:
+    python -m benchmarks.bench_instrumentation --rows 200000
+"""
+import argparse, logging, os, tempfile, time, timeit
+
+from backend.logs import instrumentation
+from backend.data.dbmanager import DatabaseManager
+from models.task import Metrics
+from backend.data.aggregates import summarize
+from benchmarks.bench_bulk_insert import make_tasks
+
+
+def per_call(statement, number=1000000):
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e9
+
+
+def insert_rate(rows):
+    with tempfile.TemporaryDirectory() as folder:
+        db_manager = DatabaseManager(logging.getLogger("bench"), os.path.join(folder, "bench.db"))
+        tasks = list(make_tasks(rows))
+        start = time.perf_counter()
+        db_manager.add_task_entries(tasks, chunk_size=1000)
+        elapsed = time.perf_counter() - start
+        db_manager.close()
+    return rows / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    timed_summarize = instrumentation.timed("bench.summarize")(summarize)
+    metrics = Metrics(3, 4, 2, 60)
+    print(f"plain function                       {per_call(lambda: summarize(10, 30.0, 100.0)):7.0f}ns")
+    print(f"@timed function, disabled            {per_call(lambda: timed_summarize(10, 30.0, 100.0)):7.0f}ns")
+    print(f"@timed_method (Metrics), disabled    {per_call(metrics.calculate_output_score):7.0f}ns")
+    print(f"timer() block, disabled              {per_call(lambda: instrumentation.timer('x').__enter__()):7.0f}ns")
+    instrumentation.enable()
+    print(f"@timed function, enabled             {per_call(lambda: timed_summarize(10, 30.0, 100.0)):7.0f}ns")
+    print(f"@timed_method (Metrics), enabled     {per_call(metrics.calculate_output_score):7.0f}ns")
+    instrumentation.disable()
+    instrumentation.reset()
+
+    for label, setup in (("disabled", instrumentation.disable),
+                         ("enabled", instrumentation.enable),
+                         ("enabled + SQL tracing", lambda: instrumentation.enable(trace_sql=True))):
+        setup()
+        start = time.perf_counter()
+        list(make_tasks(args.rows))
+        scoring = time.perf_counter() - start
+        print(f"{label:<24} Task construction {args.rows / scoring:10.0f}/s   add_task_entries {insert_rate(args.rows):10.0f} rows/s")
+    print(instrumentation.summary_line())
@@ -0,0 +1,99 @@
+"""
+Calling-thread cost of the log call made for every committed task on the submit path
+("Task added successfully with ID n."): the previous GetLogger setup, which formatted and
+wrote on the caller and gained a duplicate handler per call, against the queue pipeline.
+Both write to the same sink: a file, or a console that takes 0.2ms per write (a busy
+terminal or a pipe nobody is draining).
+
+Run from the project root:
+    python -m benchmarks.bench_logging --calls 5000
+"""
+import argparse, io, logging, os, statistics, sys, tempfile, time
+
+from backend.logs import logger_setup
+from backend.logs.logger_setup import GetLogger, ColoredFormatter, LOG_FORMAT
+
+
+class SlowConsole(io.TextIOBase):
+    def __init__(self, delay):
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, text):
+        time.sleep(self.delay)
+        self.lines += text.count("\n")
+        return len(text)
+
+
+def legacy_logger(stream, calls_to_get_logger):
+    # The previous GetLogger: a new colored StreamHandler on the same logger on every call
+    logger = logging.getLogger("bench.legacy")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    for _ in range(calls_to_get_logger):
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(ColoredFormatter(LOG_FORMAT))
+        logger.addHandler(handler)
+    return logger
+
+
+def per_call(logger, calls):
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter()
+        logger.info(f"Task added successfully with ID {i}.")
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def report(label, timings, lines):
+    print(f"{label:<34} median {statistics.median(timings):8.1f}us  p99 {sorted(timings)[len(timings) * 99 // 100]:8.1f}us  "
+          f"lines written {lines}", file=sys.__stdout__)
+
+
+def queued(stream, calls):
+    # The listener's console handler writes to whatever sys.stdout is when it starts
+    logger_setup.stop_logging()
+    sys.stdout = stream
+    try:
+        GetLogger("bench.queue")
+        logger = GetLogger("bench.queue")
+        timings = per_call(logger, calls)
+        start = time.perf_counter()
+        logger_setup.stop_logging()
+        drained = time.perf_counter() - start
+    finally:
+        sys.stdout = sys.__stdout__
+    return timings, drained
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        for sink in ("file", "slow console"):
+            if sink == "file":
+                stream = open(os.path.join(folder, "log.txt"), "w", encoding="utf-8")
+                count_lines = lambda: sum(1 for _ in open(stream.name, encoding="utf-8"))
+            else:
+                stream = SlowConsole(0.0002)
+                count_lines = lambda: stream.lines
+            print(f"sink: {sink}", file=sys.__stdout__)
+
+            for get_logger_calls in (1, 2):
+                legacy = legacy_logger(stream, get_logger_calls)
+                before = (stream.flush(), count_lines())[1]
+                timings = per_call(legacy, args.calls)
+                stream.flush()
+                report(f"  previous, GetLogger called {'once' if get_logger_calls == 1 else 'twice'}",
+                       timings, count_lines() - before)
+
+            before = (stream.flush(), count_lines())[1]
+            timings, drained = queued(stream, args.calls)
+            stream.flush()
+            report("  queue, GetLogger called twice", timings, count_lines() - before)
+            print(f"  queue drained {drained * 1000:.0f}ms after the last call", file=sys.__stdout__)
+            stream.close()
@@ -0,0 +1,59 @@
+"""
+Memory needed to hold the full task history as fetched row tuples, as Task objects
+and as a columnar TaskBatch, reported per 1M rows.
+
+Run from the project root:
+    python -m benchmarks.bench_memory --rows 200000
+"""
+import argparse, gc, logging, os, tempfile, tracemalloc
+
+from models.task import Task
+from models.task_batch import TASK_BATCH_COLUMNS
+from backend.data.dbmanager import DatabaseManager
+from benchmarks.bench_bulk_insert import make_tasks
+
+COLUMNS = ", ".join(TASK_BATCH_COLUMNS)
+
+
+def measure(label, rows, load):
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    scale = 1_000_000 / rows / 2**20
+    print(f"{label:<16} held {current * scale:9.1f} MiB / 1M rows   peak {peak * scale:9.1f} MiB / 1M rows")
+    del result
+
+
+def load_tuples(db_manager):
+    with db_manager.reader() as connection:
+        return connection.execute(f"SELECT {COLUMNS} FROM TaskLog ORDER BY date").fetchall()
+
+
+def load_tasks(db_manager):
+    tasks = []
+    with db_manager.reader() as connection:
+        for row in connection.execute(f"SELECT {COLUMNS} FROM TaskLog ORDER BY date"):
+            # Stored progress is the 1-5 level; any percentage inside that level rebuilds it
+            tasks.append(Task(row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9],
+                              (row[10] - 1) * 20, row[13]))
+    return tasks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        db_manager = DatabaseManager(logging.getLogger("bench"), os.path.join(folder, "bench.db"))
+        db_manager.add_task_entries(make_tasks(args.rows), chunk_size=10000)
+        # Open the reader before measuring so its page cache is not counted
+        with db_manager.reader() as connection:
+            connection.execute("SELECT COUNT(*) FROM TaskLog").fetchone()
+
+        measure("row tuples", args.rows, lambda: load_tuples(db_manager))
+        measure("Task objects", args.rows, lambda: load_tasks(db_manager))
+        measure("TaskBatch", args.rows, lambda: db_manager.get_task_batch())
+        db_manager.close()
@@ -0,0 +1,89 @@
+"""
+Rebuilds TaskLog with an extra column through DatabaseHelper.rebuild_table while another
+connection keeps submitting tasks, then checks that nothing was lost and reports how long
+the inserts stalled and how many failed. Part of the history is archived first, so the
+TaskHistory view over TaskLog and the archive has to survive the swap.
+
+Run from the project root:
+    python -m benchmarks.bench_migration --rows 2000000
+"""
+import argparse, logging, os, tempfile, threading, time
+
+from backend.data.dbmanager import DatabaseManager
+from backend.data.helpers import DatabaseHelper
+from benchmarks.bench_bulk_insert import make_tasks
+
+
+def insert_continuously(db_path, stop, latencies, ids, failures):
+    db_manager = DatabaseManager(logging.getLogger("bench"), db_path)
+    for task in make_tasks(10**9, seed=1):
+        if stop.is_set():
+            break
+        start = time.perf_counter()
+        row_id = db_manager.add_task_entry(task)
+        latencies.append(time.perf_counter() - start)
+        # add_task_entry logs the error and returns False when the insert did not go through
+        if row_id is False:
+            failures.append(task)
+        else:
+            ids.append(row_id)
+        time.sleep(0.005)
+    db_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--archived", type=int, default=10000, help="Rows moved to the 2022 archive before the rebuild")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench")
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, "bench.db")
+        helper = DatabaseHelper(logger, db_path)
+        helper.add_task_entries(make_tasks(args.rows), chunk_size=50000)
+        # make_tasks dates everything in 2023, so the first rows are moved back a year to be archived
+        with helper.writer() as connection:
+            connection.execute("UPDATE TaskLog SET date = '2022' || SUBSTR(date, 5) WHERE id <= ?", (args.archived,))
+        archived = helper.archive_year(2022)
+
+        with helper.reader() as connection:
+            create_sql = connection.execute("SELECT sql FROM sqlite_master WHERE name = 'TaskLog'").fetchone()[0]
+        head, tail = create_sql.rsplit(")", 1)
+        create_sql = head.replace("CREATE TABLE TaskLog", "CREATE TABLE IF NOT EXISTS {table}", 1) + ",\n    session_id INTEGER\n)" + tail
+
+        stop = threading.Event()
+        latencies, ids, failures = [], [], []
+        inserter = threading.Thread(target=insert_continuously, args=(db_path, stop, latencies, ids, failures))
+        inserter.start()
+        time.sleep(0.5)
+
+        start = time.perf_counter()
+        helper.rebuild_table("TaskLog", create_sql, args.batch_size)
+        elapsed = time.perf_counter() - start
+        time.sleep(0.5)
+        stop.set()
+        inserter.join()
+
+        with helper.reader() as connection:
+            count = connection.execute("SELECT COUNT(*) FROM TaskLog").fetchone()[0]
+            history = connection.execute("SELECT COUNT(*) FROM TaskHistory").fetchone()[0]
+            present = connection.execute(f"SELECT COUNT(*) FROM TaskLog WHERE id IN ({','.join(map(str, ids))})").fetchone()[0]
+            aggregated = connection.execute("SELECT SUM(entries) FROM TaskStats").fetchone()[0]
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(TaskLog)")]
+            indexes = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'TaskLog'")]
+            integrity = connection.execute("PRAGMA integrity_check").fetchone()[0]
+        helper.close()
+
+        latencies.sort()
+        print(f"rebuilt {args.rows} rows in {elapsed:.2f}s")
+        print(f"{len(latencies)} concurrent inserts, p50 {latencies[len(latencies) // 2] * 1000:.1f}ms  "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms  max {latencies[-1] * 1000:.1f}ms")
+        print(f"rows {count} (expected {args.rows - archived + len(ids)}), inserted ids present {present}/{len(ids)}, "
+              f"failed inserts {len(failures)}, TaskStats entries {aggregated}")
+        print(f"TaskHistory rows {history} (expected {count + archived})")
+        print(f"session_id column: {'session_id' in columns}, indexes: {', '.join(sorted(indexes))}, integrity: {integrity}")
+        assert present == len(ids), f"{len(ids) - present} committed inserts are missing after the rebuild"
+        assert count == args.rows - archived + len(ids), f"{count} rows, expected {args.rows - archived + len(ids)}"
+        assert history == count + archived, f"TaskHistory has {history} rows, expected {count + archived}"
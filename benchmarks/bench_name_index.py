@@ -0,0 +1,88 @@
+"""
+Task names for the graph's task selector and the form's completers: the previous
+SELECT DISTINCT scan over the task log against building the NameIndex off TaskStats, then
+the per-keystroke cost of a prefix lookup (NameIndex.complete and the completer's model
+update) and of adding a new name, with tens of thousands of distinct tasks.
+
+The selector itself is filled once with addItems. The previous one-addItem-per-task loop is
+not timed: some PySide6 builds drop a reference to None on every call returning nothing,
+which aborts the interpreter after a few tens of thousands of calls.
+
+Run from the project root (no display needed):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_name_index --rows 300000 --tasks 60000
+"""
+import argparse, logging, os, random, tempfile, time
+
+import numpy as np
+from PySide6.QtWidgets import QApplication, QComboBox, QLineEdit
+
+from backend.data.dbmanager import DatabaseManager
+from backend.data.name_index import NameIndex
+from benchmarks.synthetic import SyntheticHistory
+from frontend.name_completer import NameCompleter
+
+
+def old_names(db_manager):
+    # The previous load_tasks query: a DISTINCT scan of TaskLog
+    with db_manager.reader() as connection:
+        tasks = connection.execute("SELECT DISTINCT task_key FROM TaskLog;").fetchall()
+    return ["All Tasks"] + [task[0].capitalize() for task in tasks]
+
+
+def new_names(db_manager):
+    names = NameIndex(db_manager.get_aggregate_keys("TaskStats"))
+    return ["All Tasks"] + [key.capitalize() for key in names]
+
+
+def best_of(run, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def percentiles(run, inputs):
+    times = []
+    for value in inputs:
+        start = time.perf_counter()
+        run(value)
+        times.append(time.perf_counter() - start)
+    return np.percentile(np.array(times) * 1e6, [50, 99])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300000)
+    parser.add_argument("--tasks", type=int, default=60000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as folder:
+        db_manager = DatabaseManager(logging.getLogger("bench"), os.path.join(folder, "bench.db"))
+        # A flat popularity so most of the task names actually occur
+        SyntheticHistory(args.rows, tasks=args.tasks, zipf=0.3).populate(db_manager)
+
+        old = best_of(lambda: old_names(db_manager))
+        new = best_of(lambda: new_names(db_manager))
+        names = NameIndex(db_manager.get_aggregate_keys("TaskStats"))
+        fill = best_of(lambda: QComboBox().addItems(new_names(db_manager)), repeat=1) - new
+        print(f"{len(names)} distinct tasks in {args.rows} rows")
+        print(f"selector names: DISTINCT scan {old:.1f} ms, NameIndex {new:.1f} ms; addItems {fill:.1f} ms")
+
+        rng = random.Random(0)
+        keys = list(names)
+        prefixes = [key[:rng.randint(1, len(key))] for key in rng.choices(keys, k=args.lookups)]
+        p50, p99 = percentiles(names.complete, prefixes)
+        print(f"NameIndex.complete:     p50 {p50:6.1f} us, p99 {p99:6.1f} us")
+
+        line_edit = QLineEdit()
+        completer = NameCompleter(names, line_edit)
+        p50, p99 = percentiles(completer.update_suggestions, prefixes)
+        print(f"completer suggestions:  p50 {p50:6.1f} us, p99 {p99:6.1f} us")
+
+        p50, p99 = percentiles(names.add, [f"new task {i}" for i in range(args.lookups)])
+        print(f"NameIndex.add:          p50 {p50:6.1f} us, p99 {p99:6.1f} us")
+        db_manager.close()
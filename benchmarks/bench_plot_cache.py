@@ -0,0 +1,88 @@
+"""
+Selection-to-data and selection-to-paint latency when flipping back and forth between tasks
+and searches with nothing written in between, with the plot cache disabled and enabled, and
+the cache's hit rate. Writes from another connection and through add_task_entry must
+invalidate it.
+
+Run from the project root (no display needed):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_plot_cache --rows 500000
+"""
+import argparse, logging, os, sqlite3, statistics, tempfile, time
+
+from PySide6.QtWidgets import QApplication
+
+from backend.data.dbmanager import DatabaseManager
+from backend.graphs.graph_widget import GraphWidget
+from benchmarks.bench_bulk_insert import make_tasks
+from benchmarks.bench_plot_refresh import wait_until_painted
+
+
+def flip(app, widget, views, rounds):
+    # (until the data reaches render(), until painted) for every selection/search change
+    latencies = []
+    rendered = []
+    render = widget.render
+    widget.render = lambda data: rendered.append(time.perf_counter()) or render(data)
+    for _ in range(rounds):
+        for index, text in views:
+            start = time.perf_counter()
+            widget.search_bar.blockSignals(True)
+            widget.search_bar.setText(text)
+            widget.search_bar.blockSignals(False)
+            if widget.task_selector.currentIndex() == index:
+                widget.update_plot()
+            else:
+                widget.task_selector.setCurrentIndex(index)
+            wait_until_painted(app, widget)
+            widget.canvas.flush_events()
+            latencies.append(((rendered[-1] - start) * 1000, (time.perf_counter() - start) * 1000))
+    widget.render = render
+    return latencies
+
+
+def report(label, latencies, cache):
+    stats = cache.stats()
+    to_data, to_paint = zip(*latencies)
+    print(f"{label:<16} to data median {statistics.median(to_data):7.2f}ms max {max(to_data):7.2f}ms  "
+          f"to paint median {statistics.median(to_paint):7.2f}ms  hit rate {stats['hit_rate']:5.0%}  "
+          f"entries {stats['entries']:3}  {stats['bytes'] / 2**20:6.2f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, "bench.db")
+        db_manager = DatabaseManager(logging.getLogger("bench"), db_path)
+        db_manager.add_task_entries(make_tasks(args.rows), chunk_size=50000)
+
+        widget = GraphWidget(db_manager)
+        wait_until_painted(app, widget)
+        views = [(0, ""), (1, ""), (2, ""), (3, ""), (1, "focus"), (0, "task 1")]
+
+        widget.plot_cache.max_bytes = 0
+        widget.plot_cache.clear()
+        report("cache disabled", flip(app, widget, views, args.rounds), widget.plot_cache)
+
+        widget.plot_cache.max_bytes = 32 * 2**20
+        widget.plot_cache.hits = widget.plot_cache.misses = 0
+        report("cache enabled", flip(app, widget, views, args.rounds), widget.plot_cache)
+
+        # Another process commits: the next lookup has to miss and re-query
+        external = sqlite3.connect(db_path)
+        with external:
+            external.execute("UPDATE TaskLog SET notes = 'edited' WHERE id = 1")
+        external.close()
+        invalidations = widget.plot_cache.invalidations
+        flip(app, widget, views[:1], 1)
+        print(f"external write invalidated the cache: {widget.plot_cache.invalidations > invalidations}")
+
+        db_manager.add_task_entry(next(make_tasks(1, seed=7)))
+        invalidations = widget.plot_cache.invalidations
+        flip(app, widget, views[:1], 1)
+        print(f"add_task_entry invalidated the cache: {widget.plot_cache.invalidations > invalidations}")
+        db_manager.close()
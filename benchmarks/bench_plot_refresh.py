@@ -0,0 +1,69 @@
+"""
+Measures GUI-thread blocking per keystroke and keystroke-to-paint latency of GraphWidget,
+comparing the synchronous plot_data path against the debounced background refresh.
+
+Run from the project root (no display needed):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_plot_refresh --rows 200000
+"""
+import argparse, logging, os, tempfile, time
+
+from PySide6.QtWidgets import QApplication
+
+from backend.data.dbmanager import DatabaseManager
+from backend.graphs.graph_widget import GraphWidget
+from benchmarks.bench_bulk_insert import make_tasks
+
+
+def wait_until_painted(app, widget):
+    while widget._workers or widget.debounce_timer.isActive():
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()
+
+
+def type_text(app, widget, text, handler):
+    """Types text one character at a time and returns the GUI-thread time spent per keystroke."""
+    blocked = []
+    for i in range(1, len(text) + 1):
+        start = time.perf_counter()
+        handler(text[:i])
+        blocked.append((time.perf_counter() - start) * 1000)
+        app.processEvents()
+    return blocked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--text", default="task 1")
+    args = parser.parse_args()
+
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as folder:
+        db_manager = DatabaseManager(logging.getLogger("bench"), os.path.join(folder, "bench.db"))
+        db_manager.add_task_entries(make_tasks(args.rows), chunk_size=10000)
+
+        widget = GraphWidget(db_manager)
+        wait_until_painted(app, widget)
+        widget.task_selector.setCurrentIndex(2)
+        wait_until_painted(app, widget)
+
+        # Before: every keystroke queried and redrew synchronously
+        widget.search_bar.blockSignals(True)
+        def synchronous(text):
+            widget.search_bar.setText(text)
+            widget.plot_data()
+        blocked = type_text(app, widget, args.text, synchronous)
+        widget.search_bar.blockSignals(False)
+        print(f"synchronous   blocking/keystroke {sum(blocked) / len(blocked):8.2f}ms  keystroke-to-paint {blocked[-1]:8.2f}ms")
+
+        widget.search_bar.blockSignals(True)
+        widget.search_bar.clear()
+        widget.search_bar.blockSignals(False)
+
+        # After: keystrokes only restart the debounce timer, the query runs on the pool
+        blocked = type_text(app, widget, args.text, widget.search_bar.setText)
+        wait_until_painted(app, widget)
+        print(f"background    blocking/keystroke {sum(blocked) / len(blocked):8.2f}ms  keystroke-to-paint {widget.last_refresh_latency:8.2f}ms"
+              f" (includes {widget.debounce_timer.interval()}ms debounce)")
+        db_manager.close()
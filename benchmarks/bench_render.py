@@ -0,0 +1,92 @@
+"""
+Frame times of GraphWidget rendering: the previous clear-and-rebuild path against
+retained artists, plus the cost of a hover tooltip with blitting vs a full redraw.
+
+Run from the project root (no display needed):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_render --points 10000 100000
+"""
+import argparse, logging, os, random, tempfile, time
+
+import numpy as np
+from PySide6.QtWidgets import QApplication
+from matplotlib.backend_bases import MouseEvent
+
+from backend.data.dbmanager import DatabaseManager
+from backend.graphs.graph_widget import GraphWidget
+from backend.graphs.plot_data import PlotData, ENTRIES
+
+try:
+    import mplcursors
+except ImportError:
+    mplcursors = None
+
+
+def make_plot_data(points, seed):
+    rng = random.Random(seed)
+    start = np.datetime64("2015-01-01")
+    dates = [str(start + rng.randint(0, 3650)) for _ in range(points)]
+    rois = [rng.uniform(0, 10) for _ in range(points)]
+    return PlotData(ENTRIES, "task 1", dates, rois)
+
+
+def rebuild_frame(widget, data):
+    # The previous render path: clear the axes and rebuild every artist and cursor
+    axes = widget.canvas.axes
+    axes.clear()
+    scatter = axes.scatter(data.x_values, data.y_values)
+    axes.set_xlabel('Date')
+    axes.set_ylabel('ROI')
+    axes.set_title(data.title)
+    axes.tick_params(axis='x', rotation=45)
+    if mplcursors is not None:
+        cursor = mplcursors.cursor(scatter, hover=True)
+        cursor.remove()
+    widget.canvas.draw()
+
+
+def retained_frame(widget, data):
+    widget.render(data)
+    widget.canvas.draw()
+
+
+def average_ms(frames, function):
+    start = time.perf_counter()
+    for i in range(frames):
+        function(i)
+    return (time.perf_counter() - start) / frames * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--frames", type=int, default=5)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as folder:
+        db_manager = DatabaseManager(logging.getLogger("bench"), os.path.join(folder, "bench.db"))
+        widget = GraphWidget(db_manager)
+        widget.resize(800, 600)
+        widget.wait_for_refresh()
+        app.processEvents()
+
+        for points in args.points:
+            frames = [make_plot_data(points, seed) for seed in range(args.frames)]
+            widget.hover.hide()
+            rebuild = average_ms(args.frames, lambda i: rebuild_frame(widget, frames[i]))
+            widget.view_mode = None  # The rebuild path cleared the retained artists
+            retained_frame(widget, frames[0])
+            retained = average_ms(args.frames, lambda i: retained_frame(widget, frames[i]))
+
+            # Hover over a point: full redraw vs blitting the tooltip onto the saved background
+            x, y = widget.canvas.axes.transData.transform(frames[-1].offsets[0])
+            event = MouseEvent("motion_notify_event", widget.canvas, x, y)
+            full_hover = average_ms(args.frames, lambda i: (widget.hover._on_move(event), widget.canvas.draw()))
+            def blit_hover(i):
+                widget.hover.hide()
+                widget.hover._on_move(event)
+            blitted_hover = average_ms(args.frames, blit_hover)
+
+            print(f"{points:>7} points  rebuild {rebuild:8.1f}ms  retained {retained:8.1f}ms  "
+                  f"hover full redraw {full_hover:8.1f}ms  hover blit {blitted_hover:6.1f}ms")
+        db_manager.close()
@@ -0,0 +1,81 @@
+"""
+Peak memory and run time of the streaming report as the task log grows, against loading
+every row first (the way the GUI views read it). The streaming peak should stay flat and
+below --ceiling MiB at every size.
+
+Rows are generated inside SQLite with the aggregate and search triggers dropped, so a
+10M-row database takes seconds rather than an hour to build. Run from the project root:
+    python -m benchmarks.bench_report --rows 1000000 3000000 10000000
+"""
+import argparse, gc, logging, os, resource, sys, tempfile, time, tracemalloc
+
+from backend.data.dbmanager import DatabaseManager
+from backend.data.report import build_report
+
+GENERATE_SQL = '''
+    WITH RECURSIVE n(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+    INSERT INTO TaskLog (date, task, category, time_investment, immediate_benefit, future_impact,
+                         personal_fulfillment, progress, output_score, roi, notes, task_key, category_key)
+    SELECT DATE('2015-01-01', '+' || (i % 3650) || ' days'),
+           'Task ' || (i % 200), 'Category ' || (i % 12), 1 + i % 4,
+           1 + i % 5, 1 + (i / 5) % 5, 1 + (i / 25) % 5, 1 + (i / 125) % 5,
+           2.5, 0.2 + ABS(RANDOM() % 1000) / 100.0, '',
+           'task ' || (i % 200), 'category ' || (i % 12)
+    FROM n
+'''
+
+
+def grow(db_manager, rows):
+    with db_manager.writer() as connection:
+        have = connection.execute("SELECT COUNT(*) FROM TaskLog").fetchone()[0]
+        for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+            connection.execute(f"DROP TRIGGER {name}")
+        if rows > have:
+            connection.execute(GENERATE_SQL, (have + 1, rows))
+
+
+def load_all(db_manager):
+    # What a report built from fetchall() holds before it can start aggregating
+    with db_manager.reader() as connection:
+        return connection.execute("SELECT task_key, category_key, date, roi, time_investment FROM TaskLog").fetchall()
+
+
+def measure(label, rows, run):
+    # Timed without tracing first: tracemalloc slows the per-chunk Python work down several times
+    gc.collect()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = run()
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    del result
+    print(f"{rows:>10} rows  {label:<10} {elapsed:8.2f}s  peak {peak:9.1f} MiB")
+    return peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000, 3000000, 10000000])
+    parser.add_argument("--ceiling", type=float, default=64, help="Streaming peak allowed at every size, in MiB")
+    parser.add_argument("--load-limit", type=int, default=3000000, help="Largest size the fetchall comparison runs at")
+    args = parser.parse_args()
+
+    exceeded = False
+    with tempfile.TemporaryDirectory() as folder:
+        db_manager = DatabaseManager(logging.getLogger("bench"), os.path.join(folder, "bench.db"))
+        for rows in sorted(args.rows):
+            grow(db_manager, rows)
+            if rows <= args.load_limit:
+                measure("fetchall", rows, lambda: load_all(db_manager))
+            exceeded |= measure("streaming", rows, lambda: build_report(db_manager)) > args.ceiling
+        db_manager.close()
+
+    print(f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB (includes the fetchall runs "
+          f"and memory-mapped database pages)")
+    if exceeded:
+        print(f"streaming peak went over the {args.ceiling:.0f} MiB ceiling")
+        sys.exit(1)
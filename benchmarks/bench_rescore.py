@@ -0,0 +1,92 @@
+"""
+Re-scoring the whole history with another scoring model (DatabaseManager.recalculate_scores):
+run time, rows per second and Python peak memory at 1M and 5M entries, switching from the
+legacy model to weighted:1 and back. The peak should stay flat as the table grows, since
+only one chunk is held at a time. For comparison, the first --trigger-rows rows are also
+updated the plain way, one UPDATE per row with the aggregate triggers firing, and the time
+that would take for the whole table is extrapolated.
+
+Rows are generated inside SQLite with the triggers dropped (see bench_report), in date order
+as the app appends them, with progress percentages; the aggregate triggers and tables are
+then restored. Run from the project root:
+    python -m benchmarks.bench_rescore --rows 1000000 5000000
+"""
+import argparse, gc, logging, os, tempfile, time, tracemalloc
+
+from backend.data.dbmanager import DatabaseManager
+from backend.data.aggregates import create_aggregate_tables, rebuild_aggregates
+from models.scoring import get_model, LEGACY_MODEL_KEY
+
+GENERATE_SQL = '''
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+    INSERT INTO TaskLog (date, task, category, time_investment, immediate_benefit, future_impact,
+                         personal_fulfillment, progress, progress_pct, output_score, roi, notes, task_key, category_key)
+    SELECT DATE('2000-01-01', '+' || (i * :days / :rows) || ' days'),
+           'Task ' || (i * 7 % 200), 'Category ' || (i * 7 % 200 % 12), 0.25 + (i % 16) * 0.25,
+           i % 6, (i / 6) % 6, (i / 36) % 6, 1 + (i / 7) % 5, (i / 7) % 5 * 20 + i % 20,
+           0, 0, '', 'task ' || (i * 7 % 200), 'category ' || (i * 7 % 200 % 12)
+    FROM n
+'''
+DAYS = 9000
+
+
+def generate(db_manager, rows):
+    with db_manager.writer() as connection:
+        cursor = connection.cursor()
+        for (name,) in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+            cursor.execute(f"DROP TRIGGER {name}")
+        cursor.execute(GENERATE_SQL, {"rows": rows, "days": DAYS})
+        create_aggregate_tables(cursor)
+        rebuild_aggregates(cursor)
+
+
+def per_row_updates(db_manager, model, rows):
+    # One UPDATE per row through the triggers, rolled back afterwards
+    connection = db_manager.get_connection()
+    batch = connection.execute('''
+        SELECT id, immediate_benefit, future_impact, personal_fulfillment, progress, time_investment
+        FROM TaskLog ORDER BY id LIMIT ?
+    ''', (rows,)).fetchall()
+    start = time.perf_counter()
+    for row_id, immediate, future, fulfillment, progress, time_investment in batch:
+        score, roi = model.score([immediate], [future], [fulfillment], [progress], [time_investment])
+        connection.execute("UPDATE TaskLog SET output_score = ?, roi = ? WHERE id = ?", (score[0], roi[0], row_id))
+    elapsed = time.perf_counter() - start
+    connection.rollback()
+    connection.close()
+    return elapsed / len(batch)
+
+
+def rescore(db_manager, key, chunk_size, traced):
+    gc.collect()
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    updated = db_manager.recalculate_scores(chunk_size, get_model(key))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20 if traced else None
+    tracemalloc.stop()
+    return updated, elapsed, peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000, 5000000])
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--trigger-rows", type=int, default=1000, help="Rows updated one by one through the triggers")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'model':>11} {'time':>9} {'rows/s':>10} {'peak':>10} {'per-row triggers':>17}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as folder:
+            db_manager = DatabaseManager(logging.getLogger("bench"), os.path.join(folder, "bench.db"))
+            generate(db_manager, rows)
+            per_row = per_row_updates(db_manager, get_model("weighted:1"), args.trigger_rows)
+
+            # Timed without tracing first, traced on the way back: tracemalloc slows the Python side down
+            for key, traced in (("weighted:1", False), (LEGACY_MODEL_KEY, True)):
+                updated, elapsed, peak = rescore(db_manager, key, args.chunk_size, traced)
+                peak = f"{peak:6.1f} MiB" if peak is not None else "-"
+                print(f"{rows:>10} {key:>11} {elapsed:8.1f}s {updated / elapsed:10.0f} {peak:>10} "
+                      f"{per_row * rows / 3600:15.1f} h", flush=True)
+            db_manager.close()
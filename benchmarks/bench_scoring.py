@@ -0,0 +1,55 @@
+"""
+Scores the same synthetic tasks through Metrics one at a time and through the
+vectorized batch engine, and checks both produce identical values.
+
+Run from the project root:
+    python -m benchmarks.bench_scoring --rows 1000000
+"""
+import argparse, time
+
+import numpy as np
+
+from models.task import Metrics
+from models.scoring import score_batch
+
+
+def make_columns(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.integers(0, 6, rows).astype(float),
+        rng.integers(0, 6, rows).astype(float),
+        rng.integers(0, 6, rows).astype(float),
+        rng.uniform(0, 100, rows),
+        rng.integers(10, 240, rows) / 60,
+    )
+
+
+def score_scalar(immediate, future, fulfillment, progress, time_investment):
+    output = []
+    roi = []
+    for values in zip(immediate.tolist(), future.tolist(), fulfillment.tolist(), progress.tolist(), time_investment.tolist()):
+        metrics = Metrics(*values[:4])
+        score = metrics.calculate_output_score()
+        output.append(score)
+        roi.append(metrics.calculate_roi(values[4], score))
+    return np.array(output), np.array(roi)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    columns = make_columns(args.rows)
+
+    start = time.perf_counter()
+    scalar_scores, scalar_rois = score_scalar(*columns)
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = score_batch(columns[0], columns[1], columns[2], columns[3], columns[4])
+    batched = time.perf_counter() - start
+
+    assert np.array_equal(scalar_scores, batch.output_score) and np.allclose(scalar_rois, batch.roi)
+    print(f"scalar   {args.rows:>9} tasks  {scalar:8.3f}s  {args.rows / scalar:14,.0f} tasks/sec")
+    print(f"batched  {args.rows:>9} tasks  {batched:8.3f}s  {args.rows / batched:14,.0f} tasks/sec  ({scalar / batched:.0f}x)")
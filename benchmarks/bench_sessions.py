@@ -0,0 +1,93 @@
+"""
+Validating the sessions of a full history import: parsing start/end times and finding every
+overlapping session with the sorted sweep (SessionSet.overlaps), against comparing each
+day's sessions pairwise (with the day before, for sessions past midnight). Synthetic
+histories have about 8 sessions a day, some running past midnight, a few overlapping.
+The sweep's time per session should stay flat as the history grows.
+
+Run from the project root:
+    python -m benchmarks.bench_sessions --sessions 100000 1000000 3000000
+"""
+import argparse, random, time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from models.sessions import SessionSet, parse_clock, MINUTES_PER_DAY
+
+SESSIONS_PER_DAY = 8
+
+
+def synthetic_history(count, seed=7):
+    random.seed(seed)
+    first = date(2000, 1, 1)
+    dates, starts, ends, rois = [], [], [], []
+    clock = lambda minute: f"{minute // 60 % 24:02d}:{minute % 60:02d}"
+    for day in range(count // SESSIONS_PER_DAY + 1):
+        text = (first + timedelta(days=day)).isoformat()
+        minute = random.randrange(6 * 60, 9 * 60, 15)
+        for _ in range(SESSIONS_PER_DAY):
+            if len(dates) == count:
+                return dates, starts, ends, rois
+            length = random.randrange(15, 180, 15)
+            # Roughly one session in ten starts before the previous one has ended
+            start = minute - random.randrange(15, 60, 15) if random.random() < 0.1 else minute
+            dates.append(text)
+            starts.append(clock(start))
+            ends.append(clock(start + length))
+            rois.append(random.uniform(0.2, 10))
+            minute = start + length + random.randrange(0, 90, 15)
+    return dates, starts, ends, rois
+
+
+def pairwise_overlaps(dates, starts, ends):
+    # Per-day pairwise check: every pair of the same day, plus the day before's sessions
+    days = defaultdict(list)
+    for index, (day, start, end) in enumerate(zip(dates, starts, ends)):
+        start, end = parse_clock(start), parse_clock(end)
+        if start is None or end is None or start == end:
+            continue
+        ordinal = date.fromisoformat(day).toordinal()
+        days[ordinal].append((ordinal * MINUTES_PER_DAY + start, ordinal * MINUTES_PER_DAY + start + (end - start) % MINUTES_PER_DAY, index))
+    overlapping = set()
+    for ordinal, sessions in days.items():
+        candidates = days.get(ordinal - 1, []) + sessions
+        for i, (start, end, index) in enumerate(sessions):
+            for other_start, other_end, other in candidates:
+                if other != index and start < other_end and other_start < end:
+                    overlapping.add(index)
+                    overlapping.add(other)
+    return overlapping
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100000, 1000000, 3000000])
+    parser.add_argument("--pairwise-limit", type=int, default=1000000, help="Largest size the pairwise check runs at")
+    args = parser.parse_args()
+
+    print(f"{'sessions':>10} {'parse':>9} {'sweep':>9} {'per session':>12} {'overlaps':>9} {'pairwise':>10} {'1y density':>11}")
+    for count in args.sessions:
+        dates, starts, ends, rois = synthetic_history(count)
+
+        start = time.perf_counter()
+        sessions = SessionSet(dates, starts, ends, rois)
+        parsed = time.perf_counter() - start
+        start = time.perf_counter()
+        overlaps = sessions.overlaps()
+        swept = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sessions.density("2000-01-01", "2000-12-31")
+        density = time.perf_counter() - start
+
+        pairwise = "-"
+        if count <= args.pairwise_limit:
+            start = time.perf_counter()
+            found = pairwise_overlaps(dates, starts, ends)
+            pairwise = f"{time.perf_counter() - start:9.2f}s"
+            # The sweep lists each overlapping session once, the pairwise check both sides
+            involved = set(overlaps.sessions.tolist()) | set(overlaps.partners.tolist())
+            assert involved <= found and set(overlaps.sessions.tolist()) <= found, "sweep and pairwise disagree"
+
+        print(f"{count:>10} {parsed:8.2f}s {swept:8.3f}s {(parsed + swept) / count * 1e6:10.2f}us "
+              f"{len(overlaps):>9} {pairwise:>10} {density * 1000:9.1f}ms")
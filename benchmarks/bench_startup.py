@@ -0,0 +1,77 @@
+"""
+Startup cost of the GUI: the slowest imports of frontend.main under -X importtime, and the
+time from process start to the first paint of the main window. "eager" builds the graph tab
+before showing the window, as startup did before the tab was made lazy.
+
+Every sample runs in a fresh interpreter. Run from the project root (no display needed):
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse, os, statistics, subprocess, sys, tempfile
+
+# Child process: prints seconds from interpreter start to the first paint, then exits
+FIRST_PAINT = '''
+import time, logging, sys
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QObject, QEvent
+app = QApplication(sys.argv)
+import frontend.main as main
+from backend.data.dbmanager import DatabaseManager
+main.DatabaseManager = lambda logger: DatabaseManager(logger, sys.argv[2])
+window = main.MainWindow(logging.getLogger("bench"))
+if sys.argv[1] == "eager":
+    window.ensure_graph_tab()
+
+class FirstPaint(QObject):
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint:
+            print(time.perf_counter() - START)
+            app.exit()
+        return False
+
+painted = FirstPaint()
+window.installEventFilter(painted)
+window.show()
+app.exec()
+'''
+
+
+def child_env():
+    return dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONPATH=os.getcwd())
+
+
+def slowest_imports(count):
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import frontend.main"],
+                            capture_output=True, text=True, env=child_env())
+    imports = []
+    for line in result.stderr.splitlines():
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            imports.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def first_paint(mode, db_path):
+    # START is taken as the first statement of the child so interpreter startup counts too
+    code = "import time; START = time.perf_counter()\n" + FIRST_PAINT
+    result = subprocess.run([sys.executable, "-c", code, mode, db_path],
+                            capture_output=True, text=True, env=child_env(), check=True)
+    return float(result.stdout.split()[-1]) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--imports", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    print("slowest imports of frontend.main (cumulative):")
+    for cumulative, name in slowest_imports(args.imports):
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, "bench.db")
+        for mode in ("eager", "lazy"):
+            samples = [first_paint(mode, db_path) for _ in range(args.runs)]
+            print(f"time to first paint ({mode}): median {statistics.median(samples):7.1f}ms  "
+                  f"min {min(samples):7.1f}ms")
@@ -0,0 +1,89 @@
+"""
+GUI-thread time per form submission: the previous synchronous insert + plot reload against
+the background write queue. The second pair of numbers is taken while another connection
+holds the write lock (an import or migration batch), which the synchronous path waits out.
+
+Run from the project root (no display needed):
+    python -m benchmarks.bench_submit --rows 100000 --submits 50
+"""
+import argparse, logging, os, sqlite3, statistics, sys, tempfile, threading, time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PySide6.QtWidgets import QApplication
+
+import frontend.main as main
+from backend.data.dbmanager import DatabaseManager
+from benchmarks.bench_bulk_insert import make_tasks
+
+
+def fill_form(window, index):
+    window.task_edit.setText(f"task {index % 50}")
+    window.time_investment_spin.setValue(30)
+    window.progress_spin.setValue(50)
+
+
+def synchronous_submit(window):
+    # The previous submit_task body: insert on the GUI thread, then reload the plot
+    task = next(make_tasks(1))
+    window.db_manager.add_task_entry(task)
+    window.clear_form()
+    window.graph_tab.update_plot()
+
+
+def hold_write_lock(db_path, seconds, stop):
+    connection = sqlite3.connect(db_path)
+    while not stop.is_set():
+        connection.execute("BEGIN IMMEDIATE")
+        time.sleep(seconds)
+        connection.commit()
+        time.sleep(seconds)
+    connection.close()
+
+
+def bench(app, window, label, submit, submits):
+    timings = []
+    for index in range(submits):
+        fill_form(window, index)
+        start = time.perf_counter()
+        submit()
+        timings.append((time.perf_counter() - start) * 1000)
+        app.processEvents()
+    window.write_queue.flush()
+    window.graph_tab.wait_for_refresh()
+    app.processEvents()
+    print(f"{label:<40} median {statistics.median(timings):8.2f}ms  max {max(timings):8.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--submits", type=int, default=50)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    logger = logging.getLogger("bench")
+    with tempfile.TemporaryDirectory() as folder:
+        db_path = os.path.join(folder, "bench.db")
+        db_manager = DatabaseManager(logger, db_path)
+        db_manager.add_task_entries(make_tasks(args.rows), chunk_size=50000)
+        db_manager.close()
+
+        main.DatabaseManager = lambda logger: DatabaseManager(logger, db_path)
+        window = main.MainWindow(logger)
+        window.show_toast = lambda message: None
+        window.ensure_graph_tab().task_selector.setCurrentIndex(1)
+        window.graph_tab.wait_for_refresh()
+
+        bench(app, window, "synchronous insert + reload", lambda: synchronous_submit(window), args.submits)
+        bench(app, window, "write queue", window.submit_task, args.submits)
+
+        stop = threading.Event()
+        locker = threading.Thread(target=hold_write_lock, args=(db_path, 0.2, stop))
+        locker.start()
+        bench(app, window, "synchronous, writer busy 200ms", lambda: synchronous_submit(window), args.submits // 5)
+        bench(app, window, "write queue, writer busy 200ms", window.submit_task, args.submits // 5)
+        stop.set()
+        locker.join()
+
+        window.close()
+        window.db_manager.close()
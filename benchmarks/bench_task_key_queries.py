@@ -0,0 +1,44 @@
+"""
+Times the graph queries before (LOWER(task) scans) and after (task_key index seeks).
+
+Run from the project root:
+    python -m benchmarks.bench_task_key_queries --rows 1000000
+"""
+import argparse, logging, os, tempfile, time
+
+from backend.data.dbmanager import DatabaseManager
+from benchmarks.bench_bulk_insert import make_tasks
+
+
+def timed(connection, label, sql, params=(), repeat=5):
+    plan = " / ".join(row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = connection.execute(sql, params).fetchall()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    print(f"{label:<32} {elapsed:9.2f}ms  {len(rows):>8} rows  [{plan}]")
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        db_manager = DatabaseManager(logging.getLogger("bench"), os.path.join(folder, "bench.db"))
+        db_manager.add_task_entries(make_tasks(args.rows), chunk_size=10000)
+
+        with db_manager.reader() as connection:
+            old = timed(connection, "single task, LOWER(task)", "SELECT task, roi, date FROM TaskLog WHERE LOWER(task) = ?", ("task 7",))
+            new = timed(connection, "single task, task_key", "SELECT task_key, roi, date FROM TaskLog WHERE task_key = ? ORDER BY date", ("task 7",))
+            print(f"{'':<32} {old / new:9.1f}x faster")
+
+            old = timed(connection, "task list, DISTINCT task", "SELECT DISTINCT task FROM TaskLog")
+            new = timed(connection, "task list, DISTINCT task_key", "SELECT DISTINCT task_key FROM TaskLog")
+            print(f"{'':<32} {old / new:9.1f}x faster")
+
+            old = timed(connection, "all tasks, task", "SELECT task, roi, date FROM TaskLog")
+            new = timed(connection, "all tasks, task_key", "SELECT task_key, roi, date FROM TaskLog")
+            print(f"{'':<32} {old / new:9.1f}x faster")
+        db_manager.close()
@@ -0,0 +1,354 @@
+"""
+Benchmark suite for the database, model and graph layers, run against a deterministic
+synthetic history (see synthetic.py). Every case reports one number, the median of
+--repeats runs, and the results are written as JSON together with the generator settings and
+the versions they were measured with. Given a baseline (a results file from an earlier run),
+each case is compared with it and the run fails when one has regressed by more than
+--tolerance.
+
+    insert.*     rows/s through add_task_entry, add_task_entries and the bulk scoring path
+    query.*      ms for GraphWidget.load_tasks and fetch_plot_data (one task, all tasks, search)
+    render.*     ms to render and draw the graph offscreen (Qt offscreen platform, Agg canvas)
+    scoring.*    rows/s of Task and score_batch, and score_batch's peak memory per 1M rows
+    memory.*     MiB per 1M rows of a full-history TaskBatch
+
+The graph cases are skipped when PySide6 is not installed. The stored baseline
+(benchmarks/baseline.json) was measured on one machine: compare on the same machine, or save
+a new baseline first. Run from the project root:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --only query render --save-baseline benchmarks/baseline.json
+"""
+import argparse, gc, json, logging, os, platform, sqlite3, statistics, sys, tempfile, time, tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from backend.data.dbmanager import DatabaseManager
+from backend.graphs.plot_data import fetch_plot_data
+from models.task import Task
+from models.scoring import score_batch
+from models.task_batch import TASK_BATCH_COLUMNS
+from benchmarks.synthetic import SyntheticHistory
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+TOLERANCE = 0.25
+
+# name -> (function, unit, "higher" or "lower" is better)
+CASES = {}
+
+
+def case(name, unit, better="lower"):
+    def register(function):
+        CASES[name] = (function, unit, better)
+        return function
+    return register
+
+
+class Context:
+    """What the cases share: the settings, a populated database and (lazily) the graph widget."""
+    def __init__(self, history: SyntheticHistory, folder, repeats, insert_rows):
+        self.history = history
+        self.folder = folder
+        self.repeats = repeats
+        self.insert_rows = insert_rows
+        self._db_manager = None
+        self._widget = None
+
+    @property
+    def db_manager(self):
+        if self._db_manager is None:
+            self._db_manager = DatabaseManager(logging.getLogger("bench"), os.path.join(self.folder, "suite.db"))
+            self.history.populate(self._db_manager)
+        return self._db_manager
+
+    @property
+    def widget(self):
+        if self._widget is None:
+            from PySide6.QtWidgets import QApplication
+            from backend.graphs.graph_widget import GraphWidget
+            self.app = QApplication.instance() or QApplication([])
+            self._widget = GraphWidget(self.db_manager)
+            self._widget.resize(800, 600)
+            self._widget.wait_for_refresh()
+            self.app.processEvents()
+        return self._widget
+
+    def fresh_db(self, name):
+        return DatabaseManager(logging.getLogger("bench"), os.path.join(self.folder, f"{name}.db"))
+
+    def timed(self, run, setup=None, warmup=True):
+        """
+        Median seconds of `repeats` runs of run(), calling setup() untimed before each.
+        With `warmup`, run() is called once first so caches and lazy imports are not timed.
+        """
+        if warmup:
+            run()
+        samples = []
+        for _ in range(self.repeats):
+            if setup:
+                setup()
+            gc.collect()
+            start = time.perf_counter()
+            run()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples), samples
+
+    def close(self):
+        if self._widget is not None:
+            self._widget.close()
+            self._widget.wait_for_refresh()
+        if self._db_manager is not None:
+            self._db_manager.close()
+
+
+def _rate(rows, timing):
+    seconds, samples = timing
+    return rows / seconds, [rows / sample for sample in samples]
+
+
+def _ms(timing):
+    seconds, samples = timing
+    return seconds * 1000, [sample * 1000 for sample in samples]
+
+
+def _insert_history(context, rows):
+    # Inserted rows come from their own seed, so they are not copies of the queried history
+    return SyntheticHistory(rows, context.history.task_count, seed=context.history.seed + 1)
+
+
+def _insert_rate(context, name, rows, insert):
+    # Every repeat inserts into a new, empty database
+    managers = []
+
+    def setup():
+        if managers:
+            managers[-1].close()
+        managers.append(context.fresh_db(f"{name}-{len(managers)}"))
+
+    try:
+        return _rate(rows, context.timed(lambda: insert(managers[-1]), setup, warmup=False))
+    finally:
+        managers[-1].close()
+
+
+@case("insert.single_row", "rows/s", "higher")
+def insert_single_row(context):
+    # One transaction per entry, like the form without the write queue, so the sample is kept small
+    tasks = list(_insert_history(context, min(context.insert_rows, 2000)).tasks())
+
+    def insert(db_manager):
+        for task in tasks:
+            db_manager.add_task_entry(task)
+
+    return _insert_rate(context, "single", len(tasks), insert)
+
+
+@case("insert.task_entries", "rows/s", "higher")
+def insert_task_entries(context):
+    tasks = list(_insert_history(context, context.insert_rows).tasks())
+    return _insert_rate(context, "entries", len(tasks), lambda db_manager: db_manager.add_task_entries(tasks))
+
+
+@case("insert.scored_rows", "rows/s", "higher")
+def insert_scored_rows(context):
+    # The import path: batch scoring and executemany, row generation included
+    history = _insert_history(context, context.insert_rows)
+    return _insert_rate(context, "scored", history.rows, history.populate)
+
+
+@case("query.load_tasks", "ms")
+def query_load_tasks(context):
+    widget = context.widget
+    return _ms(context.timed(widget.load_tasks, widget.task_selector.clear))
+
+
+@case("query.plot_data.top_task", "ms")
+def query_plot_top_task(context):
+    # The most frequent task, which has enough entries to be drawn as level-of-detail buckets
+    task = context.history.task_name(0)
+    return _ms(context.timed(lambda: fetch_plot_data(context.db_manager, task, "")))
+
+
+@case("query.plot_data.rare_task", "ms")
+def query_plot_rare_task(context):
+    task = context.history.task_name(context.history.task_count - 1)
+    return _ms(context.timed(lambda: fetch_plot_data(context.db_manager, task, "")))
+
+
+@case("query.plot_data.all_tasks", "ms")
+def query_plot_all_tasks(context):
+    return _ms(context.timed(lambda: fetch_plot_data(context.db_manager, None, "")))
+
+
+@case("query.plot_data.search", "ms")
+def query_plot_search(context):
+    return _ms(context.timed(lambda: fetch_plot_data(context.db_manager, None, "chapter")))
+
+
+def _render(context, selected_task):
+    widget = context.widget
+    data = fetch_plot_data(context.db_manager, selected_task, "")
+
+    def run():
+        widget.render(data)
+        widget.canvas.draw()
+
+    return _ms(context.timed(run))
+
+
+@case("render.top_task", "ms")
+def render_top_task(context):
+    return _render(context, context.history.task_name(0))
+
+
+@case("render.all_tasks", "ms")
+def render_all_tasks(context):
+    return _render(context, None)
+
+
+def _score_columns(context):
+    columns = context.history.columns()
+    return [np.array(columns[index], dtype=float) for index in (6, 7, 8, 9, 3)]
+
+
+@case("scoring.task", "rows/s", "higher")
+def scoring_task(context):
+    # Building Task objects scores them through Metrics one at a time
+    history = SyntheticHistory(min(context.history.rows, 100000), context.history.task_count, seed=context.history.seed)
+    rows = [row for block in history.values() for row in block]
+
+    def run():
+        for row in rows:
+            Task(*row)
+
+    return _rate(len(rows), context.timed(run))
+
+
+@case("scoring.batch", "rows/s", "higher")
+def scoring_batch(context):
+    # Scored several times per sample, so one sample covers at least ~2M rows and is not timer noise
+    columns = _score_columns(context)
+    loops = max(1, 2000000 // context.history.rows)
+
+    def run():
+        for _ in range(loops):
+            score_batch(*columns)
+
+    return _rate(context.history.rows * loops, context.timed(run))
+
+
+@case("scoring.batch_memory", "MiB/1M rows")
+def scoring_batch_memory(context):
+    columns = _score_columns(context)
+    gc.collect()
+    tracemalloc.start()
+    score_batch(*columns)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    value = peak * 1e6 / context.history.rows
+    return value, [value]
+
+
+@case("memory.task_batch", "MiB/1M rows")
+def memory_task_batch(context):
+    db_manager = context.db_manager
+    gc.collect()
+    tracemalloc.start()
+    batch = db_manager.get_task_batch(columns=tuple(TASK_BATCH_COLUMNS))
+    current = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    del batch
+    value = current * 1e6 / context.history.rows
+    return value, [value]
+
+
+def environment(history: SyntheticHistory, args):
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "sqlite": sqlite3.sqlite_version,
+        "numpy": np.__version__,
+        "history": history.settings(),
+        "repeats": args.repeats,
+        "insert_rows": args.insert_rows,
+    }
+
+
+def run_suite(args):
+    history = SyntheticHistory(args.rows, tasks=args.tasks, days=args.days, seed=args.seed)
+    results = {"meta": environment(history, args), "results": {}}
+    selected = [name for name in CASES if not args.only or any(name.startswith(prefix) for prefix in args.only)]
+    with tempfile.TemporaryDirectory() as folder:
+        context = Context(history, folder, args.repeats, args.insert_rows)
+        try:
+            for name in selected:
+                function, unit, better = CASES[name]
+                try:
+                    value, samples = function(context)
+                except ImportError as e:
+                    print(f"{name:<28} skipped ({e})")
+                    continue
+                results["results"][name] = {"value": value, "unit": unit, "better": better, "samples": samples}
+                print(f"{name:<28} {value:14,.2f} {unit}", flush=True)
+        finally:
+            context.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints each case against the baseline and returns the names of the regressed ones:
+    worse than the baseline by more than `tolerance` (a fraction) in the case's direction.
+    """
+    if baseline["meta"].get("history") != results["meta"]["history"]:
+        print("warning: the baseline was measured on a different synthetic history, the numbers are not comparable")
+    regressed = []
+    print(f"\n{'case':<28} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, result in results["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:<28} {'-':>14} {result['value']:14,.2f}      new")
+            continue
+        change = result["value"] / reference["value"] - 1 if reference["value"] else 0.0
+        worse = -change if result["better"] == "higher" else change
+        status = "REGRESSED" if worse > tolerance else ""
+        if status:
+            regressed.append(name)
+        print(f"{name:<28} {reference['value']:14,.2f} {result['value']:14,.2f} {change:+7.1%} {status}")
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000, help="Entries in the synthetic history the queries run on")
+    parser.add_argument("--tasks", type=int, default=500, help="Distinct task names")
+    parser.add_argument("--days", type=int, default=3650, help="Days the history spans")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--insert-rows", type=int, default=20000, help="Rows per insert benchmark run")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--only", nargs="+", default=None, help="Only run the cases starting with these prefixes")
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE_PATH, default=None,
+                        help=f"Compare with a stored results file (defaults to {os.path.relpath(BASELINE_PATH)})")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, default=None,
+                        help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Allowed regression, as a fraction")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressed = compare(results, json.load(file), args.tolerance)
+        if regressed:
+            print(f"\n{len(regressed)} regressed: {', '.join(regressed)}")
+            sys.exit(1)
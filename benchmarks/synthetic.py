@@ -0,0 +1,118 @@
+"""
+Deterministic synthetic task history for the benchmarks: the same settings and seed always
+give the same rows, whatever chunk size they are read in.
+
+Entries are spread in date order over `days` days from `start`, the way the app appends
+them. Task names follow a Zipf-like popularity over `tasks` distinct names (a few tasks make
+up most of a real log), each task belongs to one of `categories` categories, and sessions
+last 15 minutes to 4 hours. A `note_share` of the entries carry a note whose length is
+log-normally distributed around `note_chars` characters.
+
+    history = SyntheticHistory(200000, tasks=500)
+    history.populate(db_manager)            # scored and inserted through add_task_rows
+    for task in history.tasks(): ...        # or as Task objects, e.g. for add_task_entry
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+from models.task import Task
+from backend.data.importer import score_rows
+
+# Rows generated per random stream; a block's rows only depend on the seed and its number
+BLOCK_ROWS = 65536
+
+NOTE_WORDS = ("practiced scales reviewed notes finished chapter outline draft fixed bug call with team "
+              "read paper planned week stretched ran intervals refactored tests wrote summary felt "
+              "focused tired distracted good progress slow start deep work").split()
+
+
+def _clock(minute):
+    return f"{minute // 60 % 24:02d}:{minute % 60:02d}"
+
+
+# "HH:mm" of every minute of the day, so clocks are formatted by indexing
+CLOCKS = np.array([_clock(minute) for minute in range(24 * 60)], dtype=object)
+
+
+class SyntheticHistory:
+    def __init__(self, rows: int, tasks: int = 200, categories: int = 12, start: str = "2015-01-01",
+                 days: int = 3650, note_share: float = 0.2, note_chars: int = 80, zipf: float = 1.1, seed: int = 0):
+        self.rows = rows
+        self.task_count = tasks
+        self.categories = categories
+        self.start = date.fromisoformat(start)
+        self.days = days
+        self.note_share = note_share
+        self.note_chars = note_chars
+        self.seed = seed
+
+        popularity = 1 / np.arange(1, tasks + 1) ** zipf
+        self._popularity = popularity / popularity.sum()
+        self._task_names = np.array([f"task {rank}" for rank in range(tasks)], dtype=object)
+        self._category_names = np.array([f"category {rank % categories}" for rank in range(tasks)], dtype=object)
+        self._dates = np.array([(self.start + timedelta(days=day)).isoformat() for day in range(days)], dtype=object)
+        # Notes are slices of one long deterministic text
+        words = np.random.default_rng(seed).choice(NOTE_WORDS, 4096)
+        self._note_text = " ".join(words)
+
+    def settings(self):
+        """The generator's settings, recorded with benchmark results."""
+        return {"rows": self.rows, "tasks": self.task_count, "categories": self.categories,
+                "start": self.start.isoformat(), "days": self.days, "note_share": self.note_share,
+                "note_chars": self.note_chars, "seed": self.seed}
+
+    def task_name(self, rank: int) -> str:
+        """Name of the `rank`-th most frequent task."""
+        return self._task_names[rank]
+
+    def _block(self, number):
+        # Columns of rows [number * BLOCK_ROWS, ...) as lists, in importer value order
+        first = number * BLOCK_ROWS
+        count = min(BLOCK_ROWS, self.rows - first)
+        rng = np.random.default_rng((self.seed, number))
+        index = np.arange(first, first + count)
+
+        dates = self._dates[index * self.days // max(self.rows, 1)]
+        ranks = rng.choice(self.task_count, count, p=self._popularity)
+        quarters = rng.integers(1, 17, count)
+        starts = rng.integers(6 * 4, 22 * 4, count) * 15
+        ratings = rng.integers(0, 6, (3, count))
+        progress = rng.integers(0, 101, count)
+
+        lengths = np.where(rng.random(count) < self.note_share,
+                           np.minimum(rng.lognormal(np.log(self.note_chars), 0.6, count), 2000).astype(np.int64), 0)
+        offsets = rng.integers(0, len(self._note_text) - 2000, count)
+        text = self._note_text
+        notes = [text[offset:offset + length] if length else "" for offset, length in zip(offsets.tolist(), lengths.tolist())]
+
+        return [dates.tolist(), self._task_names[ranks].tolist(), self._category_names[ranks].tolist(),
+                (quarters / 4).tolist(), CLOCKS[starts].tolist(), CLOCKS[(starts + quarters * 15) % (24 * 60)].tolist(),
+                ratings[0].tolist(), ratings[1].tolist(), ratings[2].tolist(), progress.tolist(), notes]
+
+    def values(self):
+        """Yields the rows as lists of importer value tuples (see importer.score_rows), one block at a time."""
+        for number in range(-(-self.rows // BLOCK_ROWS)):
+            yield list(zip(*self._block(number)))
+
+    def tasks(self):
+        """Yields the rows as Task objects."""
+        for block in self.values():
+            for values in block:
+                yield Task(*values)
+
+    def columns(self):
+        """All rows as importer-ordered columns (lists), for the batch scoring benchmarks."""
+        columns = [[] for _ in range(11)]
+        for number in range(-(-self.rows // BLOCK_ROWS)):
+            for column, values in zip(columns, self._block(number)):
+                column.extend(values)
+        return columns
+
+    def populate(self, db_manager):
+        """Scores and inserts every row through the bulk path, one transaction per block. Returns the row count."""
+        inserted = 0
+        for block in self.values():
+            rows, _ = score_rows(block)
+            inserted += db_manager.add_task_rows(rows)
+        return inserted
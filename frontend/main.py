@@ -1,10 +1,25 @@
-import logging
+import importlib, logging, threading
 from PySide6.QtWidgets import QMainWindow, QLabel, QVBoxLayout, QWidget, QFormLayout, QLineEdit, QPushButton, QSpinBox, QDoubleSpinBox, QDateEdit, QTimeEdit, QTextEdit, QMessageBox, QTabWidget
-from PySide6.QtCore import QDate, QTime, QTimer, Qt
+from PySide6.QtCore import QDate, QTime, QTimer, Qt, QObject, Signal
 from PySide6.QtGui import QKeySequence, QShortcut
 from models.task import Task
+from models.sessions import session_minutes
 from backend.data.dbmanager import DatabaseManager
-from backend.graphs.graph_widget import GraphWidget
+from backend.data.write_queue import WriteQueue
+from backend.data.name_index import NameIndex
+from frontend.name_completer import NameCompleter
+
+# The graph tab pulls in matplotlib, so it is only built when first opened. Shortly after the
+# window is shown the bulk of matplotlib is imported on a background thread to make that first
+# open quick; the Qt canvas backend is left to the GUI thread.
+GRAPH_MODULE = "backend.graphs.graph_widget"
+GRAPH_PREFETCH_MODULES = ("matplotlib.figure", "backend.graphs.plot_data")
+GRAPH_PREFETCH_DELAY_MS = 300
+
+class WriteQueueSignals(QObject):
+    # Emitted from the write queue thread, delivered on the GUI thread
+    committed = Signal(object)  # list of (ticket, row id, Task)
+    failed = Signal(object)     # list of (ticket, error message)
 
 class MainWindow(QMainWindow):
     def __init__(self, logger):
@@ -16,6 +31,19 @@ class MainWindow(QMainWindow):
         # Initialize DatabaseManager
         self.db_manager = DatabaseManager(logger)
 
+        # Distinct task and category names for the form's completers and the graph's task selector,
+        # read once from the aggregate tables and kept current as entries are committed
+        self.task_names = NameIndex(self.db_manager.get_aggregate_keys("TaskStats"))
+        self.category_names = NameIndex(self.db_manager.get_aggregate_keys("CategoryStats"))
+
+        # Submissions are written by a background thread so the form never waits on the database
+        self.write_signals = WriteQueueSignals()
+        self.write_signals.committed.connect(self.on_tasks_committed)
+        self.write_signals.failed.connect(self.on_tasks_failed)
+        self.write_queue = WriteQueue(self.db_manager, self.write_signals.committed.emit, self.write_signals.failed.emit)
+        # Ticket of the submission the form still shows; the form is cleared once it is committed
+        self.pending_ticket = None
+
         # Set the central widget
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -43,10 +71,12 @@ class MainWindow(QMainWindow):
 
         self.task_edit = QLineEdit()
         self.task_edit.returnPressed.connect(self.submit_task)  # Submit on Enter key press
+        NameCompleter(self.task_names, self.task_edit)
         form_layout.addRow("Task:", self.task_edit)
 
         self.category_edit = QLineEdit()
         self.category_edit.returnPressed.connect(self.submit_task)  # Submit on Enter key press
+        NameCompleter(self.category_names, self.category_edit)
         form_layout.addRow("Category:", self.category_edit)
 
         self.time_investment_spin = QSpinBox()
@@ -61,6 +91,10 @@ class MainWindow(QMainWindow):
         self.end_time_edit.setTime(QTime.currentTime())
         form_layout.addRow("End Time:", self.end_time_edit)
 
+        # Start and end times fill in the time investment (an end before the start is past midnight)
+        self.start_time_edit.timeChanged.connect(self.update_time_investment)
+        self.end_time_edit.timeChanged.connect(self.update_time_investment)
+
         self.immediate_benefit_spin = QDoubleSpinBox()
         self.immediate_benefit_spin.setRange(0.0, 5.0)
         self.immediate_benefit_spin.setDecimals(1)
@@ -100,16 +134,52 @@ class MainWindow(QMainWindow):
         form_tab.setLayout(form_layout)
         self.tabs.addTab(form_tab, "Form")
 
-        # Add the graph widget as a tab
-        self.graph_tab = GraphWidget(self.db_manager)
-        self.tabs.addTab(self.graph_tab, "Graph")
-
+        # Reserve the graph tab; the GraphWidget is created on first activation
+        self.graph_tab = None
+        self.graph_container = QWidget()
+        QVBoxLayout(self.graph_container).setContentsMargins(0, 0, 0, 0)
+        self.tabs.addTab(self.graph_container, "Graph")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        self._graph_prefetch = None
 
         # Create a shortcut for Ctrl+Enter to submit the form
         submit_shortcut = QShortcut(QKeySequence(Qt.CTRL | Qt.Key_Return), self)
         submit_shortcut.activated.connect(self.submit_task)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._graph_prefetch is None:
+            self._graph_prefetch = threading.Thread(target=self._prefetch_graph_modules, name="GraphPrefetch", daemon=True)
+            QTimer.singleShot(GRAPH_PREFETCH_DELAY_MS, self._graph_prefetch.start)
+
+    @staticmethod
+    def _prefetch_graph_modules():
+        # Qt bindings must be imported on the GUI thread, so only the plain Python part is prefetched
+        for module in GRAPH_PREFETCH_MODULES:
+            importlib.import_module(module)
+
+    def on_tab_changed(self, index):
+        if self.tabs.widget(index) is self.graph_container:
+            self.ensure_graph_tab()
+
+    def ensure_graph_tab(self):
+        """Builds the graph tab on first use and returns it."""
+        if self.graph_tab is None:
+            # Waits for the prefetch thread if it is still importing the module
+            GraphWidget = importlib.import_module(GRAPH_MODULE).GraphWidget
+            self.graph_tab = GraphWidget(self.db_manager, task_names=self.task_names)
+            self.graph_container.layout().addWidget(self.graph_tab)
+        return self.graph_tab
+
+    def update_time_investment(self):
+        minutes = session_minutes(self.start_time_edit.time().toString("HH:mm"), self.end_time_edit.time().toString("HH:mm"))
+        if minutes:
+            self.time_investment_spin.setValue(minutes)
+
     def submit_task(self):
+        if self.pending_ticket is not None:
+            # The shown entry is still being written, submitting it again would log it twice
+            return
         try:
             # Collect data from input fields
             date = self.date_edit.date().toString("yyyy-MM-dd")
@@ -142,19 +212,43 @@ class MainWindow(QMainWindow):
                 notes=notes
             )
 
-            # Add the task to the database
-            task_id = self.db_manager.add_task_entry(task_obj)
-            if task_id:
-                self.logger.info(f"Task added successfully with ID {task_id}.")
-                self.show_toast("Task added successfully!")
-                self.clear_form()
-                self.graph_tab.update_plot()
-            else:
-                raise Exception("Failed to add task to the database.")
+            # Queue the task for the background writer; the toast and the cleared form follow once it
+            # is committed, and the values stay in the form if the write fails
+            task_obj.validate()
+            self.pending_ticket = self.write_queue.submit(task_obj)
         except Exception as e:
             self.logger.error(f"An error occurred: {e}")
             self.show_error(f"An error occurred: {e}")
 
+    def on_tasks_committed(self, committed):
+        if any(ticket == self.pending_ticket for ticket, _, _ in committed):
+            self.pending_ticket = None
+            self.clear_form()
+        for _, task_id, task in committed:
+            self.logger.info(f"Task added successfully with ID {task_id}.")
+            self.category_names.add(task.category_key)
+            # A new task also gets its row in the graph's task selector
+            position = self.task_names.add(task.task_key)
+            if position is not None and self.graph_tab is not None:
+                self.graph_tab.add_task_name(position)
+        self.show_toast("Task added successfully!" if len(committed) == 1 else f"{len(committed)} tasks added successfully!")
+        # An unopened graph tab loads everything, these entries included, when it is built
+        if self.graph_tab is not None:
+            self.graph_tab.append_entries([task for _, _, task in committed])
+
+    def on_tasks_failed(self, failed):
+        if any(ticket == self.pending_ticket for ticket, _ in failed):
+            # The form keeps the entry so it can be submitted again
+            self.pending_ticket = None
+        for _, message in failed:
+            self.logger.error(f"Failed to add task to the database: {message}")
+        self.show_error(f"An error occurred: Failed to add task to the database ({failed[0][1]}).")
+
+    def closeEvent(self, event):
+        # Entries still queued are written before the window goes away
+        self.write_queue.close()
+        super().closeEvent(event)
+
     def clear_form(self):
         """Clear all input fields."""
         self.date_edit.setDate(QDate.currentDate())
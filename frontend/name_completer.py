@@ -0,0 +1,24 @@
+from PySide6.QtCore import QStringListModel, Qt
+from PySide6.QtWidgets import QCompleter, QLineEdit
+from backend.data.name_index import NameIndex
+
+
+class NameCompleter(QCompleter):
+    """
+    Popup completer of a line edit over a NameIndex. The index does the prefix matching as
+    the user types and the popup's model only ever holds the current suggestions, so
+    completing costs the same with a hundred names as with tens of thousands.
+    """
+    def __init__(self, names: NameIndex, line_edit: QLineEdit):
+        super().__init__(line_edit)
+        self.names = names
+        self.suggestions = QStringListModel(self)
+        self.setModel(self.suggestions)
+        self.setCaseSensitivity(Qt.CaseInsensitive)
+        self.setCompletionMode(QCompleter.PopupCompletion)
+        # QLineEdit emits textEdited before it asks its completer for the popup
+        line_edit.textEdited.connect(self.update_suggestions)
+        line_edit.setCompleter(self)
+
+    def update_suggestions(self, text):
+        self.suggestions.setStringList([key.capitalize() for key in self.names.complete(text)] if text.strip() else [])
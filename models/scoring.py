@@ -0,0 +1,240 @@
+import json
+import numpy as np
+from backend.logs.instrumentation import timed
+
+# Metric metadata shared by the per-Task path (Metrics) and the batch engine below
+METRIC_NAMES = ("immediate_benefit", "future_impact", "personal_fulfillment", "progress")
+METRIC_COUNT = len(METRIC_NAMES)
+
+# Progress percentages are bucketed into levels 1-5 of 20% each (100% counts as level 5)
+PROGRESS_BUCKET_SIZE = 20
+PROGRESS_LEVELS = 5
+
+# Model every row was scored with before models existed; it is the formula Metrics implements
+LEGACY_MODEL_KEY = "equal:1"
+
+
+def normalize_progress_batch(progress) -> np.ndarray:
+    """
+    Vectorized Metrics.normalize_progress: maps percentages to levels 1-5.
+    Values outside 0-100 (or NaN) come back as 0, which no valid level uses.
+    """
+    progress = np.asarray(progress, dtype=float)
+    valid = (progress >= 0) & (progress <= 100)
+    levels = np.minimum(np.floor(np.where(valid, progress, 0) / PROGRESS_BUCKET_SIZE).astype(np.int64) + 1, PROGRESS_LEVELS)
+    return np.where(valid, levels, 0)
+
+
+def output_scores(immediate_benefit, future_impact, personal_fulfillment, progress_level) -> np.ndarray:
+    """
+    Vectorized Metrics.calculate_output_score over already-normalized progress levels.
+    Ratings are truncated to whole numbers, as Metrics does.
+    """
+    total = (np.trunc(np.asarray(immediate_benefit, dtype=float))
+             + np.trunc(np.asarray(future_impact, dtype=float))
+             + np.trunc(np.asarray(personal_fulfillment, dtype=float))
+             + np.asarray(progress_level, dtype=float))
+    return total / METRIC_COUNT
+
+
+def rois(output_score, time_investment) -> np.ndarray:
+    """
+    Vectorized Metrics.calculate_roi. Zero time investment gives NaN instead of raising.
+    """
+    time_investment = np.asarray(time_investment, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(time_investment != 0, np.asarray(output_score, dtype=float) / time_investment, np.nan)
+
+
+class ScoredBatch:
+    """
+    Result of score_batch: one entry per input row.
+    `valid` is False for rows the scalar Task path would reject (progress outside
+    0-100 or zero time investment); their scores are not meaningful.
+    """
+    def __init__(self, immediate_benefit, future_impact, personal_fulfillment, progress, output_score, roi, valid):
+        self.immediate_benefit = immediate_benefit
+        self.future_impact = future_impact
+        self.personal_fulfillment = personal_fulfillment
+        self.progress = progress
+        self.output_score = output_score
+        self.roi = roi
+        self.valid = valid
+
+    def error(self, index):
+        """Why row `index` is invalid, worded like the scalar path's errors."""
+        if self.progress[index] == 0:
+            return "Progress must be between 0 and 100."
+        return "Time investment must be greater than zero."
+
+    def __len__(self):
+        return len(self.valid)
+
+
+@timed("model.score_batch")
+def score_batch(immediate_benefit, future_impact, personal_fulfillment, progress, time_investment, model=None) -> ScoredBatch:
+    """
+    Scores many tasks at once from column arrays of raw form values (progress as a percentage).
+    With the default (legacy) model it produces the same stored values as building a Task for each row.
+    """
+    model = model or SCORING_MODELS[LEGACY_MODEL_KEY]
+    progress_level = normalize_progress_batch(progress)
+    output_score, roi = model.score(immediate_benefit, future_impact, personal_fulfillment, progress_level,
+                                    time_investment, progress)
+    valid = (progress_level > 0) & np.isfinite(roi)
+    return ScoredBatch(
+        np.trunc(np.asarray(immediate_benefit, dtype=float)).astype(np.int64),
+        np.trunc(np.asarray(future_impact, dtype=float)).astype(np.int64),
+        np.trunc(np.asarray(personal_fulfillment, dtype=float)).astype(np.int64),
+        progress_level,
+        output_score,
+        roi,
+        valid,
+    )
+
+
+# Scoring models: how the ratings and time of an entry become output_score and roi.
+# Each one is registered under "name:version" and every TaskLog row records the model that
+# scored it (score_model), so a changed formula is registered as a new version and the
+# history re-scored with DatabaseManager.recalculate_scores.
+PROGRESS_MODES = ("levels", "linear")
+TIME_CURVES = ("inverse", "log", "power")
+
+SCORING_MODELS = {}
+
+
+class ScoringModel:
+    """
+    Output score is the weighted mean of the ratings and progress, where progress is either
+    its 1-5 level or the percentage mapped continuously onto the same 1-5 range ("linear";
+    rows without a stored percentage use their level's midpoint).
+    ROI is output_score * g(h) / h for h hours invested, with g the share of the rating a
+    session of that length returns, normalized so an hour returns all of it (g(1) = 1):
+      inverse   g(h) = 1, the rating is the session's whole return (the legacy formula)
+      log       g(h) = log(1 + h / time_scale) / log(1 + 1 / time_scale)
+      power     g(h) = h ** time_exponent, with 0 < time_exponent < 1
+    so long sessions are penalized less than by the inverse curve, with diminishing returns.
+    """
+    __slots__ = ("name", "version", "weights", "progress", "time_curve", "time_scale", "time_exponent")
+
+    def __init__(self, name: str, version: int, weights=None, progress="levels", time_curve="inverse",
+                 time_scale=1.0, time_exponent=0.5):
+        weights = dict.fromkeys(METRIC_NAMES, 1.0) | dict(weights or {})
+        unknown = set(weights) - set(METRIC_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown metrics in the weights of {name}: {', '.join(sorted(unknown))}.")
+        if any(weight < 0 for weight in weights.values()) or not sum(weights.values()) > 0:
+            raise ValueError(f"Weights of {name} must be non-negative and not all zero.")
+        if progress not in PROGRESS_MODES:
+            raise ValueError(f"Progress mode must be one of {', '.join(PROGRESS_MODES)}, got {progress}.")
+        if time_curve not in TIME_CURVES:
+            raise ValueError(f"Time curve must be one of {', '.join(TIME_CURVES)}, got {time_curve}.")
+        if not time_scale > 0 or not 0 < time_exponent < 1:
+            raise ValueError(f"Time scale of {name} must be positive and its exponent between 0 and 1.")
+        self.name = name
+        self.version = int(version)
+        self.weights = {metric: float(weights[metric]) for metric in METRIC_NAMES}
+        self.progress = progress
+        self.time_curve = time_curve
+        self.time_scale = float(time_scale)
+        self.time_exponent = float(time_exponent)
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}:{self.version}"
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**values)
+
+    def progress_values(self, progress_level, progress_pct=None) -> np.ndarray:
+        """The progress metric: stored 1-5 levels, or the percentage mapped onto 1-5."""
+        progress_level = np.asarray(progress_level, dtype=float)
+        if self.progress == "levels":
+            return progress_level
+        midpoints = (progress_level - 0.5) * PROGRESS_BUCKET_SIZE
+        pct = midpoints if progress_pct is None else np.asarray(progress_pct, dtype=float)
+        pct = np.clip(np.where(np.isfinite(pct), pct, midpoints), 0, 100)
+        return 1 + (PROGRESS_LEVELS - 1) * pct / 100
+
+    def output_scores(self, immediate_benefit, future_impact, personal_fulfillment, progress_level,
+                      progress_pct=None) -> np.ndarray:
+        """Weighted mean of the truncated ratings and the progress metric."""
+        metrics = (np.trunc(np.asarray(immediate_benefit, dtype=float)),
+                   np.trunc(np.asarray(future_impact, dtype=float)),
+                   np.trunc(np.asarray(personal_fulfillment, dtype=float)),
+                   self.progress_values(progress_level, progress_pct))
+        weights = [self.weights[metric] for metric in METRIC_NAMES]
+        total = metrics[0] * weights[0]
+        for values, weight in zip(metrics[1:], weights[1:]):
+            total = total + values * weight
+        return total / sum(weights)
+
+    def time_returns(self, hours) -> np.ndarray:
+        """g(h) of the time curve, for positive hours."""
+        hours = np.asarray(hours, dtype=float)
+        if self.time_curve == "log":
+            return np.log1p(hours / self.time_scale) / np.log1p(1 / self.time_scale)
+        if self.time_curve == "power":
+            return hours ** self.time_exponent
+        return np.ones_like(hours)
+
+    def rois(self, output_score, time_investment) -> np.ndarray:
+        """
+        ROI through the time curve. Zero time gives NaN as in the legacy formula, and so does
+        negative time for the curves that are only defined for positive hours.
+        """
+        time_investment = np.asarray(time_investment, dtype=float)
+        if self.time_curve == "inverse":
+            return rois(output_score, time_investment)
+        positive = time_investment > 0
+        hours = np.where(positive, time_investment, 1.0)
+        return np.where(positive, np.asarray(output_score, dtype=float) * self.time_returns(hours) / hours, np.nan)
+
+    def score(self, immediate_benefit, future_impact, personal_fulfillment, progress_level, time_investment,
+              progress_pct=None):
+        """Returns (output_score, roi) arrays for column arrays of stored values."""
+        output_score = self.output_scores(immediate_benefit, future_impact, personal_fulfillment, progress_level, progress_pct)
+        return output_score, self.rois(output_score, time_investment)
+
+    def __repr__(self):
+        return f"ScoringModel({self.key}, {self.progress} progress, {self.time_curve} time)"
+
+
+def register_model(model: ScoringModel) -> ScoringModel:
+    """
+    Adds a model to the registry. A key can only be registered again with the same settings:
+    rows store the key, so changing what it means would silently change their history.
+    """
+    existing = SCORING_MODELS.get(model.key)
+    if existing is not None and existing.to_dict() != model.to_dict():
+        raise ValueError(f"Scoring model {model.key} is already registered with other settings, "
+                         "register the change as a new version.")
+    SCORING_MODELS[model.key] = model
+    return model
+
+
+def get_model(key: str) -> ScoringModel:
+    """The registered model for a "name:version" key."""
+    try:
+        return SCORING_MODELS[key]
+    except KeyError:
+        raise ValueError(f"Unknown scoring model {key}, registered: {', '.join(SCORING_MODELS)}.") from None
+
+
+def load_models(path: str):
+    """
+    Registers the models of a JSON file holding a list of ScoringModel settings, e.g.
+    [{"name": "deep", "version": 1, "weights": {"future_impact": 3}, "time_curve": "power", "time_exponent": 0.7}].
+    Returns the registered models.
+    """
+    with open(path, encoding="utf-8") as file:
+        return [register_model(ScoringModel.from_dict(values)) for values in json.load(file)]
+
+
+register_model(ScoringModel("equal", 1))
+register_model(ScoringModel("weighted", 1, weights={"future_impact": 2}, progress="linear", time_curve="log", time_scale=2.0))
+register_model(ScoringModel("sqrt", 1, progress="linear", time_curve="power", time_exponent=0.5))
@@ -0,0 +1,179 @@
+import numpy as np
+
+# Sessions are the start/end clock times logged with a task ("HH:mm" strings in TaskLog).
+# Each one becomes an interval on one absolute minute axis (days since 1970-01-01 * 1440 +
+# minute of the day), so a session whose end is not after its start runs past midnight into
+# the next day, and one sorted sweep finds the overlaps of a whole history at once.
+MINUTES_PER_DAY = 24 * 60
+
+# Slot width of the ROI density timeline; must divide a day
+DENSITY_SLOT_MINUTES = 15
+
+
+def parse_clock(text):
+    """
+    Minute of the day of an "HH:mm" (or "HH:mm:ss") time, or None when it is empty or invalid.
+    """
+    if not text:
+        return None
+    parts = str(text).strip().split(":")
+    if len(parts) not in (2, 3) or not all(part.isdigit() for part in parts):
+        return None
+    hours, minutes = int(parts[0]), int(parts[1])
+    if hours > 23 or minutes > 59 or (len(parts) == 3 and int(parts[2]) > 59):
+        return None
+    return hours * 60 + minutes
+
+
+def session_minutes(start_time, end_time):
+    """
+    Length in minutes of a session from its start and end clock times. An end at or before
+    the start means the session ran past midnight; equal times (the form's default) or an
+    invalid time give None, since no time frame was logged.
+    """
+    start, end = parse_clock(start_time), parse_clock(end_time)
+    if start is None or end is None or start == end:
+        return None
+    return (end - start) % MINUTES_PER_DAY
+
+
+def parse_clocks(texts) -> np.ndarray:
+    """
+    Vectorized parse_clock: minutes of the day as floats, NaN for empty or invalid times.
+    A history only holds 1440 distinct times, so each distinct string is parsed once.
+    """
+    cache = {}
+    for text in set(texts):
+        minute = parse_clock(text)
+        cache[text] = np.nan if minute is None else minute
+    return np.fromiter((cache[text] for text in texts), dtype=float, count=len(texts))
+
+
+def day_numbers(dates) -> np.ndarray:
+    """
+    Days since 1970-01-01 of ISO date strings as floats, NaN for unparseable dates.
+    """
+    try:
+        return np.array(dates, dtype="datetime64[D]").astype(np.int64).astype(float)
+    except ValueError:
+        days = []
+        for date in dates:
+            try:
+                days.append(float(np.datetime64(date, "D").astype(np.int64)))
+            except ValueError:
+                days.append(np.nan)
+        return np.array(days, dtype=float)
+
+
+class Overlaps:
+    """
+    Result of SessionSet.overlaps(), as positions into the SessionSet.
+    Every session that starts before an earlier-starting session has ended is listed once
+    (`sessions`), with the earlier session that runs longest (`partners`) and the minutes the
+    two share (`minutes`). `clusters` numbers each group of transitively overlapping sessions.
+    """
+    __slots__ = ("sessions", "partners", "minutes", "clusters")
+
+    def __init__(self, sessions, partners, minutes, clusters):
+        self.sessions = sessions
+        self.partners = partners
+        self.minutes = minutes
+        self.clusters = clusters
+
+    def select(self, mask):
+        """The overlaps where `mask` (one flag per listed session) is set."""
+        return Overlaps(self.sessions[mask], self.partners[mask], self.minutes[mask], self.clusters)
+
+    def __len__(self):
+        return len(self.sessions)
+
+
+class SessionSet:
+    """
+    Columnar set of timed sessions built from TaskLog columns: start and end on the absolute
+    minute axis, ROI and the row ids they came from. Rows without a usable date or time frame
+    are counted in `untimed` and left out.
+    """
+    def __init__(self, dates, start_times, end_times, rois=None, ids=None):
+        days = day_numbers(list(dates))
+        starts = parse_clocks(list(start_times))
+        ends = parse_clocks(list(end_times))
+        timed = np.isfinite(days) & np.isfinite(starts) & np.isfinite(ends) & (starts != ends)
+        self.untimed = int(len(timed) - timed.sum())
+
+        length = np.mod(ends - starts, MINUTES_PER_DAY)
+        self.start = (days * MINUTES_PER_DAY + starts)[timed].astype(np.int64)
+        self.end = self.start + length[timed].astype(np.int64)
+        self.roi = np.asarray(rois if rois is not None else np.zeros(len(timed)), dtype=float)[timed]
+        self.ids = np.asarray(ids if ids is not None else np.arange(len(timed)), dtype=np.int64)[timed]
+
+    @classmethod
+    def from_batch(cls, batch):
+        """From a TaskBatch with date, start_time, end_time and (optionally) roi and id columns."""
+        columns = batch.columns
+        return cls(columns["date"], columns["start_time"], columns["end_time"], columns.get("roi"), columns.get("id"))
+
+    @property
+    def hours(self) -> np.ndarray:
+        """Duration of every session in hours, as time_investment stores it."""
+        return (self.end - self.start) / 60
+
+    def dates(self, positions=None):
+        """ISO start date of the sessions at `positions` (all when None)."""
+        start = self.start if positions is None else self.start[positions]
+        return np.datetime_as_string((start // MINUTES_PER_DAY).astype("datetime64[D]")).tolist()
+
+    def overlaps(self) -> Overlaps:
+        """
+        Finds the overlapping sessions with one sweep over the sessions sorted by start,
+        keeping the running latest end: O(n log n) for the sort, linear after it.
+        Sessions that only touch (one ends when the next starts) do not overlap.
+        """
+        count = len(self.start)
+        if not count:
+            empty = np.empty(0, dtype=np.int64)
+            return Overlaps(empty, empty, empty, empty)
+        order = np.lexsort((self.end, self.start))
+        starts, ends = self.start[order], self.end[order]
+        latest_end = np.maximum.accumulate(ends)
+        # Sorted position of the session that holds the running latest end
+        holder = np.maximum.accumulate(np.where(ends == latest_end, np.arange(count), 0))
+
+        overlapping = np.zeros(count, dtype=bool)
+        overlapping[1:] = starts[1:] < latest_end[:-1]
+        clusters = np.cumsum(~overlapping) - 1
+        positions = np.flatnonzero(overlapping)
+        shared = np.minimum(ends[positions], latest_end[positions - 1]) - starts[positions]
+        return Overlaps(order[positions], order[holder[positions - 1]], shared, clusters[np.argsort(order)])
+
+    def density(self, date_from=None, date_to=None, slot_minutes=DENSITY_SLOT_MINUTES):
+        """
+        Per-day timeline of ROI density between two ISO dates (inclusive, defaulting to the
+        first and last session): returns (dates, array of shape (days, slots per day)) where
+        each slot holds the summed ROI of the sessions running in it, averaged over its minutes.
+        Built from a difference array over the window's minutes, so it is linear in the
+        number of sessions plus minutes; a session past midnight fills the next day's row.
+        """
+        if MINUTES_PER_DAY % slot_minutes:
+            raise ValueError(f"Slot width must divide a day, got {slot_minutes} minutes.")
+        if not len(self.start) and (date_from is None or date_to is None):
+            return [], np.zeros((0, MINUTES_PER_DAY // slot_minutes))
+        first = int(day_numbers([date_from])[0]) if date_from else int(self.start.min() // MINUTES_PER_DAY)
+        last = int(day_numbers([date_to])[0]) if date_to else int((self.end.max() - 1) // MINUTES_PER_DAY)
+        days = max(last - first + 1, 0)
+        low, high = first * MINUTES_PER_DAY, (last + 1) * MINUTES_PER_DAY
+
+        inside = (self.end > low) & (self.start < high)
+        starts = np.clip(self.start[inside], low, high) - low
+        ends = np.clip(self.end[inside], low, high) - low
+        roi = np.nan_to_num(self.roi[inside])
+        size = days * MINUTES_PER_DAY
+        change = (np.bincount(starts, weights=roi, minlength=size + 1)
+                  - np.bincount(ends, weights=roi, minlength=size + 1))
+        per_minute = np.cumsum(change[:size])
+        timeline = per_minute.reshape(days, MINUTES_PER_DAY // slot_minutes, slot_minutes).mean(axis=2)
+        dates = np.datetime_as_string(np.arange(first, last + 1).astype("datetime64[D]")).tolist()
+        return dates, timeline
+
+    def __len__(self):
+        return len(self.start)
@@ -1,7 +1,15 @@
-import inspect
 from typing import Optional
+from models.scoring import METRIC_NAMES, METRIC_COUNT, PROGRESS_BUCKET_SIZE, PROGRESS_LEVELS, LEGACY_MODEL_KEY
+from backend.logs.instrumentation import instrumented, timed_method
 
+def normalize_key(text: Optional[str]) -> str:
+    """Normalize a task or category name for grouping and lookups."""
+    return (text or "").strip().lower()
+
+@instrumented
 class Metrics:
+    __slots__ = METRIC_NAMES
+
     def __init__(self, immediate_benefit: int, future_impact: int, personal_fulfillment: int, progress: int):
         self.immediate_benefit = int(immediate_benefit)
         self.future_impact = int(future_impact)
@@ -10,24 +18,18 @@ class Metrics:
     
     def normalize_progress(self, progress: int) -> int:
         """Normalize progress percentage to a scale of 1 to 5."""
-        if 0 <= progress < 20:
-            return 1
-        elif 20 <= progress < 40:
-            return 2
-        elif 40 <= progress < 60:
-            return 3
-        elif 60 <= progress < 80:
-            return 4
-        elif 80 <= progress <= 100:
-            return 5
-        else:
+        if not 0 <= progress <= 100:
             raise ValueError("Progress must be between 0 and 100.")
+        # 20% buckets, with exactly 100% still counted as the top level
+        return min(int(progress // PROGRESS_BUCKET_SIZE) + 1, PROGRESS_LEVELS)
 
 
+    @timed_method("model.output_score")
     def calculate_output_score(self):
-        total = sum(value for name, value in vars(self).items() if isinstance(value, int))
+        total = sum(getattr(self, name) for name in METRIC_NAMES)
         return total / self._get_metrics_count()
 
+    @timed_method("model.roi")
     def calculate_roi(self, time_investment: int, output_score: Optional[int] =None):
         # Example calculation for ROI
         if output_score is not None:
@@ -36,9 +38,11 @@ class Metrics:
 
     @staticmethod
     def _get_metrics_count():
-        metrics = inspect.signature(Metrics).parameters
-        return len(metrics)
+        return METRIC_COUNT
 class Task:
+    __slots__ = ("date", "task", "category", "time_investment", "start_time", "end_time", "notes",
+                 "task_key", "category_key", "metrics", "output_score", "roi", "progress_pct")
+
     def __init__(self, date: str, task: str, category: str, time_investment: int, start_time: str, end_time: str,
                  immediate_benefit: int, future_impact: int, personal_fulfillment: int, progress: int,
                  notes: str = ""):
@@ -49,15 +53,19 @@ class Task:
         self.start_time = start_time
         self.end_time = end_time
         self.notes = notes
+        self.task_key = normalize_key(task)
+        self.category_key = normalize_key(category)
 
+        self.progress_pct = progress
         self.metrics = Metrics(immediate_benefit, future_impact, personal_fulfillment, progress)
         self.output_score = self.metrics.calculate_output_score()
         self.roi = self.metrics.calculate_roi(time_investment, self.output_score)
 
     def to_tuple(self):
+        # Scored with the legacy model like Metrics; DatabaseManager re-scores rows for another active model
         return (self.date, self.task, self.category, self.time_investment, self.start_time, self.end_time,
                 self.metrics.immediate_benefit, self.metrics.future_impact, self.metrics.personal_fulfillment, self.metrics.progress,
-                self.output_score, self.roi, self.notes)
+                self.output_score, self.roi, self.notes, self.task_key, self.category_key, self.progress_pct, LEGACY_MODEL_KEY)
 
     def validate(self):
         #TODO: Add validation logic here
@@ -0,0 +1,102 @@
+import sys
+from array import array
+import numpy as np
+
+# TaskLog columns a TaskBatch can hold, with the array typecode used while loading.
+# None marks text columns, kept as Python lists (task/category/date values are interned
+# so repeated names share one string object).
+TASK_BATCH_COLUMNS = {
+    "id": "q",
+    "date": None,
+    "task": None,
+    "category": None,
+    "time_investment": "d",
+    "start_time": None,
+    "end_time": None,
+    "immediate_benefit": "d",
+    "future_impact": "d",
+    "personal_fulfillment": "d",
+    "progress": "d",
+    "output_score": "d",
+    "roi": "d",
+    "notes": None,
+    "task_key": None,
+    "category_key": None,
+    "progress_pct": "d",
+    "score_model": None,
+}
+INTERNED_COLUMNS = {"date", "task", "category", "start_time", "end_time", "task_key", "category_key", "score_model"}
+
+
+class TaskBatch:
+    """
+    Columnar set of TaskLog rows: NumPy arrays for numeric columns, lists of (interned)
+    strings for text. Built incrementally from cursor chunks so a full-history load never
+    holds a list of row tuples.
+    Missing numeric values (NULL) are stored as NaN.
+    """
+    __slots__ = ("columns", "_builders")
+
+    def __init__(self, columns=tuple(TASK_BATCH_COLUMNS)):
+        unknown = [name for name in columns if name not in TASK_BATCH_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown TaskBatch columns: {', '.join(unknown)}")
+        self.columns = {}
+        self._builders = {name: array(TASK_BATCH_COLUMNS[name]) if TASK_BATCH_COLUMNS[name] else [] for name in columns}
+
+    def extend(self, rows):
+        """Appends rows whose values are in the batch's column order."""
+        names = list(self._builders)
+        for name, values in zip(names, zip(*rows)):
+            builder = self._builders[name]
+            if name in INTERNED_COLUMNS:
+                builder.extend(sys.intern(value) if value is not None else None for value in values)
+            elif TASK_BATCH_COLUMNS[name] == "d":
+                builder.extend(float("nan") if value is None else value for value in values)
+            else:
+                builder.extend(values)
+
+    def finish(self):
+        """Freezes the loaded columns; numeric builders become NumPy arrays without copying."""
+        for name, builder in self._builders.items():
+            if isinstance(builder, array):
+                dtype = np.int64 if builder.typecode == "q" else np.float64
+                self.columns[name] = np.frombuffer(builder, dtype=dtype) if len(builder) else np.empty(0, dtype=dtype)
+            else:
+                self.columns[name] = builder
+        self._builders = {}
+        return self
+
+    @classmethod
+    def from_cursor(cls, cursor, columns, chunk_size=10000):
+        """Builds a batch from an executed cursor selecting `columns`, fetching in chunks."""
+        batch = cls(columns)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            batch.extend(rows)
+        return batch.finish()
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        if not self.columns:
+            return 0
+        return len(next(iter(self.columns.values())))
+
+    def rows(self):
+        """Iterates the batch as row tuples, in column order."""
+        return zip(*(column.tolist() if isinstance(column, np.ndarray) else column for column in self.columns.values()))
+
+    def nbytes(self):
+        """Approximate memory held by the columns (string objects counted once each)."""
+        total = 0
+        for column in self.columns.values():
+            if isinstance(column, np.ndarray):
+                total += column.nbytes
+            else:
+                total += sys.getsizeof(column)
+                total += sum(sys.getsizeof(value) for value in {id(value): value for value in column}.values())
+        return total
@@ -1,19 +1,357 @@
-import sys, logging
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QPixmap
+import sys, logging, argparse
 
-from frontend.main import MainWindow
-from backend.logs.logger_setup import GetLogger
+from backend.logs.logger_setup import GetLogger, add_log_sinks
 
 logger_level = logging.INFO
 logger = GetLogger(__name__, logger_level)
 
-if __name__ == "__main__":
+
+def run_gui():
+    # Qt is only imported when the window is actually needed so headless commands stay light
+    from PySide6.QtWidgets import QApplication, QMessageBox
+    from frontend.main import MainWindow
+    from backend.data.dbmanager import SchemaVersionError
+
     app = QApplication(sys.argv)
 
 
-    window = MainWindow(logger)
+    try:
+        window = MainWindow(logger)
+    except SchemaVersionError as e:
+        QMessageBox.critical(None, "Database upgrade needed", str(e))
+        raise
     window.show()
 
-    sys.exit(app.exec())
\ No newline at end of file
+    return app.exec()
+
+
+def run_import(args):
+    from backend.data.dbmanager import DatabaseManager
+    from backend.data.importer import import_file
+
+    db_manager = DatabaseManager(logger, args.db)
+    inserted, failures = import_file(db_manager, args.path, logger, args.chunk_size, not args.skip_overlap_check)
+    return 1 if failures and not inserted else 0
+
+
+def run_rebuild_aggregates(args):
+    from backend.data.dbmanager import DatabaseManager
+
+    db_manager = DatabaseManager(logger, args.db)
+    return 0 if db_manager.rebuild_aggregates() else 1
+
+
+def run_rescore(args):
+    from backend.data.dbmanager import DatabaseManager
+    from models.scoring import SCORING_MODELS, get_model, load_models
+
+    try:
+        if args.models:
+            load_models(args.models)
+        model = get_model(args.model) if args.model else None
+    except (OSError, ValueError, TypeError) as e:
+        logger.error(f"Could not load the scoring model: {e}")
+        return 1
+    if args.list:
+        for key, registered in SCORING_MODELS.items():
+            print(f"{key:<16} {registered.progress:<7} progress, {registered.time_curve:<7} time, weights {registered.weights}")
+        return 0
+
+    db_manager = DatabaseManager(logger, args.db)
+    reported = [None]
+
+    def progress(done, total):
+        step = done * 10 // max(total, 1)
+        if reported[0] != step:
+            reported[0] = step
+            logger.info(f"Re-scored {done}/{total} rows")
+
+    db_manager.recalculate_scores(args.chunk_size, model, args.force, progress)
+    return 0
+
+
+def run_migrate(args):
+    from backend.data.helpers import DatabaseHelper
+
+    helper = DatabaseHelper(logger, args.db)
+    reported = {}
+
+    def progress(version, done, total):
+        # Logged every 10% so multi-million row copies stay readable
+        step = done * 10 // max(total, 1)
+        if reported.get(version) != step:
+            reported[version] = step
+            logger.info(f"Version {version}: {done}/{total} rows")
+
+    migrated = helper.migrate_database(batch_size=args.batch_size, progress=progress)
+    helper.close()
+    return 0 if migrated else 1
+
+
+def run_backup(args):
+    from backend.data.helpers import DatabaseHelper
+
+    helper = DatabaseHelper(logger, args.db)
+    entry = helper.backup_database(args.backup_dir, args.compress, args.incremental, args.keep)
+    helper.close()
+    return 0 if entry else 1
+
+
+def run_restore(args):
+    from backend.data.helpers import DatabaseHelper
+
+    helper = DatabaseHelper(logger, args.db)
+    restored = helper.restore_database(args.snapshot, args.backup_dir)
+    helper.close()
+    return 0 if restored else 1
+
+
+def run_archive(args):
+    from backend.data.helpers import DatabaseHelper
+
+    helper = DatabaseHelper(logger, args.db)
+    move = helper.unarchive_year if args.restore else helper.archive_year
+    for year in args.years:
+        move(year, args.batch_size)
+    helper.close()
+    return 0
+
+
+def run_sessions(args):
+    from backend.data.dbmanager import DatabaseManager
+    from backend.data.sessions import check_sessions, format_density_csv
+
+    db_manager = DatabaseManager(logger, args.db)
+    check_sessions(db_manager, logger, args.date_from, args.date_to, args.limit)
+    if args.density:
+        dates, timeline = db_manager.get_sessions(args.date_from, args.date_to).density(
+            args.date_from, args.date_to, args.slot_minutes)
+        with open(args.density, "w", encoding="utf-8", newline="") as file:
+            file.write(format_density_csv(dates, timeline, args.slot_minutes))
+    db_manager.close()
+    return 0
+
+
+def run_report(args):
+    from backend.data.dbmanager import DatabaseManager
+    from backend.data.report import build_report, REPORT_FORMATS
+
+    db_manager = DatabaseManager(logger, args.db)
+    history = None
+    if args.columns:
+        from backend.data.column_store import ColumnStore, ColumnStoreError
+        store = ColumnStore(args.columns)
+        try:
+            store.sync(db_manager)
+            history = store.open()
+        except ColumnStoreError as e:
+            logger.error(str(e))
+            db_manager.close()
+            return 1
+    report = build_report(db_manager, args.by or ["task", "category", "week"], args.chunk_size, history)
+    db_manager.close()
+    text = REPORT_FORMATS[args.format](report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+def run_export_charts(args):
+    from backend.data.dbmanager import DatabaseManager
+    from backend.graphs.export import export_charts
+
+    db_manager = DatabaseManager(logger, args.db)
+    date_range = (args.date_from, args.date_to) if args.date_from or args.date_to else None
+    counts = export_charts(db_manager, args.out, args.by, args.format, args.workers, date_range, args.force,
+                           dpi=args.dpi)
+    db_manager.close()
+    return 1 if counts["failed"] else 0
+
+
+def run_export_columns(args):
+    from backend.data.dbmanager import DatabaseManager
+    from backend.data.column_store import ColumnStore, ColumnStoreError
+
+    db_manager = DatabaseManager(logger, args.db)
+    store = ColumnStore(args.out)
+    try:
+        written = store.sync(db_manager, args.chunk_size, args.rebuild)
+    except ColumnStoreError as e:
+        logger.error(str(e))
+        return 1
+    finally:
+        db_manager.close()
+    logger.info(f"Column store at {args.out}: {written} rows written, {store.manifest()['rows']} in total.")
+    if args.feather:
+        try:
+            store.open().write_feather(args.feather)
+        except ImportError as e:
+            logger.error(f"Could not write {args.feather}: {e}")
+            return 1
+        logger.info(f"Wrote the history to {args.feather}")
+    return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Productivity and ROI Tracker")
+    parser.add_argument("--log-file", default=None, help="Also write the log to this rotating text file")
+    parser.add_argument("--log-json", default=None, help="Also write the log as JSON lines to this rotating file")
+    parser.add_argument("--instrument", action="store_true", help="Record hot-path timings and log a summary")
+    parser.add_argument("--trace-sql", action="store_true", help="Also time every SQL statement (implies --instrument)")
+    parser.add_argument("--summary-interval", type=float, default=60,
+                        help="Seconds between timing summaries in the log (0 logs only on exit)")
+    parser.add_argument("--metrics-json", default=None, help="Write the recorded timings to this JSON file on exit")
+    parser.add_argument("--profile", default=None, help="Run under cProfile and write the stats to this file")
+    subparsers = parser.add_subparsers(dest="command")
+
+    import_parser = subparsers.add_parser("import", help="Import task entries from a .csv or .jsonl file")
+    import_parser.add_argument("path", help="Path to the .csv or .jsonl file")
+    import_parser.add_argument("--db", default=None, help="Database path (defaults to the app database)")
+    import_parser.add_argument("--chunk-size", type=int, default=1000, help="Rows committed per transaction")
+    import_parser.add_argument("--skip-overlap-check", action="store_true",
+                               help="Do not check the imported sessions for overlapping start/end times")
+
+    rebuild_parser = subparsers.add_parser("rebuild-aggregates", help="Recompute the ROI aggregate tables from the task log")
+    rebuild_parser.add_argument("--db", default=None, help="Database path (defaults to the app database)")
+
+    rescore_parser = subparsers.add_parser("rescore", help="Recompute output scores and ROI of every logged task")
+    rescore_parser.add_argument("--db", default=None, help="Database path (defaults to the app database)")
+    rescore_parser.add_argument("--chunk-size", type=int, default=10000, help="Rows updated per transaction")
+    rescore_parser.add_argument("--model", default=None, help="Scoring model to apply and make active, as name:version (defaults to the active one)")
+    rescore_parser.add_argument("--models", default=None, help="JSON file of extra scoring models to register first")
+    rescore_parser.add_argument("--force", action="store_true", help="Also re-score rows already scored with the model")
+    rescore_parser.add_argument("--list", action="store_true", help="List the registered scoring models and exit")
+
+    migrate_parser = subparsers.add_parser("migrate", help="Upgrade the database schema in batches, resuming an interrupted run")
+    migrate_parser.add_argument("--db", default=None, help="Database path (defaults to the app database)")
+    migrate_parser.add_argument("--batch-size", type=int, default=5000, help="Rows copied per transaction")
+
+    backup_parser = subparsers.add_parser("backup", help="Take an online snapshot of the database")
+    backup_parser.add_argument("--db", default=None, help="Database path (defaults to the app database)")
+    backup_parser.add_argument("--backup-dir", default=None, help="Snapshot folder (defaults to backups/ next to the database)")
+    backup_parser.add_argument("--compress", action="store_true", help="Store the snapshot gzip-compressed")
+    backup_parser.add_argument("--incremental", action="store_true", help="Only save the entries added since the last snapshot")
+    backup_parser.add_argument("--keep", type=int, default=5, help="Full snapshots to keep (0 keeps all)")
+
+    restore_parser = subparsers.add_parser("restore", help="Verify a snapshot and restore the database from it")
+    restore_parser.add_argument("--db", default=None, help="Database path (defaults to the app database)")
+    restore_parser.add_argument("--backup-dir", default=None, help="Snapshot folder (defaults to backups/ next to the database)")
+    restore_parser.add_argument("--snapshot", default=None, help="Snapshot file name from the manifest (defaults to the newest)")
+
+    archive_parser = subparsers.add_parser("archive", help="Move the entries of finished years out of the live task table")
+    archive_parser.add_argument("years", type=int, nargs="+", help="Years to archive")
+    archive_parser.add_argument("--db", default=None, help="Database path (defaults to the app database)")
+    archive_parser.add_argument("--restore", action="store_true", help="Move the years' entries back instead")
+    archive_parser.add_argument("--batch-size", type=int, default=5000, help="Rows moved per transaction")
+
+    sessions_parser = subparsers.add_parser("sessions", help="Check logged start/end times for overlapping sessions")
+    sessions_parser.add_argument("--db", default=None, help="Database path (defaults to the app database)")
+    sessions_parser.add_argument("--from", dest="date_from", default=None, help="First date to check (YYYY-MM-DD)")
+    sessions_parser.add_argument("--to", dest="date_to", default=None, help="Last date to check (YYYY-MM-DD)")
+    sessions_parser.add_argument("--limit", type=int, default=20, help="Overlaps listed in the log")
+    sessions_parser.add_argument("--density", default=None, help="Write the per-day ROI density timeline to this CSV file")
+    sessions_parser.add_argument("--slot-minutes", type=int, default=15, help="Width of a timeline slot")
+
+    report_parser = subparsers.add_parser("report", help="Print ROI statistics per task, category and week (no GUI)")
+    report_parser.add_argument("--db", default=None, help="Database path (defaults to the app database)")
+    report_parser.add_argument("--by", action="append", choices=["task", "category", "week"],
+                               help="Grouping to report; repeat for several (defaults to all three)")
+    report_parser.add_argument("--format", default="table", choices=["table", "csv", "json"], help="Output format")
+    report_parser.add_argument("--output", default=None, help="Write to this file instead of stdout")
+    report_parser.add_argument("--chunk-size", type=int, default=50000, help="Rows read per fetch")
+    report_parser.add_argument("--columns", default=None, help="Read the entries from this column store (see export-columns), updating it first")
+
+    columns_parser = subparsers.add_parser("export-columns", help="Export the task history to a memory-mappable column store, appending new entries")
+    columns_parser.add_argument("out", help="Column store folder")
+    columns_parser.add_argument("--db", default=None, help="Database path (defaults to the app database)")
+    columns_parser.add_argument("--chunk-size", type=int, default=50000, help="Rows read per fetch")
+    columns_parser.add_argument("--rebuild", action="store_true", help="Export every entry again instead of appending")
+    columns_parser.add_argument("--feather", default=None, help="Also write the history to this Feather (Arrow IPC) file (needs pyarrow)")
+
+    export_parser = subparsers.add_parser("export-charts", help="Draw the ROI chart of every task or category to image files (no GUI)")
+    export_parser.add_argument("out", help="Folder the charts are written to")
+    export_parser.add_argument("--db", default=None, help="Database path (defaults to the app database)")
+    export_parser.add_argument("--by", default="task", choices=["task", "category"], help="One chart per task or per category")
+    export_parser.add_argument("--format", default="png", choices=["png", "svg"], help="Image format")
+    export_parser.add_argument("--workers", type=int, default=None, help="Processes drawing charts (defaults to the CPU count, 1 draws in-process)")
+    export_parser.add_argument("--from", dest="date_from", default=None, help="First date charted (YYYY-MM-DD)")
+    export_parser.add_argument("--to", dest="date_to", default=None, help="Last date charted (YYYY-MM-DD)")
+    export_parser.add_argument("--force", action="store_true", help="Redraw charts whose data has not changed")
+    export_parser.add_argument("--dpi", type=int, default=100, help="Resolution of PNG charts")
+
+    # Unknown arguments are left for Qt (e.g. -platform offscreen)
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
+def run_command(args):
+    from backend.data.dbmanager import SchemaVersionError
+
+    try:
+        return dispatch_command(args)
+    except SchemaVersionError as e:
+        logger.error(str(e))
+        return 1
+
+
+def dispatch_command(args):
+    if args.command == "import":
+        return run_import(args)
+    if args.command == "rebuild-aggregates":
+        return run_rebuild_aggregates(args)
+    if args.command == "rescore":
+        return run_rescore(args)
+    if args.command == "migrate":
+        return run_migrate(args)
+    if args.command == "backup":
+        return run_backup(args)
+    if args.command == "restore":
+        return run_restore(args)
+    if args.command == "archive":
+        return run_archive(args)
+    if args.command == "sessions":
+        return run_sessions(args)
+    if args.command == "report":
+        return run_report(args)
+    if args.command == "export-charts":
+        return run_export_charts(args)
+    if args.command == "export-columns":
+        return run_export_columns(args)
+
+    return run_gui()
+
+
+def run_instrumented(args):
+    # Timers are switched on before any database connection opens so SQL tracing covers all of them
+    from backend.logs import instrumentation
+
+    instrumentation.enable(trace_sql=args.trace_sql)
+    try:
+        with instrumentation.periodic_summary(logger, args.summary_interval):
+            if not args.profile:
+                return run_command(args)
+            import cProfile, pstats
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(run_command, args)
+            finally:
+                # Only the main thread is profiled; worker threads show up in the timers instead
+                profiler.dump_stats(args.profile)
+                logger.info(f"Wrote profile to {args.profile}")
+                pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    finally:
+        if args.metrics_json:
+            instrumentation.export_json(args.metrics_json)
+            logger.info(f"Wrote timings to {args.metrics_json}")
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    add_log_sinks(args.log_file, args.log_json)
+
+    if args.instrument or args.trace_sql or args.profile or args.metrics_json:
+        sys.exit(run_instrumented(args))
+    sys.exit(run_command(args))